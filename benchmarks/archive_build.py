@@ -0,0 +1,93 @@
+"""
+Archive build time and size on synthetic problem trees.
+
+Compares the old uncompressed serial zip against the archive engine with
+one worker and with a worker per core.
+
+    python benchmarks/archive_build.py [--small N] [--large N] [--large-mb MB]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jasper.archive import DEFAULT_WORKERS, iter_files, stream_archive  # noqa: E402
+
+
+def make_tree(root, small, large, large_mb):
+    rng = random.Random(0)
+    src = os.path.join(root, "src")
+    data = os.path.join(root, "tests")
+    os.makedirs(src)
+    os.makedirs(data)
+    for i in range(small):
+        with open(os.path.join(src, f"mod_{i:04d}.c"), "w") as f:
+            for j in range(rng.randrange(20, 200)):
+                f.write(f"static int helper_{i}_{j}(int v) {{ return v * {rng.randrange(1000)} + {j}; }}\n")
+    for i in range(large):
+        path = os.path.join(data, f"case_{i}.in")
+        with open(path, "w") as f:
+            remaining = large_mb * 1024 * 1024
+            while remaining > 0:
+                line = " ".join(str(rng.randrange(1 << 20)) for _ in range(12)) + "\n"
+                f.write(line)
+                remaining -= len(line)
+    with open(os.path.join(data, "blob.bin"), "wb") as f:
+        f.write(rng.randbytes(large_mb * 1024 * 1024))
+
+
+def legacy_zip(folder):
+    # zip_folder before the archive engine: ZIP_STORED, one file at a time.
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zipf:
+        for full_path, arcname in iter_files(folder):
+            zipf.write(full_path, arcname)
+    return buf.getvalue()
+
+
+def engine(workers):
+    return lambda folder: b"".join(stream_archive(folder, workers=workers))
+
+
+def measure(build, folder, runs):
+    best, size = float("inf"), 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(build(folder))
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--small", type=int, default=600, help="Number of small .c files")
+    parser.add_argument("--large", type=int, default=3, help="Number of large test data files")
+    parser.add_argument("--large-mb", type=int, default=8, help="Size of each large file in MiB")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, args.small, args.large, args.large_mb)
+        raw = sum(os.path.getsize(p) for p, _ in iter_files(root))
+        print(f"tree: {args.small} small files, {args.large} x {args.large_mb} MiB text, 1 x {args.large_mb} MiB binary")
+        print(f"raw size: {raw:,} bytes")
+        print(f"{'builder':<22} {'bytes on wire':>15} {'build s':>9}")
+        cases = [
+            ("stored, serial (old)", legacy_zip),
+            ("engine, 1 worker", engine(1)),
+        ]
+        if DEFAULT_WORKERS > 1:
+            cases.append((f"engine, {DEFAULT_WORKERS} workers", engine(DEFAULT_WORKERS)))
+        for label, build in cases:
+            seconds, size = measure(build, root, args.runs)
+            print(f"{label:<22} {size:>15,} {seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
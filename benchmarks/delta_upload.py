@@ -0,0 +1,76 @@
+"""
+Bytes on the wire for repeated checks, full archive vs delta upload.
+
+Builds a synthetic problem folder, starts the stand-in grader in-process and
+runs a few `/check` uploads, editing one line between them.
+
+    python benchmarks/delta_upload.py [--files N] [--size BYTES]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jasper import client, delta, devserver  # noqa: E402
+from jasper.archive import build_archive  # noqa: E402
+
+FIELDS = {"student_id": "bench-user-1", "problem_id": "101"}
+
+
+def make_tree(root, files, size):
+    rng = random.Random(files)
+    for i in range(files):
+        with open(os.path.join(root, f"src_{i:03d}.c"), "w") as f:
+            written = 0
+            while written < size:
+                line = f"int f{i}_{written}(int x) {{ return x * {rng.randrange(1 << 30)}; }}\n"
+                f.write(line)
+                written += len(line)
+
+
+def edit_one_line(root, round_no):
+    with open(os.path.join(root, "src_000.c"), "a") as f:
+        f.write(f"/* edit {round_no} */\n")
+
+
+def run(rounds, root, use_delta):
+    server = devserver.start_in_thread()
+    try:
+        for i in range(rounds):
+            if i:
+                edit_one_line(root, i)
+            if use_delta:
+                resp = delta.upload(server.url, "/check", FIELDS, folder_path=root)
+            else:
+                resp = client.upload(server.url, "/check", FIELDS, build_archive(root))
+            resp.raise_for_status()
+        return sum(server.state.stats()["bytes_in"].values())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--size", type=int, default=8192, help="Approximate bytes per file")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for label, use_delta in (("full", False), ("delta", True)):
+        with tempfile.TemporaryDirectory() as root:
+            make_tree(root, args.files, args.size)
+            results[label] = run(args.rounds, root, use_delta)
+
+    print(f"{args.rounds} checks of {args.files} files x ~{args.size} bytes, one line edited between checks")
+    for label, total in results.items():
+        print(f"{label:<6} {total:>12,} bytes uploaded")
+    print(f"ratio  {results['full'] / max(1, results['delta']):>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Rendering test results with multi-megabyte expected/actual outputs.
+
+Compares printing outputs whole (the old `check` behaviour) with the
+windowed renderer in jasper.diff, for a failed test and for a passed test
+whose output is echoed. Output goes to memory, so the times leave out what a
+real terminal spends drawing; that cost grows with the characters written.
+
+    python benchmarks/diff_render.py [--lines N] [--where FRACTION]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jasper.diff import write_head, write_mismatch  # noqa: E402
+from jasper.utils import format_text  # noqa: E402
+
+
+def make_outputs(lines, where):
+    expected = "".join(f"case {i}: total = {i * 7919 % 100003}\n" for i in range(lines))
+    cut = expected.find("\n", int(len(expected) * where)) + 1
+    # One wrong value, then a runaway loop printing the same line.
+    actual = expected[:cut] + "case ?: total = -1\n" + "still running\n" * lines
+    return expected, actual
+
+
+def old_render(expected, actual):
+    print(f"    Expected: {expected}")
+    print(f"    Actual:   {actual}")
+
+
+def new_render(expected, actual):
+    write_mismatch(print, expected, actual)
+
+
+def old_passed(expected, _actual):
+    for line in expected.splitlines():
+        print(format_text("    " + line, color="green"))
+
+
+def new_passed(expected, _actual):
+    write_head(lambda line: print(format_text(line, color="green")), expected)
+
+
+def measure(render, expected, actual, rounds):
+    best = None
+    for _ in range(rounds):
+        out = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            render(expected, actual)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(out.getvalue()), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--where", type=float, default=0.9, help="Where the first difference falls, 0..1")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    expected, actual = make_outputs(args.lines, args.where)
+    print(f"expected {len(expected):,} chars, actual {len(actual):,} chars, best of {args.rounds}")
+    cases = (
+        ("failed, whole", old_render),
+        ("failed, windowed", new_render),
+        ("passed, whole", old_passed),
+        ("passed, head", new_passed),
+    )
+    for label, render in cases:
+        written, elapsed = measure(render, expected, actual, args.rounds)
+        print(f"{label:<17} {written:>12,} chars written  {elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Bytes transferred and time-to-extract for `jasper get`, JSON vs zip.
+
+Builds a synthetic module (several problems with sources and test data),
+serves it from the stand-in grader in-process and downloads it both ways.
+Extraction is timed separately from the transfer (so the stand-in's on-the-fly
+zipping is not counted) and writes the files out just as `jasper get` does.
+
+    python benchmarks/get_transfer.py [--problems N] [--files N] [--size BYTES]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jasper import client, devserver  # noqa: E402
+from jasper.commands import get  # noqa: E402
+
+MODULE = "m99"
+
+
+def make_module(root, problems, files, size):
+    rng = random.Random(problems * files)
+    for p in range(problems):
+        folder = os.path.join(root, f"{900 + p}-bench")
+        os.makedirs(os.path.join(folder, "tests"))
+        with open(os.path.join(folder, "meta.json"), "w") as f:
+            json.dump({"module": MODULE}, f)
+        for i in range(files):
+            with open(os.path.join(folder, f"src_{i:02d}.c"), "w") as f:
+                written = 0
+                while written < size:
+                    line = f"int f{i}_{written}(int x) {{ return x * {rng.randrange(1 << 30)}; }}\n"
+                    f.write(line)
+                    written += len(line)
+        # Test inputs: numeric text, plus one binary blob per problem.
+        with open(os.path.join(folder, "tests", "input.txt"), "w") as f:
+            f.write("\n".join(str(rng.randrange(1 << 20)) for _ in range(size // 4)))
+        with open(os.path.join(folder, "tests", "data.bin"), "wb") as f:
+            f.write(rng.randbytes(size))
+
+
+class _Replay:
+    # A received body, replayed through the response interface get parses from.
+    def __init__(self, resp):
+        self.headers = resp.headers
+        self.body = resp.content
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def fetch(server_url, accept):
+    resp = client.get(server_url, "/get-problem", params={"q": MODULE}, headers={"Accept": accept})
+    resp.raise_for_status()
+    return _Replay(resp)
+
+
+def extract(body, dest):
+    """Time-to-extract only: the body is already in memory."""
+    start = time.perf_counter()
+    staging = tempfile.mkdtemp(dir=dest)
+    try:
+        if body.headers.get("Content-Type", "").startswith("application/zip"):
+            data = get.parse_archive(body, staging)
+        else:
+            data = get.parse_streamed(body, staging)
+        for item in data["items"]:
+            project_path = os.path.join(dest, item["project_name"])
+            os.makedirs(project_path)
+            get.write_files(project_path, item["files"])
+    finally:
+        shutil.rmtree(staging)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--problems", type=int, default=12)
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--size", type=int, default=64 * 1024, help="Approximate bytes per file")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as problems_dir:
+        make_module(problems_dir, args.problems, args.files, args.size)
+        server = devserver.start_in_thread(problems_dir=problems_dir)
+        try:
+            results = {}
+            for label, accept in (("json", "application/json"), ("zip", get.ACCEPT)):
+                body = fetch(server.url, accept)
+                best = None
+                for _ in range(args.rounds):
+                    with tempfile.TemporaryDirectory() as dest:
+                        elapsed = extract(body, dest)
+                    best = elapsed if best is None else min(best, elapsed)
+                results[label] = (len(body.body), best)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print(f"Module of {args.problems} problems x {args.files + 2} files x ~{args.size} bytes, best of {args.rounds}")
+    for label, (nbytes, elapsed) in results.items():
+        print(f"{label:<5} {nbytes:>12,} bytes transferred  {elapsed * 1000:8.1f} ms to extract")
+    json_bytes, json_time = results["json"]
+    zip_bytes, zip_time = results["zip"]
+    print(f"zip   {json_bytes / max(1, zip_bytes):>11.2f}x fewer bytes, {json_time / max(1e-9, zip_time):.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cold-start benchmark for the jasper entry point.
+
+Runs `jasper version`, `jasper explain` and `jasper --help` in fresh
+interpreters and compares the lazy command registry against the old
+behaviour of importing every command module up front.
+
+    python benchmarks/startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("version", ["version"]),
+    ("explain", ["explain"]),
+    ("--help", ["--help"]),
+]
+
+LAZY = (
+    "import sys\n"
+    "from jasper.jasper import main\n"
+    "try:\n"
+    "    main(sys.argv[1:])\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+
+# What jasper.py did before the lazy registry: import every command first.
+EAGER = (
+    "import importlib\n"
+    "from jasper.jasper import COMMANDS\n"
+    "for _name, module, _help in COMMANDS:\n"
+    "    importlib.import_module(module)\n"
+) + LAZY
+
+
+def _time_once(script, argv, cwd, env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", script, *argv],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def _median(script, argv, runs, cwd, env):
+    return statistics.median(_time_once(script, argv, cwd, env) for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15, help="Runs per case (median is reported)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+
+    with tempfile.TemporaryDirectory() as cwd:
+        baseline = _median("pass", [], args.runs, cwd, env)
+        print(f"{'command':<10} {'eager ms':>10} {'lazy ms':>10} {'saved':>8}")
+        for label, argv in CASES:
+            eager = _median(EAGER, argv, args.runs, cwd, env)
+            lazy = _median(LAZY, argv, args.runs, cwd, env)
+            print(f"{label:<10} {eager:>10.1f} {lazy:>10.1f} {eager - lazy:>7.1f}")
+        print(f"(bare interpreter start: {baseline:.1f} ms, median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
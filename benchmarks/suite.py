@@ -0,0 +1,321 @@
+"""
+Benchmark suite for the CLI's hot paths, with machine-readable results.
+
+Covers startup of `jasper.jasper:main`, `zip_folder` on trees of different
+shapes, `check.pretty_print` on large results, `get.write_files` on a large
+module, and end-to-end `check`/`submit` against the in-process stand-in
+grader. Results are written as JSON; pass an earlier file to --compare to
+see what got slower.
+
+    python benchmarks/suite.py [--rounds N] [--only SUBSTR] [--output FILE] [--compare OLD.json]
+"""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from jasper import devserver, workspace  # noqa: E402
+from jasper.commands import check, get, submit  # noqa: E402
+from jasper.jasper import main as jasper_main  # noqa: E402
+from jasper.utils import zip_folder  # noqa: E402
+
+SCHEMA = 1
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+
+def sample(fn, rounds):
+    """Run fn `rounds` times (after one untimed warm-up) and return milliseconds per run."""
+    fn()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def measurement(name, samples, **extra):
+    return {
+        "name": name,
+        "unit": "ms",
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples,
+        **extra,
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def chdir(path):
+    old = os.getcwd()
+    os.chdir(path)
+    workspace.reset()
+    try:
+        yield
+    finally:
+        os.chdir(old)
+        workspace.reset()
+
+
+def _write_text(path, size, rng):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        written = 0
+        while written < size:
+            line = f"int v_{written} = {rng.randrange(1 << 30)};\n"
+            f.write(line)
+            written += len(line)
+
+
+# --- startup ---
+
+def _run_main(argv):
+    with quiet():
+        try:
+            jasper_main(argv)
+        except SystemExit:
+            pass
+
+
+@benchmark("startup")
+def bench_startup(ctx):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    script = "import sys\nfrom jasper.jasper import main\ntry:\n    main(sys.argv[1:])\nexcept SystemExit:\n    pass\n"
+    results = []
+    for label, argv in (("version", ["version"]), ("help", ["--help"])):
+        cold = sample(
+            lambda: subprocess.run([sys.executable, "-c", script, *argv], cwd=ctx.tmp, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False),
+            ctx.rounds,
+        )
+        results.append(measurement(f"startup.cold.{label}", cold))
+        warm = sample(lambda: _run_main(argv), ctx.rounds * 4)
+        results.append(measurement(f"startup.warm.{label}", warm))
+    return results
+
+
+# --- zip_folder ---
+
+def _tree_many_small(root, rng):
+    for i in range(1500):
+        _write_text(os.path.join(root, "src", f"f{i:04d}.c"), 2048, rng)
+
+
+def _tree_few_large(root, rng):
+    for i in range(3):
+        _write_text(os.path.join(root, "tests", f"case{i}.in"), 6 * 1024 * 1024, rng)
+
+
+def _tree_deep(root, rng):
+    for i in range(400):
+        parts = [f"d{(i >> shift) & 3}" for shift in range(0, 16, 2)]
+        _write_text(os.path.join(root, *parts, f"f{i}.c"), 1024, rng)
+
+
+def _tree_binary(root, rng):
+    os.makedirs(os.path.join(root, "data"))
+    for i in range(150):
+        with open(os.path.join(root, "data", f"blob{i}.bin"), "wb") as f:
+            f.write(rng.randbytes(64 * 1024))
+
+
+@benchmark("zip_folder")
+def bench_zip_folder(ctx):
+    results = []
+    for shape, build in (("many_small", _tree_many_small), ("few_large", _tree_few_large),
+                         ("deep", _tree_deep), ("binary", _tree_binary)):
+        root = os.path.join(ctx.tmp, f"zip-{shape}")
+        build(root, random.Random(shape))
+        total = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+        outputs = []
+        samples = sample(lambda: outputs.append(zip_folder(root)), ctx.rounds)
+        zipped = os.path.getsize(outputs[-1])
+        for path in set(outputs):
+            os.remove(path)
+        results.append(measurement(
+            f"zip_folder.{shape}", samples,
+            input_bytes=total, output_bytes=zipped,
+            mb_per_s=total / (1024 * 1024) / (statistics.median(samples) / 1000),
+        ))
+    return results
+
+
+# --- check.pretty_print ---
+
+def _large_result(rng):
+    tests = []
+    for i in range(200):
+        expected = "".join(f"{i}:{j} {rng.randrange(1000)}\n" for j in range(2000 if i % 20 == 0 else 20))
+        passed = i % 7 != 0
+        actual = expected if passed else expected[: len(expected) // 2] + "oops\n" * 50000
+        tests.append({"test": f"test {i}", "type": "io", "passed": passed, "points": 1,
+                      "expected": expected, "actual": actual})
+    return {"passed": False, "tests": tests}
+
+
+@benchmark("pretty_print")
+def bench_pretty_print(ctx):
+    result = _large_result(random.Random(1))
+    size = len(json.dumps(result))
+    folder = os.path.join(ctx.tmp, "pp")
+    os.makedirs(folder)
+    with chdir(folder), quiet():
+        samples = sample(lambda: check.pretty_print(result, final=False), ctx.rounds)
+        samples_bytes = sample(lambda: check.pretty_print(result, final=False, show_bytes=True), ctx.rounds)
+    return [
+        measurement("pretty_print.large", samples, payload_bytes=size),
+        measurement("pretty_print.large_bytes", samples_bytes, payload_bytes=size),
+    ]
+
+
+# --- get.write_files ---
+
+@benchmark("write_files")
+def bench_write_files(ctx):
+    rng = random.Random(2)
+    files = {}
+    for p in range(40):
+        for i in range(10):
+            data = "".join(f"line {p} {i} {rng.randrange(1 << 20)}\n" for _ in range(800)).encode()
+            files[f"p{p:02d}/src/f{i}.c"] = {"content_base64": base64.b64encode(data).decode()}
+    total = sum(len(base64.b64decode(v["content_base64"])) for v in files.values())
+    dest = os.path.join(ctx.tmp, "write-files")
+    os.makedirs(dest)
+    counter = iter(range(1 << 30))
+    with quiet():
+        samples = sample(lambda: get.write_files(os.path.join(dest, str(next(counter))), files), ctx.rounds)
+    return [measurement("write_files.module", samples, files=len(files), bytes=total)]
+
+
+# --- end to end against the stand-in grader ---
+
+def _make_workspace(root, server_url):
+    os.makedirs(os.path.join(root, ".devcontainer"))
+    os.makedirs(os.path.join(root, "jasper"))
+    with open(os.path.join(root, "jasper", "config.json"), "w") as f:
+        json.dump({"server_url": server_url, "student_id": "bench-user"}, f)
+    problem = os.path.join(root, "101-bench")
+    rng = random.Random(3)
+    for i in range(40):
+        _write_text(os.path.join(problem, f"src_{i:02d}.c"), 8192, rng)
+    return problem
+
+
+@benchmark("end_to_end")
+def bench_end_to_end(ctx):
+    server = devserver.start_in_thread()
+    try:
+        problem = _make_workspace(os.path.join(ctx.tmp, "e2e"), server.url)
+        with chdir(problem), quiet():
+            check_samples = sample(lambda: check.run_tests(announce_request=False), ctx.rounds)
+            submit_samples = sample(lambda: submit.run(types.SimpleNamespace()), ctx.rounds)
+        uploaded = sum(server.state.stats()["bytes_in"].values())
+    finally:
+        server.shutdown()
+        server.server_close()
+    return [
+        measurement("end_to_end.check", check_samples),
+        measurement("end_to_end.submit", submit_samples, total_bytes_uploaded=uploaded),
+    ]
+
+
+# --- driver ---
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=False).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit or None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a baseline; returns the names that regressed past threshold (%)."""
+    with open(baseline_path) as f:
+        baseline = {m["name"]: m for m in json.load(f)["results"]}
+    regressed = []
+    print(f"\n{'benchmark':<28} {'old ms':>10} {'new ms':>10} {'change':>8}")
+    for m in results:
+        old = baseline.get(m["name"])
+        if old is None:
+            continue
+        change = (m["median"] - old["median"]) / old["median"] * 100 if old["median"] else 0.0
+        flag = "  <-- slower" if change > threshold else ""
+        print(f"{m['name']:<28} {old['median']:>10.2f} {m['median']:>10.2f} {change:>+7.1f}%{flag}")
+        if flag:
+            regressed.append(m["name"])
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="Timed runs per benchmark (median is reported)")
+    parser.add_argument("--only", default=None, help="Run only benchmarks whose name contains this")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--compare", default=None, metavar="OLD.json", help="Compare against an earlier --output")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="With --compare, exit 1 if any median is this many percent slower (default 10)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the user's real caches (history, starter code) out of it.
+        os.environ["XDG_CACHE_HOME"] = os.path.join(tmp, "cache")
+        for name, fn in BENCHMARKS:
+            if args.only and args.only not in name:
+                continue
+            ctx = types.SimpleNamespace(tmp=os.path.join(tmp, name), rounds=args.rounds)
+            os.makedirs(ctx.tmp)
+            for m in fn(ctx):
+                results.append(m)
+                print(f"{m['name']:<28} {m['median']:>10.2f} ms  (min {m['min']:.2f}, max {m['max']:.2f})",
+                      file=sys.stderr if args.output == "-" else sys.stdout)
+
+    report = {"schema": SCHEMA, "environment": environment(), "rounds": args.rounds, "results": results}
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import io
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from jasper import ignore, timings
+
+CHUNK_SIZE = 64 * 1024
+
+# Members up to this size are read whole and compressed on the worker pool;
+# anything bigger is streamed in order so memory stays bounded.
+PARALLEL_LIMIT = 4 * 1024 * 1024
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+DEFLATE_LEVEL = 6
+# Big members are usually test data; a fast level keeps them from
+# dominating build time for little loss in ratio.
+LARGE_DEFLATE_LEVEL = 1
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# Already-compressed formats: deflating them again only burns CPU.
+STORED_SUFFIXES = {
+    ".7z", ".bz2", ".gif", ".gz", ".jar", ".jpeg", ".jpg", ".mp3", ".mp4",
+    ".pdf", ".png", ".tgz", ".webp", ".whl", ".xz", ".zip", ".zst",
+}
+
+_MAX_16 = 0xFFFF
+_MAX_32 = 0xFFFFFFFF
+# Sizes, offsets and member counts past these need Zip64 records.
+ZIP64_LIMIT = _MAX_32
+ZIP64_COUNT_LIMIT = _MAX_16
+_VERSION = 20
+_ZIP64_VERSION = 45
+_UTF8_FLAG = 0x800
+_DESCRIPTOR_FLAG = 0x08
+
+
+def iter_files(folder_path):
+    """Yield (full_path, arcname) for every file under folder_path that the ignore rules keep."""
+    return ignore.iter_included(folder_path)
+
+
+def choose_method(arcname, head):
+    """Store compressed formats and binary blobs, deflate everything else."""
+    if os.path.splitext(arcname)[1].lower() in STORED_SUFFIXES:
+        return ZIP_STORED
+    if b"\0" in head[:8192]:
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def _dos_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    year = max(1980, year)
+    return (
+        (hour << 11) | (minute << 5) | (second // 2),
+        ((year - 1980) << 9) | (month << 5) | day,
+    )
+
+
+class _Member:
+    __slots__ = ("arcname", "date_time", "mode", "method", "crc", "csize", "usize", "payload")
+
+    def __init__(self, arcname, date_time, mode):
+        self.arcname = arcname
+        self.date_time = date_time
+        self.mode = mode
+        self.method = ZIP_STORED
+        self.crc = 0
+        self.csize = 0
+        self.usize = 0
+        self.payload = None
+
+
+class _ZipWriter:
+    # Emits local headers as members go out and the central directory at the
+    # end, switching to Zip64 records for whatever does not fit in 32 bits.
+    def __init__(self):
+        self.offset = 0
+        self.records = []
+
+    def _emit(self, data):
+        self.offset += len(data)
+        return data
+
+    def local_header(self, member, descriptor=False, zip64=False):
+        """
+        With descriptor, CRC and sizes follow the data (see descriptor());
+        zip64 then announces 8-byte sizes there.
+        """
+        name = member.arcname.replace(os.sep, "/").encode("utf-8")
+        flags = _UTF8_FLAG if not member.arcname.isascii() else 0
+        if descriptor:
+            flags |= _DESCRIPTOR_FLAG
+            crc, csize, usize = 0, 0, 0
+        else:
+            crc, csize, usize = member.crc, member.csize, member.usize
+            zip64 = zip64 or csize > ZIP64_LIMIT or usize > ZIP64_LIMIT
+        self.records.append((member, name, flags, self.offset))
+        extra = b""
+        if zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, usize, csize)
+            csize = usize = _MAX_32
+        dostime, dosdate = _dos_time(member.date_time)
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50, _ZIP64_VERSION if zip64 else _VERSION, flags, member.method, dostime, dosdate,
+            crc, csize, usize, len(name), len(extra),
+        )
+        return self._emit(header + name + extra)
+
+    def data(self, chunk):
+        return self._emit(chunk)
+
+    def descriptor(self, member, zip64=False):
+        if zip64:
+            return self._emit(struct.pack("<IIQQ", 0x08074B50, member.crc, member.csize, member.usize))
+        if member.csize > ZIP64_LIMIT or member.usize > ZIP64_LIMIT:
+            raise OSError(f"{member.arcname} grew past 4 GiB while it was being packaged.")
+        return self._emit(struct.pack("<IIII", 0x08074B50, member.crc, member.csize, member.usize))
+
+    def finish(self):
+        start = self.offset
+        central = []
+        for member, name, flags, offset in self.records:
+            usize, csize = member.usize, member.csize
+            wide = []  # Zip64 extra values, in the order the format requires
+            if usize > ZIP64_LIMIT:
+                wide.append(usize)
+                usize = _MAX_32
+            if csize > ZIP64_LIMIT:
+                wide.append(csize)
+                csize = _MAX_32
+            if offset > ZIP64_LIMIT:
+                wide.append(offset)
+                offset = _MAX_32
+            extra = struct.pack(f"<HH{len(wide)}Q", 0x0001, 8 * len(wide), *wide) if wide else b""
+            version = _ZIP64_VERSION if wide else _VERSION
+            dostime, dosdate = _dos_time(member.date_time)
+            central.append(struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50, (3 << 8) | version, version, flags, member.method, dostime, dosdate,
+                member.crc, csize, usize, len(name), len(extra), 0, 0, 0,
+                (member.mode & 0xFFFF) << 16, offset,
+            ) + name + extra)
+        directory = b"".join(central)
+        count, size = len(self.records), len(directory)
+
+        zip64_end = b""
+        if count > ZIP64_COUNT_LIMIT or size > ZIP64_LIMIT or start > ZIP64_LIMIT:
+            record_offset = start + size
+            zip64_end = struct.pack(
+                "<IQHHIIQQQQ",
+                0x06064B50, 44, (3 << 8) | _ZIP64_VERSION, _ZIP64_VERSION, 0, 0,
+                count, count, size, start,
+            ) + struct.pack("<IIQI", 0x07064B50, 0, record_offset, 1)
+            count = min(count, _MAX_16)
+            size = min(size, _MAX_32)
+            start = min(start, _MAX_32)
+        end = struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, size, start, 0)
+        return self._emit(directory + zip64_end + end)
+
+
+def _compress_small(entry):
+    # Runs on the worker pool; zlib releases the GIL while it compresses.
+    arcname, opener, date_time, mode = entry
+    with opener() as f:
+        data = f.read(PARALLEL_LIMIT + 1)
+    if len(data) > PARALLEL_LIMIT:
+        return None
+
+    member = _Member(arcname, date_time, mode)
+    member.crc = zlib.crc32(data)
+    member.usize = len(data)
+    member.payload = data
+    if choose_method(arcname, data) == ZIP_DEFLATED:
+        compressor = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15)
+        packed = compressor.compress(data) + compressor.flush()
+        if len(packed) < len(data):
+            member.method = ZIP_DEFLATED
+            member.payload = packed
+    member.csize = len(member.payload)
+    return member
+
+
+def _file_size(f):
+    try:
+        return os.fstat(f.fileno()).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _stream_stored(writer, member, f, block, chunk_size):
+    # Streaming unzippers cannot find the end of a stored member from a data
+    # descriptor, so read the file once for its CRC and size, then send it.
+    while block:
+        member.crc = zlib.crc32(block, member.crc)
+        member.usize += len(block)
+        block = f.read(chunk_size)
+    member.csize = member.usize
+    yield writer.local_header(member)
+    f.seek(0)
+    crc, sent = 0, 0
+    while sent < member.usize:
+        block = f.read(min(chunk_size, member.usize - sent))
+        if not block:
+            break
+        crc = zlib.crc32(block, crc)
+        sent += len(block)
+        yield writer.data(block)
+    if (crc, sent) != (member.crc, member.usize) or f.read(1):
+        raise OSError(f"{member.arcname} changed while it was being packaged; try again.")
+
+
+def _stream_large(writer, entry, chunk_size):
+    # In-order path for big members. Deflated ones go out in one pass with
+    # sizes and CRC in a data descriptor.
+    arcname, opener, date_time, mode = entry
+    member = _Member(arcname, date_time, mode)
+    with opener() as f:
+        block = f.read(chunk_size)
+        member.method = choose_method(arcname, block)
+        if member.method == ZIP_STORED:
+            yield from _stream_stored(writer, member, f, block, chunk_size)
+            return
+        size = _file_size(f)
+        # Deflate can grow incompressible data slightly; leave room for that.
+        zip64 = size is None or size + (size >> 10) + 64 > ZIP64_LIMIT
+        compressor = zlib.compressobj(LARGE_DEFLATE_LEVEL, zlib.DEFLATED, -15)
+        yield writer.local_header(member, descriptor=True, zip64=zip64)
+        while block:
+            member.crc = zlib.crc32(block, member.crc)
+            member.usize += len(block)
+            out = compressor.compress(block)
+            if out:
+                member.csize += len(out)
+                yield writer.data(out)
+            block = f.read(chunk_size)
+        out = compressor.flush()
+        member.csize += len(out)
+        yield writer.data(out)
+    yield writer.descriptor(member, zip64=zip64)
+
+
+def _emit(writer, entry, future, chunk_size):
+    member = future.result()
+    if member is None:
+        yield from _stream_large(writer, entry, chunk_size)
+        return
+    yield writer.local_header(member) + writer.data(member.payload)
+
+
+def stream_entries(entries, chunk_size=CHUNK_SIZE, workers=DEFAULT_WORKERS):
+    """
+    Zip entries incrementally, yielding archive bytes as they are produced.
+
+    Args:
+        entries: Iterable of (arcname, opener, date_time, mode), where opener
+            is a zero-arg callable returning a binary file object and
+            date_time is a (Y, M, D, h, m, s) tuple.
+        workers (int): Threads compressing members ahead of the writer.
+
+    Members are compressed in parallel but written in order; only a small
+    window of members is held in memory at a time.
+    """
+    writer = _ZipWriter()
+    window = max(1, workers) * 2
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque()
+        for entry in entries:
+            pending.append((entry, pool.submit(_compress_small, entry)))
+            if len(pending) >= window:
+                yield from _emit(writer, *pending.popleft(), chunk_size)
+        while pending:
+            yield from _emit(writer, *pending.popleft(), chunk_size)
+    yield writer.finish()
+
+
+def file_entry(full_path, arcname):
+    st = os.stat(full_path)
+    return arcname, partial(open, full_path, "rb"), time.localtime(st.st_mtime)[:6], st.st_mode
+
+
+def stream_archive(folder_path, chunk_size=CHUNK_SIZE, workers=DEFAULT_WORKERS, files=None):
+    """
+    Zip a folder incrementally, yielding archive bytes as they are produced.
+
+    Nothing is written to disk, so the first bytes can be on the wire while
+    later files are still being read and compressed.
+
+    Args:
+        files: (full_path, arcname) pairs to pack, e.g. an ignore.Selection's
+            `included`; the folder is walked when omitted.
+    """
+    if files is None:
+        files = iter_files(folder_path)
+    entries = (file_entry(full_path, arcname) for full_path, arcname in files)
+    return stream_entries(entries, chunk_size, workers)
+
+
+@timings.timed("archive")
+def build_archive(folder_path, files=None):
+    """
+    Zip a folder in memory and return the archive as bytes.
+
+    The bytes are a snapshot: every upload that reuses them sees the same
+    files, even if the folder changes afterwards.
+    """
+    return b"".join(stream_archive(folder_path, files=files))
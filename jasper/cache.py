@@ -0,0 +1,105 @@
+"""
+Content-addressed cache of `jasper check` results under `.jasper/cache/`.
+
+A result is keyed by a hash of the problem's source tree together with the
+test index, server URL and problem id, so re-running `check` on unchanged
+code answers instantly instead of costing a compile slot on the grader.
+
+Instructors fix and change tests on the server, which the key cannot see,
+so a result is only trusted for MAX_AGE seconds after it was fetched.
+"""
+import hashlib
+import json
+import os
+import time
+
+from jasper.delta import _archive_entries, _folder_entries, build_manifest
+
+CACHE_DIR = os.path.join(".jasper", "cache")
+MAX_ENTRIES = 64
+MAX_BYTES = 8 * 1024 * 1024
+MAX_AGE = 60 * 60
+
+def tree_hash(folder_path=".", files=None, archive=None):
+    """
+    Hash of every packaged file's path and content. jasper's own state and
+    anything else the ignore rules leave out does not count.
+
+    Args:
+        files (list): (full_path, arcname) pairs already selected in folder_path.
+        archive (bytes): A build_archive() snapshot to hash instead of the folder.
+    """
+    entries = _archive_entries(archive) if archive is not None else _folder_entries(folder_path, files)
+    manifest, _ = build_manifest(entries)
+    canonical = json.dumps(sorted((p, f["sha256"]) for p, f in manifest.items()))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def result_key(tree, test_index, server_url, problem_id):
+    parts = [tree, str(test_index or ""), (server_url or "").rstrip("/"), str(problem_id)]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def lookup(key, cache_dir=CACHE_DIR, max_age=MAX_AGE):
+    """
+    Returns:
+        tuple: (result, time it was stored), or None if there is no entry
+        for key or it is older than max_age seconds.
+    """
+    path = _entry_path(key, cache_dir)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        stored_at = float(entry["stored_at"])
+        result = entry["result"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not 0 <= time.time() - stored_at <= max_age:
+        return None
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        pass
+    return result, stored_at
+
+
+def store(key, result, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(key, cache_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"stored_at": time.time(), "result": result}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    evict(cache_dir)
+
+
+def evict(cache_dir=CACHE_DIR, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+    """Drop least recently used entries until the cache fits both limits."""
+    entries = []
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    while entries and (len(entries) > max_entries or total > max_bytes):
+        _, size, path = entries.pop(0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
@@ -0,0 +1,247 @@
+import random
+import threading
+import time
+import uuid
+from functools import partial
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from jasper import timings
+
+# (connect, read) timeouts in seconds, per endpoint.
+TIMEOUTS = {
+    "/check": (5, 180),
+    "/crit": (5, 300),
+    "/submit": (5, 120),
+    "/relay": (5, 60),
+    "/get-problem": (5, 20),
+    "/history": (5, 20),
+    "/ping": (5, 10),
+    "/api/healthz": (4, 4),
+}
+DEFAULT_TIMEOUT = (5, 30)
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5     # seconds; doubled per attempt before jitter
+BACKOFF_CAP = 10.0
+RETRY_AFTER_CAP = 30.0  # a longer server hint is reported, not waited out
+
+# Statuses whose Retry-After hint is honoured.
+BUSY_STATUSES = {429, 503}
+# Rate limiting happens before the app sees the request: safe for any method.
+NOT_PROCESSED_STATUSES = {429}
+# A 503 may come from a proxy after the app accepted the request, and gateway
+# failures may or may not have reached it: idempotent calls only.
+RETRY_STATUSES = BUSY_STATUSES | {502, 504}
+
+POOL_MAXSIZE = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _new_session(pool_maxsize):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """Process-wide pooled session, so repeated calls reuse keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _new_session(POOL_MAXSIZE)
+    return _session
+
+
+def resize_pool(pool_maxsize):
+    """
+    Replace the shared session with one keeping up to pool_maxsize
+    connections per host, for callers with that many requests in flight.
+    """
+    global _session
+    with _session_lock:
+        old, _session = _session, _new_session(max(pool_maxsize, POOL_MAXSIZE))
+    if old is not None:
+        old.close()
+
+
+def url_for(base_url, path):
+    return f"{(base_url or '').rstrip('/')}{path}"
+
+
+def _retry_after(resp):
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff(attempt):
+    # Full jitter: clients that failed together should not retry together.
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(method, base_url, path, idempotent=None, timeout=None, retries=MAX_RETRIES, **kwargs):
+    """
+    Send a request to the grading server through the shared session.
+
+    Args:
+        method (str): HTTP method.
+        base_url (str): Server URL from the config (trailing slash allowed).
+        path (str): Endpoint path, e.g. "/check". Also selects the timeout.
+        idempotent (bool): Whether network errors, 503s and gateway failures
+            may be retried. Defaults to True for GET/HEAD/OPTIONS; 429 and
+            connect timeouts are retried regardless.
+        timeout: Override for the (connect, read) timeout.
+        retries (int): How many times to retry at most. 0 sends exactly one
+            request, for probes whose point is whether the server answers now.
+        **kwargs: Passed through to requests (data, files, json, params, ...).
+            Bodies must be re-sendable (bytes, not open files) to be retried;
+            `data` may also be a zero-arg callable that builds a fresh body
+            for each attempt.
+
+    Returns:
+        requests.Response: The final response. Raises requests exceptions
+        once retries are exhausted.
+    """
+    if idempotent is None:
+        idempotent = method.upper() in ("GET", "HEAD", "OPTIONS")
+    if timeout is None:
+        timeout = TIMEOUTS.get(path, DEFAULT_TIMEOUT)
+    url = url_for(base_url, path)
+
+    if not timings.enabled():
+        return _send(method, url, idempotent, timeout, retries, kwargs)
+    with timings.span(f"{method.upper()} {path}") as sp:
+        resp = _send(method, url, idempotent, timeout, retries, kwargs)
+        # elapsed stops when the headers arrive: roughly the server's own time.
+        sp.set(status=resp.status_code, ttfb_ms=round(resp.elapsed.total_seconds() * 1000, 1))
+    return resp
+
+
+def _send(method, url, idempotent, timeout, retries, kwargs):
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        send = kwargs
+        if callable(kwargs.get("data")):
+            send = dict(kwargs, data=kwargs["data"]())
+        try:
+            resp = get_session().request(method, url, timeout=timeout, **send)
+        except requests.exceptions.ConnectTimeout:
+            # Nothing was sent, so even a POST is safe to repeat.
+            if last:
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last or not idempotent:
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+
+        retryable = RETRY_STATUSES if idempotent else NOT_PROCESSED_STATUSES
+        if resp.status_code not in retryable or last:
+            return resp
+
+        delay = _retry_after(resp) if resp.status_code in BUSY_STATUSES else None
+        if delay is not None and delay > RETRY_AFTER_CAP:
+            # Retrying early would only add load; let the caller report it.
+            print(f"⏳ Server busy (HTTP {resp.status_code}); it asks to wait {delay:.0f}s. "
+                  "Please try again later.", flush=True)
+            return resp
+        if delay is None:
+            delay = _backoff(attempt)
+        print(f"⏳ Server busy (HTTP {resp.status_code}); retrying in {delay:.0f}s…", flush=True)
+        resp.close()
+        time.sleep(delay)
+
+
+def get(base_url, path, **kwargs):
+    return request("GET", base_url, path, **kwargs)
+
+
+def post(base_url, path, **kwargs):
+    return request("POST", base_url, path, **kwargs)
+
+
+def _multipart_body(boundary, fields, chunks, filename, content_type):
+    for name, value in fields.items():
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode()
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    for chunk in chunks:
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def upload(base_url, path, fields, archive, filename="submission.zip", resume=True, size_hint=None, **kwargs):
+    """
+    POST form fields plus a zip archive as multipart/form-data.
+
+    Args:
+        archive: Either the archive bytes, or a zero-arg callable returning an
+            iterator of archive chunks (e.g. `archive.stream_archive`). Chunks
+            are streamed with chunked transfer encoding as they are produced;
+            the callable is invoked again if the request has to be resent.
+        resume (bool): Send large archives as a resumable chunked upload when
+            the server supports it (see jasper.resumable).
+        size_hint (int): Expected size of a streamed archive, e.g. the total
+            size of the files going into it. Streamed archives are only
+            spooled for a resumable upload when this reaches
+            resumable.RESUMABLE_MIN; otherwise they stream as they are built.
+    """
+    if resume:
+        from jasper import resumable
+
+        size = len(archive) if isinstance(archive, (bytes, bytearray)) else size_hint
+        if size is not None and size >= resumable.RESUMABLE_MIN and resumable.supported(base_url):
+            f, sha256, size = resumable.spool(archive)
+            with f:
+                resp = None
+                if size >= resumable.RESUMABLE_MIN:  # compression may have brought it under
+                    resp = resumable.upload(base_url, path, fields, f, sha256, size, filename, **kwargs)
+                if resp is None:
+                    resp = upload(base_url, path, fields, partial(resumable.read_chunks, f),
+                                  filename, resume=False, **kwargs)
+            return resp
+
+    if isinstance(archive, (bytes, bytearray)):
+        files = {"file": (filename, archive, "application/zip")}
+        return post(base_url, path, data=fields, files=files, **kwargs)
+
+    boundary = uuid.uuid4().hex
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+    resp = post(
+        base_url,
+        path,
+        data=lambda: _multipart_body(boundary, fields, archive(), filename, "application/zip"),
+        headers=headers,
+        **kwargs,
+    )
+    if resp.status_code == 411:
+        # Server refuses chunked bodies: fall back to a sized upload.
+        resp.close()
+        return upload(base_url, path, fields, b"".join(archive()), filename, resume=False, **kwargs)
+    return resp
@@ -1,45 +1,90 @@
-import os, requests, json
-from jasper.utils import load_config, zip_folder, format_text
+import os, re, requests, json, time
+from concurrent.futures import ThreadPoolExecutor
+from jasper import cache, delta, ignore, results, timings, workspace
+from jasper.diff import is_small, write_head, write_mismatch
+from jasper.utils import load_config, format_text, run_in_background
 
-def run_tests(test_index=None, announce_request=True):
+PROBLEM_FOLDER_RE = re.compile(r"^\d+-")
+
+def run_tests(test_index=None, announce_request=True, archive=None, use_cache=False, refresh=False,
+              folder_path=None, quiet=False, tree=None):
+    """
+    Upload a problem folder to /check and return the decoded result.
+
+    folder_path defaults to the current directory; quiet silences progress
+    messages (used when checking many folders at once). tree is the
+    cache.tree_hash() of what is uploaded, if the caller already has it.
+    """
+    say = (lambda *a, **k: None) if quiet else print
     config = load_config()
-    folder_name = os.path.basename(os.getcwd())
-    if "-" not in folder_name:
+    if folder_path is None:
+        folder_path = "."
+        problem_id = workspace.resolve().problem_id
+    else:
+        name = os.path.basename(os.path.abspath(folder_path))
+        problem_id = name.split("-")[0] if "-" in name else None
+    if problem_id is None:
         raise ValueError("❌ Could not infer problem ID from folder name. Use format like `132-hello-world`.")
-    problem_id = folder_name.split("-")[0]
     if test_index is not None and test_index < 1:
         raise ValueError("❌ Test number must be at least 1.")
 
-    zip_path = zip_folder(".")
-    with open(zip_path, "rb") as f:
-        files = {"file": f}
-        data = {
-            "student_id": config["student_id"],
-            "problem_id": problem_id,
-        }
+    data = {
+        "student_id": config["student_id"],
+        "problem_id": problem_id,
+    }
+    if test_index is not None:
+        data["test_index"] = str(test_index)
+
+    if tree is None:
+        with timings.span("hash tree"):
+            tree = cache.tree_hash(folder_path, archive=archive)
+
+    cache_key = None
+    if use_cache:
+        cache_dir = os.path.join(folder_path, cache.CACHE_DIR)
+        with timings.span("cache lookup"):
+            cache_key = cache.result_key(tree, test_index, config["server_url"], problem_id)
+            cached = None if refresh else cache.lookup(cache_key, cache_dir)
+        if cached is not None:
+            result, stored_at = cached
+            say(
+                f"⚡ No changes since the last check; showing its result from "
+                f"{time.strftime('%H:%M', time.localtime(stored_at))} (use --refresh to re-run)."
+            )
+            return result
+
+    selection = None
+    if archive is None:
+        with timings.span("ignore rules"):
+            selection = ignore.preflight(folder_path, say)
+
+    if announce_request:
         if test_index is not None:
-            data["test_index"] = str(test_index)
-
-        if announce_request:
-            if test_index is not None:
-                print(
-                    f"Sending check request to the grading server (single test: {test_index})…",
-                    flush=True,
-                )
-            else:
-                print("Sending check request to the grading server…", flush=True)
-
-        response = requests.post(f"{config['server_url']}/check", data=data, files=files)
+            say(
+                f"Sending check request to the grading server (single test: {test_index})…",
+                flush=True,
+            )
+        else:
+            say("Sending check request to the grading server…", flush=True)
+
+    try:
+        with timings.span("upload /check"):
+            response = delta.upload(config["server_url"], "/check", data, folder_path=folder_path, archive=archive,
+                                    selection=selection)
+    except requests.RequestException as e:
+        say(f"❌ Could not reach the grading server: {e}")
+        return None
     try:
         if response.status_code == 200:
-            print("Server successfully compiled and tested your code.")
+            say("Server successfully compiled and tested your code.")
         else:
-            print("❌ Server could not compile your code.\nMake sure ``make`` works locally before asking jasper to check again.\n --- LOG ---")
-        return response.json()
+            say("❌ Server could not compile your code.\nMake sure ``make`` works locally before asking jasper to check again.\n --- LOG ---")
+        with timings.span("decode JSON", bytes=len(response.content)):
+            result = response.json()
     except Exception:
-        print("❌ Server response was not valid JSON.")
-        print("Status code:", response.status_code)
-        print("Response text:", response.text)
+        say("❌ Server response was not valid JSON.")
+        say("Status code:", response.status_code)
+        say("Response text:", response.text)
         return {
             "passed": False,
             "error": "Could not decode server response.",
@@ -47,12 +92,222 @@ def run_tests(test_index=None, announce_request=True):
             "response_text": response.text
         }
 
+    with timings.span("record result"):
+        results.record("check", result, tree, folder_path, test_index=test_index)
+    if cache_key is not None and response.status_code == 200:
+        try:
+            cache.store(cache_key, result, cache_dir)
+        except OSError as e:
+            say(f"⚠️ Could not cache check result: {e}")
+    return result
+
+def run_local_tests(test_index=None, folder_path=".", tree=None):
+    """
+    Build and run the folder's meta.json tests on this machine instead of
+    the grader. Returns a result for pretty_print, or None if nothing ran.
+    """
+    from jasper.localrun import LocalRunError, run_local
+
+    print("🖥️ Building and running the tests on this machine…", flush=True)
+    try:
+        with timings.span("local tests"):
+            result = run_local(folder_path, test_index)
+    except LocalRunError as e:
+        print(e)
+        return None
+    results.record("local", result, tree or cache.tree_hash(folder_path), folder_path, test_index=test_index)
+    if result["server_only"]:
+        print(f"ℹ️ {result['server_only']} test(s) of other types only run on the server.")
+    return result
+
+def _watch_checks(args):
+    from jasper.watch import Watcher
+
+    watcher = Watcher(".")
+    mode = "inotify" if watcher.uses_inotify else "polling"
+    print(f"👀 Watching {os.getcwd()} for changes ({mode}). Press Ctrl+C to stop.")
+
+    # One check at a time: edits saved while one runs are coalesced into a
+    # single re-check once it finishes, rather than stacking up uploads.
+    last_tree = None
+    current = None
+    dirty = False
+    try:
+        while True:
+            if current is None:
+                try:
+                    tree = cache.tree_hash(".")
+                except OSError as e:
+                    # A file vanished mid-save; the editor's next event brings us back.
+                    print(f"⚠️ Could not read the folder: {e}")
+                    tree = last_tree
+                if tree != last_tree:
+                    last_tree = tree
+                    print()
+                    print(format_text(f"── {time.strftime('%H:%M:%S')} checking ──", bold=True))
+                    if args.local:
+                        current = run_in_background(run_local_tests, test_index=args.test, tree=tree)
+                    else:
+                        current = run_in_background(
+                            run_tests,
+                            test_index=args.test,
+                            use_cache=not args.no_cache,
+                            refresh=args.refresh,
+                            tree=tree,
+                        )
+
+            if current is not None and current.done():
+                try:
+                    result = current.result()
+                except (ValueError, OSError) as e:
+                    print(e)
+                    result = None
+                except requests.RequestException as e:
+                    print(f"❌ Could not reach the grading server: {e}")
+                    result = None
+                current = None
+                if result is not None:
+                    pretty_print(result, final=False, show_bytes=args.bytes)
+                if dirty:
+                    dirty = False
+                    continue
+
+            if current is None:
+                watcher.wait_for_change()
+            # Poll briefly while a check is in flight so its result shows promptly.
+            elif watcher.wait_for_change(timeout=0.2) and not dirty:
+                dirty = True
+                print("✏️  Changes saved during this check; checking again once it finishes.", flush=True)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        watcher.close()
+
+
+def find_problem_folders(root, module=None, max_depth=2):
+    """
+    Problem folders (`NNN-name`) under root, sorted by name. With module,
+    keep only folders whose meta.json names that module.
+    """
+    found = []
+    base_depth = root.rstrip(os.sep).count(os.sep)
+    for current, dirs, _ in os.walk(root):
+        keep = []
+        for d in sorted(dirs):
+            if d.startswith("."):
+                continue
+            if PROBLEM_FOLDER_RE.match(d):
+                found.append(os.path.join(current, d))
+            elif current.count(os.sep) - base_depth < max_depth - 1:
+                keep.append(d)
+        dirs[:] = keep
+
+    if module is None:
+        return sorted(found, key=os.path.basename)
+
+    selected = []
+    for folder in found:
+        try:
+            with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+                meta_module = json.load(f).get("module")
+        except (OSError, ValueError):
+            continue
+        if str(meta_module).lower() == module.lower():
+            selected.append(folder)
+    return sorted(selected, key=os.path.basename)
+
+
+def summarize(result):
+    """(passed tests, total tests, earned points, total points) for a check result."""
+    tests = result.get("tests") or result.get("test_results") or []
+    passed = [t for t in tests if t.get("passed")]
+    earned = sum(int(t.get("points", 0)) for t in passed)
+    total = sum(int(t.get("points", 0)) for t in tests)
+    return len(passed), len(tests), earned, total
+
+
+@timings.timed("check folder")
+def _check_one(folder, args):
+    try:
+        result = run_tests(
+            test_index=args.test,
+            announce_request=False,
+            use_cache=not args.no_cache,
+            refresh=args.refresh,
+            folder_path=folder,
+            quiet=True,
+        )
+    except (ValueError, OSError) as e:
+        return {"error": str(e)}
+    if result is None:
+        return {"error": "Could not reach the grading server."}
+    if "error" not in result:
+        state_dir = os.path.join(folder, ".jasper")
+        os.makedirs(state_dir, exist_ok=True)
+        with open(os.path.join(state_dir, "check.json"), "w") as f:
+            json.dump(result, f, separators=(",", ":"))
+    return result
+
+
+def _check_many(args):
+    from jasper.pretty import print_status, show_table
+
+    root = workspace.resolve().project_root
+    folders = find_problem_folders(root, module=args.module)
+    if not folders:
+        scope = f"module {args.module}" if args.module else "this project"
+        return print_status(f"No problem folders found for {scope} under {root}.", success=False)
+
+    jobs = max(1, args.jobs)
+    print(f"Checking {len(folders)} problem folder(s) with up to {jobs} at a time…", flush=True)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda folder: _check_one(folder, args), folders))
+
+    rows = []
+    all_passed = True
+    for folder, result in zip(folders, results):
+        if "error" in result:
+            all_passed = False
+            rows.append({"problem": os.path.basename(folder), "tests": "—", "points": "—",
+                         "result": f"⚠️ {result['error']}"})
+            continue
+        passed, total, earned, possible = summarize(result)
+        ok = result.get("passed", passed == total)
+        all_passed = all_passed and ok
+        rows.append({
+            "problem": os.path.basename(folder),
+            "tests": f"{passed}/{total}",
+            "points": f"{earned}/{possible}",
+            "result": "✅ Passed" if ok else "❌ Failed",
+        })
+    show_table(rows, title="Check summary")
+    print_status(f"{sum(r['result'] == '✅ Passed' for r in rows)}/{len(rows)} problems passed", success=all_passed)
+
+
 def _run_check_cli(args):
-    pretty_print(
-        run_tests(test_index=args.test),
-        final=False,
-        show_bytes=args.bytes,
-    )
+    if args.local and (args.all or args.module):
+        return print("❌ --local runs the tests of the problem folder you are in; it cannot be combined with --all/--module.")
+    if args.all or args.module:
+        return _check_many(args)
+    if args.watch:
+        return _watch_checks(args)
+    if args.local:
+        result = run_local_tests(test_index=args.test)
+        if result is not None:
+            pretty_print(result, final=False, show_bytes=args.bytes)
+            print("ℹ️ These are local results; run `jasper check` for the grader's verdict.")
+        return
+    try:
+        result = run_tests(
+            test_index=args.test,
+            use_cache=not args.no_cache,
+            refresh=args.refresh,
+        )
+    except ValueError as e:
+        return print(e)
+    if result is None:
+        return
+    pretty_print(result, final=False, show_bytes=args.bytes)
 
 
 def register(subparsers):
@@ -69,6 +324,44 @@ def register(subparsers):
         metavar="N",
         help="Run only test N",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always ask the server and don't store the result locally",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore any cached result for unchanged code and re-run on the server",
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Run make and the meta.json test cases on this machine instead of the server",
+    )
+    parser.add_argument(
+        "-w", "--watch",
+        action="store_true",
+        help="Re-run the check whenever the source files change",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Check every NNN-name problem folder in the project and show a summary",
+    )
+    parser.add_argument(
+        "--module",
+        default=None,
+        metavar="MOD",
+        help="Like --all, but only folders whose meta.json lists this module (e.g., m01)",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=4,
+        metavar="N",
+        help="How many problems --all/--module checks at once (default 4)",
+    )
     parser.set_defaults(func=_run_check_cli)
 
 # --- New helper ---
@@ -84,10 +377,11 @@ def _check_last_submission():
     else:
         return False, None
 
+@timings.timed("render")
 def pretty_print(result, final, show_bytes=False):
     os.makedirs(".jasper", exist_ok=True)
     with open(".jasper/check.json", "w") as f:
-        json.dump(result, f, indent=2)
+        json.dump(result, f, separators=(",", ":"))
 
     
     print()
@@ -132,13 +426,9 @@ def pretty_print(result, final, show_bytes=False):
             if actual is None:
                 actual = _detail_for_check(t)
 
-        def _rend(x):
-            if x is None:
-                return ""
-            s = str(x)
-            return repr(s) if show_bytes else s
-        expected = _rend(expected)
-        actual   = _rend(actual)
+        # Raw text; write_mismatch applies --bytes escaping to what it shows.
+        expected = "" if expected is None else str(expected)
+        actual   = "" if actual is None else str(actual)
         return expected, actual
 
     def _content_for_passed(t: dict) -> str:
@@ -147,12 +437,11 @@ def pretty_print(result, final, show_bytes=False):
         def _rend(x):
             if x is None: return ""
             s = str(x)
-            return repr(s) if show_bytes else s
+            return repr(s) if show_bytes and is_small(s) else s
         if _nonempty(act): return _rend(act)
         if _nonempty(exp): return _rend(exp)
         if t.get("type") == "memory":
-            v = t.get("valgrind_output") or "(no valgrind output)"
-            return repr(str(v)) if show_bytes else str(v)
+            return _rend(t.get("valgrind_output") or "(no valgrind output)")
         if t.get("type") == "check":
             return _detail_for_check(t)
         return "(no output)"
@@ -160,7 +449,10 @@ def pretty_print(result, final, show_bytes=False):
     def _manual_run_line(t: dict) -> str | None:
         args = t.get("args")
         if isinstance(args, list) and all(isinstance(a, str) for a in args):
-            return f"To manually run this test, execute: `./mysolution {' '.join(args)}`"
+            command = " ".join(["./mysolution", *args])
+            if t.get("stdin") and t.get("input_file"):
+                command += f" < {t['input_file']}"
+            return f"To manually run this test, execute: `{command}`"
         for key in ("input_file", "in_file", "stdin_file", "inpath"):
             if key in t and t[key]:
                 base = os.path.basename(str(t[key]))
@@ -172,20 +464,9 @@ def pretty_print(result, final, show_bytes=False):
                     return f"To manually run this test, execute: `./mysolution {' '.join(tokens)}`"
         return None
 
-    total_points = 0
-    earned_points = 0
-    passed_count = 0
-    failed, passed = [], []
-
-    for t in tests:
-        pts = int(t.get("points", 0))
-        total_points += pts
-        if t.get("passed"):
-            earned_points += pts
-            passed_count += 1
-            passed.append(t)
-        else:
-            failed.append(t)
+    passed_count, total_tests, earned_points, total_points = summarize(result)
+    failed = [t for t in tests if not t.get("passed")]
+    passed = [t for t in tests if t.get("passed")]
 
     for t in failed:
         name = t.get("test", "unknown")
@@ -194,8 +475,7 @@ def pretty_print(result, final, show_bytes=False):
         header = f"❌ {name} | Type: {typ} | Points: {pts}"
         print(format_text(header, color="red"))
         expected, actual = _expected_actual(t)
-        print(f"    Expected: {expected}")
-        print(f"    Actual:   {actual}")
+        write_mismatch(print, expected, actual, show_bytes)
         line = _manual_run_line(t)
         if line:
             print(f"    {line}")
@@ -207,14 +487,15 @@ def pretty_print(result, final, show_bytes=False):
         header = f"✅ {name} | Type: {typ} | Points: {pts}"
         body = _content_for_passed(t)
         print(format_text(header, color="green"))
-        if body:
+        if body and is_small(body):
             for line in str(body).splitlines():
                 print(format_text("    " + line, color="green"))
+        elif body:
+            write_head(lambda line: print(format_text(line, color="green")), body, show_bytes)
         line = _manual_run_line(t)
         if line:
             print(format_text("    " + line, color="green"))
 
-    total_tests = len(tests)
     print()
     print(format_text("Problem Score:", bold=True))
     print(f"{passed_count}/{total_tests} tests passed")
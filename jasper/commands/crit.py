@@ -1,27 +1,36 @@
 import os
 import json
-import requests
-from jasper.utils import load_config, zip_folder
+from jasper import cache, delta, ignore, results, timings, workspace
+from jasper.utils import load_config
 
-def run_critique(args=None, print_crit=True):
+def run_critique(args=None, print_crit=True, archive=None, cancel=None, tree=None):
+    """
+    tree is the cache.tree_hash() of archive (or the folder), if known.
+    cancel is an optional threading.Event. A request already on the wire
+    cannot be recalled, but once cancel is set the critique is not sent,
+    saved, recorded or printed, so an abandoned run stays silent.
+    """
     config = load_config()
 
-    folder_name = os.path.basename(os.getcwd())
-    if "-" not in folder_name:
+    problem_id = workspace.resolve().problem_id
+    if problem_id is None:
         print("❌ Folder name must follow the format `132-hello-world`.")
         return None
 
-    problem_id = folder_name.split("-")[0]
     student_id = config.get("student_id", "testuser")
     server_url = config.get("server_url", "http://localhost:3000")
 
-    zip_path = zip_folder(".")
-
     try:
-        with open(zip_path, "rb") as f:
-            files = {"file": f}
-            data = {"student_id": student_id, "problem_id": problem_id}
-            response = requests.post(f"{server_url}/crit", data=data, files=files)
+        selection = ignore.preflight(".") if archive is None else None
+        if tree is None:
+            tree = cache.tree_hash(".", files=selection and selection.included, archive=archive)
+        data = {"student_id": student_id, "problem_id": problem_id}
+        if cancel is not None and cancel.is_set():
+            return None
+        with timings.span("upload /crit"):
+            response = delta.upload(server_url, "/crit", data, archive=archive, selection=selection)
+        if cancel is not None and cancel.is_set():
+            return None
 
         if response.status_code != 200:
             print(f"❌ Critique failed ({response.status_code}):\n{response.text}")
@@ -29,10 +38,11 @@ def run_critique(args=None, print_crit=True):
 
         result = response.json()
         os.makedirs(".jasper", exist_ok=True)
+        results.record("crit", result, tree)
 
         # Save JSON
         with open(".jasper/critique.json", "w") as f:
-            json.dump(result, f, indent=2)
+            json.dump(result, f, separators=(",", ":"))
 
         # Extract values safely
         grade = result.get("grade", "N/A")
@@ -63,8 +73,12 @@ def run_critique(args=None, print_crit=True):
 
         return result
 
+    except ignore.PackageTooLarge as e:
+        print(e)
+        return None
     except Exception as e:
-        print(f"❌ Critique error: {e}")
+        if cancel is None or not cancel.is_set():
+            print(f"❌ Critique error: {e}")
         return None
 
 def register(subparsers):
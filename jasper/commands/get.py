@@ -1,114 +1,479 @@
-import os, requests, json, shutil, base64
-from jasper.utils import load_config, save_config
+import os, io, requests, json, shutil, base64, binascii, hashlib, tempfile, zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from jasper import client, jsonstream, starter_cache, timings, workspace
+from jasper.utils import load_config, save_config, debug_print
 from jasper.pretty import print_status
 
 def register(subparsers):
     p = subparsers.add_parser("get", help="Download starter code for a problem or module")
     p.add_argument("query", help="Problem id/name or module code (e.g., m01)")
+    p.add_argument("--refresh", action="store_true", help="Download even if the cached starter code is current")
+    p.add_argument("--sync", action="store_true",
+                   help="Update existing folders in place, rewriting only files that differ from the starter code")
+    p.add_argument("-j", "--jobs", type=int, default=4, help="Problems of a module to download at once (default: 4)")
     p.set_defaults(func=run)
 
-def clear_directory_contents(path):
-    for entry in os.listdir(path):
-        full_path = os.path.join(path, entry)
-        try:
-            if os.path.islink(full_path) or os.path.isfile(full_path):
-                os.unlink(full_path)
-            elif os.path.isdir(full_path):
-                shutil.rmtree(full_path)
-        except Exception as e:
-            print_status(f"Failed to remove '{full_path}': {e}", success=False)
+STREAM_CHUNK = 64 * 1024
+# Prefer a zip of the starter code; servers that only speak JSON ignore this.
+ACCEPT = "application/zip, application/json;q=0.9"
+_B64_WHITESPACE = str.maketrans("", "", " \t\r\n")
+# What the last download put in a problem folder, {rel: sha256}; lets --sync
+# tell starter files the server dropped from files the student added.
+STARTER_MANIFEST = os.path.join(".jasper", "starter.json")
+
+class _StagedFile:
+    # A file's content already on disk: decoded while the response streamed in,
+    # or (keep=True) a blob in the starter-code cache that must stay put.
+    def __init__(self, path, error=None, keep=False):
+        self.path = path
+        self.error = error
+        self.keep = keep
+
+class _Base64ToFile:
+    """jsonstream sink: decodes a base64 string to a staging file as it arrives."""
+
+    def __init__(self, staging_dir):
+        fd, self.path = tempfile.mkstemp(dir=staging_dir)
+        self.f = os.fdopen(fd, "wb")
+        self.pending = ""
+        self.error = None
+
+    def write(self, text):
+        if self.error:
+            return
+        self.pending += text.translate(_B64_WHITESPACE)
+        usable = len(self.pending) - len(self.pending) % 4
+        if usable:
+            try:
+                self.f.write(base64.b64decode(self.pending[:usable]))
+            except (binascii.Error, ValueError) as e:
+                self.error = e
+            self.pending = self.pending[usable:]
+
+    def finish(self):
+        if self.pending and not self.error:
+            try:
+                self.f.write(base64.b64decode(self.pending))
+            except (binascii.Error, ValueError) as e:
+                self.error = e
+        self.f.close()
+        return _StagedFile(self.path, self.error)
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
 
 def write_files(project_path, files_dict):
+    """Write a response's files under project_path; returns the paths that failed."""
+    failed = []
     for rel, payload in files_dict.items():
         fpath = os.path.join(project_path, rel)
         os.makedirs(os.path.dirname(fpath), exist_ok=True)
+        # Write beside the target and rename, so a file is never seen half-written.
+        tmp = f"{fpath}.jasper-tmp"
         try:
-            data = base64.b64decode(payload["content_base64"])
-            with open(fpath, "wb") as f:
-                f.write(data)
+            content = payload["content_base64"]
+            if isinstance(content, _StagedFile):
+                if content.error:
+                    raise content.error
+                if content.keep:
+                    shutil.copyfile(content.path, tmp)
+                else:
+                    shutil.move(content.path, tmp)
+                    os.chmod(tmp, 0o666 & ~_umask())  # mkstemp creates files 0600
+            else:
+                data = base64.b64decode(content)
+                with open(tmp, "wb") as f:
+                    f.write(data)
+            os.replace(tmp, fpath)
         except Exception as e:
             print_status(f"Could not write '{rel}': {e}", success=False)
+            failed.append(rel)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return failed
 
-def maybe_prepare_folder(folder_name):
-    # Find project root by locating `.devcontainer`
-    root_dir = find_project_root()
-    project_path = os.path.join(root_dir, folder_name)
-
-    if os.path.exists(project_path):
-        print_status(f"⚠️ Folder '{folder_name}' already exists.", success=False)
-        confirm = input(f"Type 'yes' to overwrite ALL files in '{folder_name}': ").strip().lower()
-        if confirm != "yes":
-            print_status("Download cancelled by user.", success=False)
-            return None
-        clear_directory_contents(project_path)
-        print_status(f"🧹 Cleared contents of '{folder_name}'", success=True)
-    os.makedirs(project_path, exist_ok=True)
-    return project_path
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(STREAM_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-def run(args):
-    cfg = load_config()
-    server_url = cfg.get("server_url", "http://localhost:3000")
-    url = f"{server_url}/get-problem"
+def _content_sha(content):
+    """sha256 of a file's downloaded content, or None if it is unusable."""
+    try:
+        if isinstance(content, _StagedFile):
+            return None if content.error else _sha256_file(content.path)
+        return hashlib.sha256(base64.b64decode(content)).hexdigest()
+    except (OSError, ValueError):
+        return None
+
+def _starter_manifest(files_dict):
+    shas = {rel: _content_sha(payload["content_base64"]) for rel, payload in files_dict.items()}
+    return {rel: sha for rel, sha in shas.items() if sha}
+
+def _read_manifest(project_path):
+    try:
+        with open(os.path.join(project_path, STARTER_MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_manifest(project_path, manifest):
+    path = os.path.join(project_path, STARTER_MANIFEST)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+
+def _meta_bytes(meta):
+    return json.dumps(meta, indent=2).encode()
+
+@timings.timed("parse JSON")
+def parse_streamed(resp, staging_dir):
+    """
+    Parse a /get-problem response incrementally, decoding every
+    `content_base64` straight to a file in staging_dir.
+    """
+    def stream_at(path):
+        if path and path[-1] == "content_base64":
+            return _Base64ToFile(staging_dir)
+        return None
+
+    return jsonstream.parse(resp.iter_content(chunk_size=STREAM_CHUNK), stream_at)
+
+def _member_parts(name):
+    parts = name.rstrip("/").split("/")
+    if name.startswith("/") or "\\" in name or any(p in ("", ".", "..") for p in parts):
+        raise ValueError(f"Unsafe archive member {name!r}")
+    return parts
+
+@timings.timed("unpack zip")
+def parse_archive(resp, staging_dir):
+    """
+    Unpack a zip /get-problem response (one top-level folder per problem)
+    into staging_dir. Returns the same shape as the JSON format, with every
+    file already on disk.
+    """
+    fd, archive_path = tempfile.mkstemp(dir=staging_dir, suffix=".zip")
+    with os.fdopen(fd, "wb") as f:
+        for chunk in resp.iter_content(chunk_size=STREAM_CHUNK):
+            f.write(chunk)
+
+    items = {}
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                parts = _member_parts(info.filename)
+                item = items.setdefault(parts[0], {"project_name": parts[0], "files": {}})
+                if info.is_dir() or len(parts) == 1:
+                    continue
+                rel = "/".join(parts[1:])
+                if rel == "meta.json":
+                    with zf.open(info) as src:
+                        item["meta"] = json.load(src)
+                    continue
+                fd, path = tempfile.mkstemp(dir=staging_dir)
+                with zf.open(info) as src, os.fdopen(fd, "wb") as dst:
+                    shutil.copyfileobj(src, dst, STREAM_CHUNK)
+                item["files"][rel] = {"content_base64": _StagedFile(path)}
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Bad archive: {e}") from e
+    finally:
+        os.remove(archive_path)
+    return {"items": list(items.values())}
+
+def confirm_overwrite(root_dir, folder_name, sync=False):
+    """Ask before replacing an existing folder; True if it may be written."""
+    if not os.path.exists(os.path.join(root_dir, folder_name)):
+        return True
+    print_status(f"⚠️ Folder '{folder_name}' already exists.", success=False)
+    if sync:
+        prompt = f"Type 'yes' to sync '{folder_name}' (starter files that differ are overwritten): "
+    else:
+        prompt = f"Type 'yes' to overwrite ALL files in '{folder_name}': "
+    confirm = input(prompt).strip().lower()
+    if confirm != "yes":
+        print_status(f"Skipped '{folder_name}'; download cancelled by user.", success=False)
+        return False
+    return True
+
+def _swap_into_place(build_dir, project_path):
+    parent, name = os.path.split(project_path)
+    if not os.path.exists(project_path):
+        os.rename(build_dir, project_path)
+        return
+    old = os.path.join(parent, f".{name}.old-{os.getpid()}")
+    os.rename(project_path, old)
+    try:
+        os.rename(build_dir, project_path)
+    except OSError:
+        os.rename(old, project_path)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+@timings.timed("install")
+def install_item(root_dir, item, verb="Downloaded"):
+    """
+    Write one problem into a hidden temp folder, then rename it into place,
+    so an interrupted or failed download never leaves a half-written folder.
+    """
+    folder = item["project_name"]
+    build_dir = tempfile.mkdtemp(prefix=f".{folder}.", dir=root_dir)
+    try:
+        os.chmod(build_dir, 0o777 & ~_umask())  # mkdtemp creates folders 0700
+        files = item.get("files", {})
+        manifest = _starter_manifest(files)
+        failed = write_files(build_dir, files)
+        if "meta" in item:
+            with open(os.path.join(build_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(item["meta"], f, indent=2)
+        _write_manifest(build_dir, manifest)
+        if failed:
+            return print_status(f"'{folder}' left unchanged: {len(failed)} file(s) could not be written.", success=False)
+        _swap_into_place(build_dir, os.path.join(root_dir, folder))
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    print_status(f"{verb}: {folder}", success=True)
+
+@timings.timed("sync")
+def sync_item(root_dir, item, verb="Synced"):
+    """
+    Bring an existing problem folder up to date in place: only starter files
+    whose content differs are rewritten, so untouched files keep their mtimes
+    (and `make` does not rebuild them). A starter file the student edited
+    (its content no longer matches the last synced starter.json) is never
+    overwritten or removed; it is reported instead. Other files are left alone.
+    """
+    folder = item["project_name"]
+    project_path = os.path.join(root_dir, folder)
+    if not os.path.isdir(project_path):
+        return install_item(root_dir, item)
+
+    files = item.get("files", {})
+    previous = _read_manifest(project_path)
+    manifest = _starter_manifest(files)
+    added, changed, kept, removed = [], [], [], 0
+    for rel in files:
+        local = os.path.join(project_path, rel)
+        if not os.path.isfile(local):
+            added.append(rel)
+            continue
+        sha = _sha256_file(local)
+        if rel in manifest and sha == manifest[rel]:
+            continue
+        if previous.get(rel) == sha:
+            changed.append(rel)
+        else:
+            # Edited locally: the student's version wins. Remember the starter
+            # it was based on, so reverting the edit lets a later sync update it.
+            kept.append(rel)
+            if rel in previous:
+                manifest[rel] = previous[rel]
+            else:
+                manifest.pop(rel, None)
+    failed = set(write_files(project_path, {rel: files[rel] for rel in added + changed}))
+
+    if "meta" in item:
+        meta_path = os.path.join(project_path, "meta.json")
+        data = _meta_bytes(item["meta"])
+        try:
+            with open(meta_path, "rb") as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != data:
+            with open(meta_path, "wb") as f:
+                f.write(data)
+
+    for rel in sorted(previous.keys() - files.keys()):
+        local = os.path.join(project_path, rel)
+        try:
+            if _sha256_file(local) == previous[rel]:
+                os.remove(local)
+                removed += 1
+        except OSError:
+            pass
+
+    _write_manifest(project_path, manifest)
+    counts = f"{len(set(added) - failed)} added, {len(set(changed) - failed)} changed, {removed} removed"
+    if kept:
+        counts += f", {len(kept)} kept"
+    if failed:
+        return print_status(f"{folder}: {counts}; {len(failed)} file(s) could not be written.", success=False)
+    print_status(f"{verb}: {folder} ({counts})", success=True)
+    if kept:
+        print(f"✏️  Kept your edits to {', '.join(sorted(kept))}; the server has a different starter version. "
+              "Delete a file and sync again to take the server's copy.")
+
+class _FetchError(Exception):
+    pass
+
+def _items(data):
+    return data["items"] if "items" in data else [data]
+
+def _is_listing(data):
+    # A module listing names its problems without their files.
+    items = data.get("items") or []
+    return bool(items) and all("files" not in item for item in items)
+
+@timings.timed("fetch")
+def fetch(server_url, query, staging_dir, refresh=False, listing=False):
+    """
+    Download one /get-problem response, staging file contents in staging_dir.
+
+    Args:
+        listing: Ask for just the names of a module's problems. Servers that
+            do not support this send the whole module instead.
+
+    Returns:
+        tuple: (data, verb), with data in the JSON format's shape.
+
+    Raises:
+        _FetchError: With the message to show the user.
+    """
+    cache_key = starter_cache.entry_key(server_url, query)
+    cached = None if refresh else starter_cache.lookup(cache_key)
+    headers = {"Accept": ACCEPT}
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+    params = {"q": query}
+    if listing:
+        params["list"] = "1"
     try:
-        resp = requests.get(url, params={"q": args.query}, timeout=20)
+        resp = client.get(server_url, "/get-problem", params=params, headers=headers, stream=True)
     except requests.exceptions.ConnectTimeout:
-        return print_status("Connection timed out. Is the server reachable?", success=False)
+        raise _FetchError("Connection timed out. Is the server reachable?")
     except requests.exceptions.ConnectionError:
-        return print_status("Cannot connect. Check server URL or network.", success=False)
+        raise _FetchError("Cannot connect. Check server URL or network.")
     except Exception as e:
-        return print_status(f"Unexpected network error: {e}", success=False)
+        raise _FetchError(f"Unexpected network error: {e}")
+
+    try:
+        # Nothing changed since the cached download
+        if resp.status_code == 304 and cached:
+            return _from_cache(cached), "Restored from cache"
 
-    # Non-200s
-    if resp.status_code == 404:
+        # Non-200s
+        if resp.status_code == 404:
+            try:
+                detail = resp.json().get("error", "Not found")
+            except Exception:
+                detail = "Not found"
+            raise _FetchError(f"No released problems matched '{query}'. ({detail})")
+        if resp.status_code >= 500:
+            raise _FetchError("Server error. Try again later or contact the instructor.")
+        if resp.status_code != 200:
+            raise _FetchError(f"Unexpected status {resp.status_code}.")
+
+        # Unpack zip or parse JSON, staging file contents on disk next to where they will land
+        is_zip = resp.headers.get("Content-Type", "").startswith("application/zip")
         try:
-            detail = resp.json().get("error", "Not found")
-        except Exception:
-            detail = "Not found"
-        return print_status(f"No released problems matched '{args.query}'. ({detail})", success=False)
-    if resp.status_code >= 500:
-        return print_status("Server error. Try again later or contact the instructor.", success=False)
-    if resp.status_code != 200:
-        return print_status(f"Unexpected status {resp.status_code}.", success=False)
-
-    # Parse JSON
+            data = parse_archive(resp, staging_dir) if is_zip else parse_streamed(resp, staging_dir)
+        except ValueError as e:
+            if is_zip:
+                raise _FetchError(f"Invalid archive from server: {e}")
+            raise _FetchError("Invalid response from server (not JSON).")
+        except requests.RequestException as e:
+            raise _FetchError(f"Download interrupted: {e}")
+        if not isinstance(data, dict):
+            raise _FetchError("Invalid response from server (not JSON).")
+        etag = resp.headers.get("ETag")
+        if etag and not _is_listing(data):
+            _remember(cache_key, etag, data)
+        return data, "Downloaded"
+    finally:
+        resp.close()
+
+def _fetch_and_install(server_url, root_dir, name, refresh, sync):
+    staging_dir = tempfile.mkdtemp(prefix=".jasper-get-", dir=root_dir)
     try:
-        data = resp.json()
-    except ValueError:
-        return print_status("Invalid response from server (not JSON).", success=False)
-
-    # Single item
-    if "project_name" in data:
-        folder = data["project_name"]
-        project_path = maybe_prepare_folder(folder)
-        if not project_path:
-            return
-        write_files(project_path, data.get("files", {}))
-        if "meta" in data:
-            with open(os.path.join(project_path, "meta.json"), "w", encoding="utf-8") as f:
-                json.dump(data["meta"], f, indent=2)
-        return print_status(f"Downloaded: {folder}", success=True)
-
-    # Multiple items (module)
-    items = data.get("items", [])
-    if not items:
-        return print_status(f"No released problems matched '{args.query}'.", success=False)
-
-    for item in items:
-        folder = item["project_name"]
-        project_path = maybe_prepare_folder(folder)
-        if not project_path:
-            # user refused overwrite of one project; continue to next
-            continue
-        write_files(project_path, item.get("files", {}))
-        if "meta" in item:
-            with open(os.path.join(project_path, "meta.json"), "w", encoding="utf-8") as f:
-                json.dump(item["meta"], f, indent=2)
-        print_status(f"Downloaded: {folder}", success=True)
+        data, verb = fetch(server_url, name, staging_dir, refresh=refresh)
+        for item in _items(data):
+            if sync:
+                sync_item(root_dir, item)
+            else:
+                install_item(root_dir, item, verb)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def fetch_each(server_url, root_dir, names, refresh=False, jobs=4, sync=False):
+    """Download and install problems one request each, a few at a time."""
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(_fetch_and_install, server_url, root_dir, name, refresh, sync): name for name in names}
+        try:
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except (_FetchError, OSError) as e:
+                    print_status(f"{futures[future]}: {e}", success=False)
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            print_status("Download cancelled. Problems not yet downloaded were left unchanged.", success=False)
+
+def run(args):
+    cfg = load_config()
+    server_url = cfg.get("server_url", "http://localhost:3000")
+    root_dir = find_project_root()
+    staging_dir = tempfile.mkdtemp(prefix=".jasper-get-", dir=root_dir)
+    try:
+        try:
+            data, verb = fetch(server_url, args.query, staging_dir, refresh=args.refresh, listing=True)
+        except _FetchError as e:
+            return print_status(str(e), success=False)
+
+        items = _items(data)
+        if not items:
+            return print_status(f"No released problems matched '{args.query}'.", success=False)
+
+        # Ask about every existing folder before any download or write starts.
+        wanted = [item for item in items if confirm_overwrite(root_dir, item["project_name"], args.sync)]
+
+        if _is_listing(data):
+            names = [item["project_name"] for item in wanted]
+            return fetch_each(server_url, root_dir, names, args.refresh, args.jobs, args.sync)
+        for item in wanted:
+            if args.sync:
+                sync_item(root_dir, item)
+            else:
+                install_item(root_dir, item, verb)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def _opener(content):
+    if isinstance(content, _StagedFile):
+        if content.error:
+            raise content.error
+        return partial(open, content.path, "rb")
+    return partial(io.BytesIO, base64.b64decode(content))
+
+def _remember(key, etag, data):
+    # Best effort: a download that cannot be cached is still a good download.
+    items = data["items"] if "items" in data else [data]
+    try:
+        cached = []
+        for item in items:
+            files = {rel: _opener(payload["content_base64"]) for rel, payload in item.get("files", {}).items()}
+            entry = {"project_name": item["project_name"], "files": files}
+            if "meta" in item:
+                entry["meta"] = item["meta"]
+            cached.append(entry)
+        starter_cache.store(key, etag, cached)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        debug_print(f"Could not cache starter code: {e}")
+
+def _from_cache(entry):
+    items = []
+    for item in entry["items"]:
+        files = {
+            rel: {"content_base64": _StagedFile(starter_cache.blob_path(sha), keep=True)}
+            for rel, sha in item["files"].items()
+        }
+        items.append(dict(item, files=files))
+    return {"items": items}
 
 def find_project_root():
-    current = os.getcwd()
-    while current != os.path.dirname(current):
-        if os.path.isdir(os.path.join(current, ".devcontainer")):
-            return current
-        current = os.path.dirname(current)
-    return os.getcwd()
+    return workspace.resolve().project_root
@@ -1,8 +1,19 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
 import requests
 
-from jasper.utils import load_config
+from jasper import client, timings
+from jasper.utils import load_config, user_cache_dir
 from jasper.pretty import print_status, show_table
 
+# Seconds a saved snapshot is shown without asking the server at all.
+HISTORY_TTL = 30
+
 
 def _format_timestamp(value):
     if value is None or value == "":
@@ -10,6 +21,72 @@ def _format_timestamp(value):
     return str(value).strip() or "—"
 
 
+def _cache_dir():
+    return os.path.join(user_cache_dir(), "history")
+
+
+def _snapshot_path(server_url, student_id, since, module):
+    parts = [(server_url or "").rstrip("/"), str(student_id), since or "", (module or "").lower()]
+    key = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+    return os.path.join(_cache_dir(), f"{key}.json")
+
+
+def _load_snapshot(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return snapshot if isinstance(snapshot, dict) and "data" in snapshot else None
+
+
+def _save_snapshot(path, snapshot):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # a history we cannot save is still worth showing
+
+
+def forget_cached_history():
+    """Drop saved snapshots, e.g. after a submit changed the history."""
+    shutil.rmtree(_cache_dir(), ignore_errors=True)
+
+
+def _age(snapshot):
+    seconds = max(0, int(time.time() - snapshot.get("fetched_at", 0)))
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
+
+def _parse_time(value):
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=None) if parsed.tzinfo is None else parsed.astimezone().replace(tzinfo=None)
+
+
+def _filter(problems, since=None, module=None):
+    # The server should already have applied these; older servers send everything.
+    since_time = _parse_time(since) if since else None
+    kept = []
+    for p in problems:
+        if module and str(p.get("module") or "").lower() != module.lower():
+            continue
+        if since_time is not None:
+            stamp = _parse_time(p.get("timestamp")) if p.get("timestamp") else None
+            if stamp is None or stamp < since_time:
+                continue
+        kept.append(p)
+    return kept
+
+
 def run(args):
     try:
         config = load_config()
@@ -17,23 +94,53 @@ def run(args):
         return print_status(str(e), success=False)
 
     student_id = config.get("student_id", "testuser")
-    server_url = config.get("server_url", "http://localhost:3000").rstrip("/")
-    url = f"{server_url}/history"
+    server_url = config.get("server_url", "http://localhost:3000")
+    since, module = args.since, args.module
+    path = _snapshot_path(server_url, student_id, since, module)
+    snapshot = _load_snapshot(path)
+
+    if args.offline:
+        if snapshot is None:
+            return print_status("No saved history yet. Run `jasper history` once while online.", success=False)
+        print_status(f"Offline: showing history saved {_age(snapshot)} ago.", success=True)
+        return _render(snapshot["data"], student_id, since, module)
+    if snapshot and time.time() - snapshot.get("fetched_at", 0) < HISTORY_TTL:
+        return _render(snapshot["data"], student_id, since, module)
+
+    body = {"student_id": student_id}
+    if since:
+        body["since"] = since
+    if module:
+        body["module"] = module
+    headers = {"Content-Type": "application/json"}
+    if snapshot and snapshot.get("etag"):
+        headers["If-None-Match"] = snapshot["etag"]
+    if snapshot and snapshot.get("last_modified"):
+        headers["If-Modified-Since"] = snapshot["last_modified"]
 
     try:
-        resp = requests.post(
-            url,
-            json={"student_id": student_id},
-            headers={"Content-Type": "application/json"},
-            timeout=20,
+        resp = client.post(
+            server_url,
+            "/history",
+            json=body,
+            headers=headers,
+            idempotent=True,
         )
-    except requests.exceptions.ConnectTimeout:
-        return print_status("Connection timed out. Is the server reachable?", success=False)
-    except requests.exceptions.ConnectionError:
-        return print_status("Cannot connect. Check server URL or network.", success=False)
     except requests.RequestException as e:
+        if snapshot:
+            print_status(f"Server unreachable; showing history saved {_age(snapshot)} ago.", success=False)
+            return _render(snapshot["data"], student_id, since, module)
+        if isinstance(e, requests.exceptions.ConnectTimeout):
+            return print_status("Connection timed out. Is the server reachable?", success=False)
+        if isinstance(e, requests.exceptions.ConnectionError):
+            return print_status("Cannot connect. Check server URL or network.", success=False)
         return print_status(f"Error contacting server: {e}", success=False)
 
+    if resp.status_code == 304 and snapshot:
+        snapshot["fetched_at"] = time.time()
+        _save_snapshot(path, snapshot)
+        return _render(snapshot["data"], student_id, since, module)
+
     if resp.status_code == 400:
         try:
             detail = resp.json().get("error", resp.text or "Bad request")
@@ -50,7 +157,18 @@ def run(args):
     except ValueError:
         return print_status("Invalid response from server (not JSON).", success=False)
 
-    problems = data.get("problems") or []
+    _save_snapshot(path, {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "data": data,
+    })
+    return _render(data, student_id, since, module)
+
+
+@timings.timed("render")
+def _render(data, student_id, since=None, module=None):
+    problems = _filter(data.get("problems") or [], since, module)
     sid = data.get("student_id", student_id)
 
     if not problems:
@@ -84,4 +202,7 @@ def register(subparsers):
         "history",
         help="Show your problem history from the grading server",
     )
+    parser.add_argument("--offline", action="store_true", help="Show the last saved history without contacting the server")
+    parser.add_argument("--since", help="Only problems submitted on or after this date (YYYY-MM-DD or ISO timestamp)")
+    parser.add_argument("--module", help="Only problems in this module (e.g., m01)")
     parser.set_defaults(func=run)
@@ -1,6 +1,8 @@
 import re
-from urllib import request, error
 
+import requests
+
+from jasper import client
 from jasper.utils import save_config, load_config
 from jasper.pretty import print_status, show_table
 
@@ -26,15 +28,13 @@ def _normalize_url(u: str) -> str:
     return u.rstrip("/")
 
 def _ping_server(base_url: str, timeout: float = 4.0):
-    url = f"{base_url}/api/healthz"
     try:
-        req = request.Request(url, method="GET")
-        with request.urlopen(req, timeout=timeout) as resp:
-            return (200 <= resp.status < 300), None
-    except error.HTTPError as e:
-        return False, f"HTTP {e.code}"
-    except Exception as e:
+        resp = client.get(base_url, "/api/healthz", timeout=(timeout, timeout), retries=0)
+    except requests.RequestException as e:
         return False, str(e)
+    if 200 <= resp.status_code < 300:
+        return True, None
+    return False, f"HTTP {resp.status_code}"
 
 def run(args):
     # 1) If a config exists, show it and prompt to overwrite
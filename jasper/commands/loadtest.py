@@ -0,0 +1,328 @@
+"""
+Simulate a lab section hitting the grading server.
+
+Each virtual student gets a synthetic problem folder of a realistic size and
+works through it the way `jasper` would: a few `check`s with think time and
+an edit in between, then a submit (check and crit together from one
+snapshot, then /submit). Uploads go through jasper.delta and jasper.client,
+the same stack check.run_tests, crit.run_critique and submit.run use.
+
+The students are asyncio tasks; each blocking upload runs on a worker
+thread, so N students really do have N requests in flight.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import types
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from jasper import client, delta, devserver, ignore
+from jasper.archive import build_archive
+from jasper.pretty import print_status, show_table
+from jasper.utils import load_config
+
+ENDPOINTS = ("/check", "/crit", "/submit")
+PERCENTILES = (50, 95, 99)
+
+
+class Stats:
+    """Latencies and failures per endpoint. Only touched from the event loop."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # endpoint -> [seconds]
+        self.errors = defaultdict(Counter)  # endpoint -> {reason: count}
+
+    def add(self, endpoint, elapsed, error=None):
+        self.latencies[endpoint].append(elapsed)
+        if error:
+            self.errors[endpoint][error] += 1
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(stats, elapsed):
+    """
+    Returns:
+        list: One dict per endpoint plus an "all" row, with counts, error
+        rate, throughput and latency percentiles in milliseconds.
+    """
+    rows = []
+    everything = []
+    for endpoint in ENDPOINTS:
+        times = sorted(stats.latencies.get(endpoint, []))
+        everything.extend(times)
+        rows.append(_row(endpoint, times, sum(stats.errors[endpoint].values()), elapsed))
+    total_errors = sum(sum(c.values()) for c in stats.errors.values())
+    rows.append(_row("all", sorted(everything), total_errors, elapsed))
+    return rows
+
+
+def _row(endpoint, times, errors, elapsed):
+    row = {
+        "endpoint": endpoint,
+        "requests": len(times),
+        "errors": errors,
+        "error_rate": errors / len(times) if times else 0.0,
+        "throughput": len(times) / elapsed if elapsed else 0.0,
+    }
+    for q in PERCENTILES:
+        value = percentile(times, q)
+        row[f"p{q}_ms"] = None if value is None else value * 1000
+    row["max_ms"] = times[-1] * 1000 if times else None
+    return row
+
+
+def _ms(value):
+    return "—" if value is None else f"{value:.0f}"
+
+
+# --- synthetic students ---
+
+def _write_source(path, size, rng):
+    with open(path, "w") as f:
+        written = 0
+        while written < size:
+            line = f"    total += step_{rng.randrange(1000)}(x, {rng.randrange(1 << 16)});\n"
+            f.write(line)
+            written += len(line)
+
+
+def make_problem(root, problem_id, rng, scale=1.0, large=None):
+    """
+    Create a problem folder shaped like a student's: a handful of sources
+    and headers of a few KB each, a Makefile, and sometimes (always with
+    large=True) a big test input that makes the archive much larger.
+    """
+    folder = os.path.join(root, f"{problem_id}-loadtest")
+    os.makedirs(folder)
+    _write_source(os.path.join(folder, "Makefile"), 200, rng)
+    for i in range(rng.randint(2, 10)):
+        ext = rng.choice((".c", ".c", ".h"))
+        size = min(256 * 1024, int(rng.lognormvariate(math.log(3000), 1.0) * scale))
+        _write_source(os.path.join(folder, f"part{i}{ext}"), size, rng)
+    if large is None:
+        large = rng.random() < 0.2
+    big = 0
+    if large:
+        # Named so the ignore rules keep it: build outputs like a.out are never uploaded.
+        os.makedirs(os.path.join(folder, "tests"))
+        big = int(rng.uniform(200, 2000) * 1024 * scale)
+        with open(os.path.join(folder, "tests", "big.in"), "wb") as f:
+            f.write(rng.randbytes(big))
+    packaged = ignore.check(folder).total
+    if packaged < big:
+        raise RuntimeError(f"Synthetic problem packages {packaged} bytes, expected at least {big}.")
+    return folder
+
+
+def edit(folder, rng):
+    """Change one source file, as a student does between checks."""
+    sources = sorted(n for n in os.listdir(folder) if n.endswith(".c"))
+    if sources:
+        with open(os.path.join(folder, rng.choice(sources)), "a") as f:
+            f.write(f"/* edit {rng.randrange(1 << 30)} */\n")
+
+
+def think(rng, mean):
+    """Exponential think time, capped so one student cannot stall the run."""
+    return min(rng.expovariate(1 / mean), mean * 4) if mean > 0 else 0
+
+
+def _upload(server_url, endpoint, fields, folder, archive):
+    """One timed upload on a worker thread. Returns (seconds, error or None, decoded body)."""
+    start = time.perf_counter()
+    try:
+        resp = delta.upload(server_url, endpoint, fields, folder_path=folder, archive=archive)
+    except requests.RequestException as e:
+        return time.perf_counter() - start, type(e).__name__, None
+    elapsed = time.perf_counter() - start
+    if resp.status_code >= 400:
+        return elapsed, f"HTTP {resp.status_code}", None
+    try:
+        return elapsed, None, resp.json()
+    except ValueError:
+        return elapsed, "invalid JSON", None
+
+
+class Student:
+    def __init__(self, index, folder, ctx):
+        self.student_id = f"loadtest-{index:04d}"
+        self.problem_id = ctx.problem_id
+        self.folder = folder
+        self.ctx = ctx
+        self.rng = random.Random(f"{ctx.seed}-{index}")
+
+    def _fields(self, **extra):
+        return {"student_id": self.student_id, "problem_id": self.problem_id, **extra}
+
+    async def call(self, endpoint, fields, archive=None):
+        loop = asyncio.get_running_loop()
+        elapsed, error, body = await loop.run_in_executor(
+            self.ctx.pool, _upload, self.ctx.server_url, endpoint, fields, self.folder, archive,
+        )
+        self.ctx.stats.add(endpoint, elapsed, error)
+        return body
+
+    async def submit(self):
+        # Like submit.run: package once, check and crit together, then /submit.
+        archive = await asyncio.get_running_loop().run_in_executor(self.ctx.pool, build_archive, self.folder)
+        tests, critique = await asyncio.gather(
+            self.call("/check", self._fields(), archive),
+            self.call("/crit", self._fields(), archive),
+        )
+        if tests is None or critique is None:
+            return
+        await self.call("/submit", self._fields(grade=critique.get("grade", 0), passed=tests.get("passed", False)),
+                        archive)
+
+    async def run(self, deadline):
+        ctx = self.ctx
+        # Students do not all hit enter at the same moment.
+        await asyncio.sleep(self.rng.uniform(0, ctx.ramp))
+        while time.monotonic() < deadline:
+            for _ in range(self.rng.randint(1, ctx.checks * 2 - 1)):
+                await self.call("/check", self._fields())
+                edit(self.folder, self.rng)
+                await asyncio.sleep(think(self.rng, ctx.think))
+                if time.monotonic() >= deadline:
+                    return
+            await self.submit()
+            await asyncio.sleep(think(self.rng, ctx.think))
+
+
+async def simulate(ctx, folders):
+    deadline = time.monotonic() + ctx.duration
+    students = [Student(i, folder, ctx) for i, folder in enumerate(folders)]
+    await asyncio.gather(*(s.run(deadline) for s in students))
+
+
+# --- command ---
+
+def _print_report(rows, stats, elapsed, students):
+    show_table(
+        [
+            {
+                "endpoint": r["endpoint"],
+                "requests": r["requests"],
+                "errors": r["errors"],
+                "error %": f"{r['error_rate'] * 100:.1f}",
+                "req/s": f"{r['throughput']:.2f}",
+                "p50 ms": _ms(r["p50_ms"]),
+                "p95 ms": _ms(r["p95_ms"]),
+                "p99 ms": _ms(r["p99_ms"]),
+                "max ms": _ms(r["max_ms"]),
+            }
+            for r in rows
+        ],
+        title=f"{students} students over {elapsed:.1f}s",
+    )
+    for endpoint in ENDPOINTS:
+        for reason, count in stats.errors[endpoint].most_common(3):
+            print(f"  {endpoint}: {count}× {reason}")
+
+
+def _is_configured_server(url):
+    try:
+        configured = load_config().get("server_url")
+    except (FileNotFoundError, ValueError):
+        return False
+    return bool(configured) and configured.rstrip("/") == url.rstrip("/")
+
+
+def run(args):
+    if args.students < 1 or args.checks < 1:
+        return print_status("--students and --checks must be at least 1.", success=False)
+
+    server = None
+    server_url = args.server
+    if not args.local and _is_configured_server(server_url) and not args.yes:
+        return print_status(
+            f"{server_url} is the grader in your jasper config. Load testing it sends real checks and "
+            "submissions from fake students; pass --yes if you really mean to.",
+            success=False,
+        )
+    if args.local:
+        server = devserver.start_in_thread(work=args.work)
+        server_url = server.url
+
+    print(f"🏋️ Simulating {args.students} students against {server_url} for {args.duration:g}s…", flush=True)
+    with tempfile.TemporaryDirectory(prefix="jasper-loadtest-") as tmp:
+        rng = random.Random(args.seed)
+        folders = [
+            make_problem(os.path.join(tmp, str(i)), args.problem_id, rng, args.size_scale)
+            for i in range(args.students)
+        ]
+        # Two per student: submit sends check and crit at the same time.
+        workers = args.students * 2
+        client.resize_pool(workers)
+        ctx = types.SimpleNamespace(
+            server_url=server_url, problem_id=args.problem_id, seed=args.seed, ramp=args.ramp,
+            checks=args.checks, think=args.think, duration=args.duration, stats=Stats(),
+            pool=ThreadPoolExecutor(max_workers=workers, thread_name_prefix="student"),
+        )
+        start = time.monotonic()
+        try:
+            asyncio.run(simulate(ctx, folders))
+        except KeyboardInterrupt:
+            print_status("Interrupted; reporting what finished.", success=False)
+        finally:
+            elapsed = time.monotonic() - start
+            ctx.pool.shutdown(wait=True)
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+    rows = summarize(ctx.stats, elapsed)
+    _print_report(rows, ctx.stats, elapsed, args.students)
+    if args.json:
+        report = {
+            "server_url": server_url,
+            "students": args.students,
+            "duration": elapsed,
+            "think": args.think,
+            "endpoints": rows,
+            "errors": {e: dict(c) for e, c in ctx.stats.errors.items() if c},
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print_status(f"Wrote {args.json}", success=True)
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "loadtest",
+        help="Simulate many students using check/crit/submit against a grading server",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--server", default=None, metavar="URL", help="Server URL to load test")
+    target.add_argument("--local", action="store_true", help="Start the bundled stand-in grader and test that")
+    parser.add_argument("--yes", action="store_true",
+                        help="Allow --server to be the grader from your jasper config")
+    parser.add_argument("-n", "--students", type=int, default=30, help="Virtual students (default 30)")
+    parser.add_argument("-d", "--duration", type=float, default=60.0,
+                        help="Seconds to keep starting new work (default 60)")
+    parser.add_argument("--think", type=float, default=5.0,
+                        help="Mean think time between actions, in seconds (default 5)")
+    parser.add_argument("--ramp", type=float, default=5.0,
+                        help="Spread student start times over this many seconds (default 5)")
+    parser.add_argument("--checks", type=int, default=3, help="Average checks before each submit (default 3)")
+    parser.add_argument("--size-scale", type=float, default=1.0,
+                        help="Multiply synthetic file sizes by this factor (default 1)")
+    parser.add_argument("--problem-id", default="101", help="Problem ID to send (default 101)")
+    parser.add_argument("--work", type=float, default=0.2,
+                        help="With --local: seconds the stand-in spends per check/crit (default 0.2)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for sizes and timing (default 0)")
+    parser.add_argument("--json", default=None, metavar="FILE", help="Also write the report as JSON")
+    parser.set_defaults(func=run)
@@ -1,5 +1,6 @@
 import requests
 
+from jasper import client
 from jasper.utils import load_config
 from jasper.pretty import print_status
 
@@ -18,11 +19,10 @@ def run(args):
     except FileNotFoundError as e:
         return print_status(str(e), success=False)
 
-    server_url = cfg.get("server_url", "http://localhost:3000").rstrip("/")
-    url = f"{server_url}/ping"
+    server_url = cfg.get("server_url", "http://localhost:3000")
 
     try:
-        resp = requests.get(url, timeout=10)
+        resp = client.get(server_url, "/ping", retries=0)
     except requests.exceptions.Timeout:
         return print_status("Request timed out. Is the server reachable?", success=False)
     except requests.exceptions.ConnectionError:
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import time
+
+from jasper import results
+from jasper.pretty import print_status, show_table
+
+
+def _when(ts):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts)) if ts else "—"
+
+
+def _ratio(a, b):
+    return "—" if a is None or b is None else f"{a}/{b}"
+
+
+def _outcome(passed):
+    if passed is None:
+        return "—"
+    return "✅ Passed" if passed else "❌ Failed"
+
+
+def _show_overview(conn):
+    rows = [
+        {
+            "problem": r["problem"],
+            "runs": r["runs"],
+            "submits": r["submits"],
+            "best points": _ratio(r["best_points"], r["points_total"]),
+            "last check": _outcome(r["last_passed"]),
+            "first passed": _when(r["first_pass"]),
+            "last run": _when(r["last_run"]),
+        }
+        for r in results.overview(conn)
+    ]
+    show_table(rows, title="Local results")
+
+
+def _show_problem(conn, problem, limit):
+    runs = results.problem_history(conn, problem, limit)
+    if not runs:
+        return print_status(f"No recorded results for '{problem}'.", success=False)
+    rows = [
+        {
+            "when": _when(r["created"]),
+            "kind": r["kind"] + (f" (test {r['test_index']})" if r["test_index"] else ""),
+            "tests": _ratio(r["tests_passed"], r["tests_total"]),
+            "points": _ratio(r["points"], r["points_total"]),
+            "grade": "—" if r["grade"] is None else f"{r['grade']:g}",
+            "result": _outcome(r["passed"]),
+            "tree": (r["tree"] or "")[:8],
+        }
+        for r in runs
+    ]
+    show_table(rows, title=f"Pass history for {runs[0]['problem']} (newest first)")
+
+
+def _show_regressions(conn, limit):
+    found = results.regressions(conn, limit)
+    if not found:
+        return print_status("No test has gone from passing to failing yet.", success=True)
+    rows = [
+        {
+            "problem": problem,
+            "test": test,
+            "regressions": count,
+            "last regressed": _when(last),
+            "now": "✅ passing" if now else "❌ failing",
+        }
+        for problem, test, count, last, now in found
+    ]
+    show_table(rows, title="Tests that regressed most often")
+
+
+def run(args):
+    path = results.db_path()
+    if not os.path.exists(path):
+        return print_status("No results recorded yet. Run `jasper check` first.", success=False)
+    try:
+        conn = results.connect(path)
+    except sqlite3.Error as e:
+        return print_status(f"Could not open {path}: {e}", success=False)
+    try:
+        if args.regressions:
+            _show_regressions(conn, args.limit)
+        elif args.problem:
+            _show_problem(conn, args.problem, args.limit)
+        else:
+            _show_overview(conn)
+    finally:
+        conn.close()
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "stats",
+        help="Summarize your local check/crit/submit results",
+    )
+    parser.add_argument("problem", nargs="?", help="Show the run history of one problem (id or folder name)")
+    parser.add_argument("--regressions", action="store_true",
+                        help="List the tests that most often went from passing to failing")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="Maximum rows to show (default 20)")
+    parser.set_defaults(func=run)
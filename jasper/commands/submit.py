@@ -1,28 +1,67 @@
 import os
 import json
+import threading
+import time
 import requests
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime
-from jasper.utils import load_config, zip_folder
+from jasper import cache, delta, ignore, results, timings, workspace
+from jasper.archive import build_archive
+from jasper.utils import load_config, run_in_background
 from jasper.commands.check import run_tests
 from jasper.commands.crit import run_critique
+from jasper.commands.history import forget_cached_history
+
+# Shared wall-clock budget for the check + critique round-trips.
+SUBMIT_DEADLINE = 300
+
+def _wait(future, deadline):
+    return future.result(timeout=max(0.0, deadline - time.monotonic()))
 
 def run(args):
     print("🚀 Submitting...")
 
     config = load_config()
-    folder_name = os.path.basename(os.getcwd())
+    problem_id = workspace.resolve().problem_id
 
-    if "-" not in folder_name:
+    if problem_id is None:
         print("❌ Folder name must follow the format `132-hello-world`.")
         return
 
-    problem_id = folder_name.split("-")[0]
     student_id = config.get("student_id", "testuser")
     server_url = config.get("server_url", "http://localhost:3000")
 
-    print("Step 1/4: Running unit tests...")
-    test_result = run_tests(announce_request=False)
+    # Package once: check, crit and submit all upload this same snapshot.
+    try:
+        selection = ignore.preflight(".")
+        archive = build_archive(".", selection.included)
+        tree = cache.tree_hash(archive=archive)
+    except ignore.PackageTooLarge as e:
+        print(e)
+        return
+    except Exception as e:
+        print(f"❌ Packaging failed: {e}")
+        return
+
+    # Check and critique are independent, so both requests go out together.
+    deadline = time.monotonic() + SUBMIT_DEADLINE
+    tests_future = run_in_background(run_tests, announce_request=False, archive=archive, tree=tree)
+    # The critique thread cannot be stopped once its upload has started; on
+    # abort it is told to drop whatever comes back instead of printing or
+    # saving it, and exits with the process.
+    abandon_critique = threading.Event()
+    critique_future = run_in_background(run_critique, print_crit=False, archive=archive, cancel=abandon_critique,
+                                        tree=tree)
+
+    print("Step 1/4: Running unit tests (critique runs alongside)...")
+    try:
+        with timings.span("wait for tests"):
+            test_result = _wait(tests_future, deadline)
+    except FutureTimeout:
+        test_result = None
+        print(f"❌ Unit tests did not finish within {SUBMIT_DEADLINE}s.")
     if test_result is None:
+        abandon_critique.set()
         print("❌ Unit tests failed or could not be run. Aborting submit.")
         return
     print(" Unit tests completed.")
@@ -31,37 +70,43 @@ def run(args):
     os.makedirs(".jasper", exist_ok=True)
     try:
         with open(".jasper/tests.json", "w", encoding="utf-8") as f:
-            json.dump(test_result, f, indent=2)
+            json.dump(test_result, f, separators=(",", ":"))
     except Exception as e:
         print(f"❌ Could not save test results: {e}")
         return
     print(" Test results saved.")
 
-    print("Step 3/4: Running critique...")
-    critique_result = run_critique(print_crit=False)
+    print("Step 3/4: Waiting for critique...")
+    try:
+        with timings.span("wait for critique"):
+            critique_result = _wait(critique_future, deadline)
+    except FutureTimeout:
+        abandon_critique.set()
+        critique_result = None
+        print(f"❌ Critique did not finish within {SUBMIT_DEADLINE}s.")
     if critique_result is None:
         print("❌ Critique step failed. Aborting submit.")
         return
     print(" Critique completed.")
 
-    print("Step 4/4: Packaging and submitting to server...")
+    print("Step 4/4: Submitting to server...")
     try:
-        zip_path = zip_folder(".")
-        with open(zip_path, "rb") as f:
-            files = {"file": f}
-            data = {
-                "student_id": student_id,
-                "problem_id": problem_id,
-                "grade": critique_result.get("grade", 0),
-                "passed": test_result.get("passed", False)
-            }
-            res = requests.post(f"{server_url}/submit", data=data, files=files)
-            res.raise_for_status()
+        data = {
+            "student_id": student_id,
+            "problem_id": problem_id,
+            "grade": critique_result.get("grade", 0),
+            "passed": test_result.get("passed", False)
+        }
+        with timings.span("upload /submit"):
+            res = delta.upload(server_url, "/submit", data, archive=archive)
+        res.raise_for_status()
+        forget_cached_history()  # the next `jasper history` must show this submission
+        results.record("submit", dict(test_result, grade=critique_result.get("grade")), tree)
     except requests.RequestException as e:
         print(f"❌ Error contacting server: {e}")
         return
     except Exception as e:
-        print(f"❌ Packaging or submission failed: {e}")
+        print(f"❌ Submission failed: {e}")
         return
 
     # --- Only here if all steps pass ---
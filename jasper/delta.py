@@ -0,0 +1,161 @@
+"""
+Content-addressed delta uploads.
+
+Instead of uploading the whole project on every request, the client first
+describes it by content hash and only sends what the server has not seen:
+
+    POST /manifest  {"student_id", "problem_id", "files": {path: {"sha256", "size"}}}
+        -> 200 {"manifest_id": ..., "missing": [sha256, ...]}
+    POST /blobs     form field manifest_id + a zip whose members are named by sha256
+        -> 200 {"stored": N}
+    POST /check, /crit, /submit, /relay
+                    the usual form fields plus manifest_id, no file part
+        -> the usual response, or 409 {"missing": [...]} if blobs were evicted
+
+Servers without /manifest answer 404/405/501 and the client falls back to a
+regular full-archive upload; the result is remembered for the rest of the
+process so the probe is paid at most once.
+"""
+import hashlib
+import io
+import zipfile
+from functools import partial
+
+from jasper import client, timings
+from jasper.archive import CHUNK_SIZE, iter_files, stream_archive, stream_entries
+
+UNSUPPORTED_STATUSES = {404, 405, 501}
+
+BLOB_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+BLOB_MODE = 0o100644
+
+# Server URLs that answered the /manifest probe with "not implemented".
+_unsupported = set()
+
+
+def _folder_entries(folder_path, files=None):
+    for full_path, arcname in files if files is not None else iter_files(folder_path):
+        yield arcname, partial(open, full_path, "rb")
+
+
+def _archive_entries(archive):
+    zipf = zipfile.ZipFile(io.BytesIO(archive))
+    for info in zipf.infolist():
+        if not info.is_dir():
+            yield info.filename, partial(zipf.open, info.filename)
+
+
+def _hash(opener):
+    digest = hashlib.sha256()
+    size = 0
+    with opener() as f:
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def build_manifest(entries):
+    """
+    Hash every entry.
+
+    Returns:
+        tuple: (manifest, blobs) where manifest maps path -> {"sha256", "size"}
+        and blobs maps sha256 -> opener for the content.
+    """
+    manifest, blobs = {}, {}
+    for arcname, opener in entries:
+        sha, size = _hash(opener)
+        manifest[arcname] = {"sha256": sha, "size": size}
+        blobs.setdefault(sha, opener)
+    return manifest, blobs
+
+
+def _stream_blobs(blobs, missing):
+    entries = (
+        (sha, blobs[sha], BLOB_DATE_TIME, BLOB_MODE)
+        for sha in missing
+        if sha in blobs
+    )
+    return stream_entries(entries)
+
+
+def try_upload(base_url, path, fields, folder_path=".", archive=None, selection=None):
+    """
+    Send a request using the delta protocol.
+
+    Args:
+        archive (bytes): Optional in-memory snapshot to describe instead of
+            `folder_path`, so repeated uploads stay consistent.
+        selection (ignore.Selection): The files ignore.preflight() already
+            found in `folder_path`, so the folder is not walked again.
+
+    Returns:
+        requests.Response, or None if the server does not speak the
+        protocol (or lost blobs mid-way) and the caller should fall back.
+    """
+    if base_url in _unsupported:
+        return None
+
+    if archive is not None:
+        entries = _archive_entries(archive)
+    else:
+        entries = _folder_entries(folder_path, selection.included if selection is not None else None)
+    with timings.span("hash files") as sp:
+        manifest, blobs = build_manifest(entries)
+        sp.set(files=len(manifest), bytes=sum(f["size"] for f in manifest.values()))
+
+    resp = client.post(
+        base_url,
+        "/manifest",
+        json={**fields, "files": manifest},
+        idempotent=True,
+    )
+    if resp.status_code in UNSUPPORTED_STATUSES:
+        _unsupported.add(base_url)
+        return None
+    if resp.status_code != 200:
+        return None
+    try:
+        offer = resp.json()
+        manifest_id = offer["manifest_id"]
+    except (ValueError, KeyError):
+        _unsupported.add(base_url)
+        return None
+    missing = offer.get("missing") or []
+    sizes = {f["sha256"]: f["size"] for f in manifest.values()}
+
+    if missing:
+        resp = client.upload(
+            base_url,
+            "/blobs",
+            {"manifest_id": manifest_id},
+            partial(_stream_blobs, blobs, missing),
+            filename="blobs.zip",
+            size_hint=sum(sizes.get(sha, 0) for sha in missing),
+        )
+        if resp.status_code != 200:
+            return None
+
+    resp = client.post(base_url, path, data={**fields, "manifest_id": manifest_id})
+    if resp.status_code == 409:
+        return None
+    return resp
+
+
+def upload(base_url, path, fields, folder_path=".", archive=None, selection=None):
+    """
+    Upload a project to `path`, sending only unseen file contents when the
+    server supports it and the full archive otherwise.
+    """
+    resp = try_upload(base_url, path, fields, folder_path, archive, selection)
+    if resp is not None:
+        return resp
+    if archive is None:
+        files = selection.included if selection is not None else None
+        archive = partial(stream_archive, folder_path, files=files)
+    size_hint = selection.total if selection is not None else None
+    return client.upload(base_url, path, fields, archive, size_hint=size_hint)
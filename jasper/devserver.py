@@ -0,0 +1,505 @@
+"""
+Stand-in grading server for offline development and benchmarks.
+
+Speaks the same endpoints the CLI talks to, without compiling or grading
+anything: uploads are unpacked and counted, and canned results come back in
+the shapes the commands expect. Also implements the delta upload protocol
+(see jasper.delta) and resumable chunked uploads (see jasper.resumable);
+--drop-rate makes it cut the connection in the middle of that fraction of
+upload chunks, to exercise resuming.
+
+Starter code for `/get-problem` is served from a directory of problem folders
+(`NNN-name/`, with an optional meta.json naming its "module").
+
+    python -m jasper.devserver [--port 5000] [--problems DIR] [--drop-rate 0.2]
+"""
+import argparse
+import base64
+import email.parser
+import email.policy
+import email.utils
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+import zipfile
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from jasper.archive import file_entry, iter_files, stream_entries
+
+UPLOAD_ENDPOINTS = ("/check", "/crit", "/submit", "/relay")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+)$")
+
+
+class GraderState:
+    """Everything the stand-in remembers between requests."""
+
+    def __init__(self, problems_dir=None, work=0.0, drop_rate=0.0):
+        self.problems_dir = problems_dir
+        self.work = work         # seconds of pretend grading per /check and /crit
+        self.drop_rate = drop_rate  # fraction of upload chunks cut off mid-transfer
+        self.random = random.Random(0)
+        self.uploads = {}        # upload_id -> {"size", "sha256", "data": bytearray}
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.blobs = {}          # sha256 -> bytes
+        self.manifests = {}      # manifest_id -> {path: {"sha256", "size"}}
+        self.bytes_in = defaultdict(int)
+        self.requests = defaultdict(int)
+        self.relay_seq = 0
+        self.history = defaultdict(list)  # student_id -> [problem record]
+        self.history_changed = time.time()
+
+    def record(self, path, nbytes):
+        with self.lock:
+            self.bytes_in[path] += nbytes
+            self.requests[path] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "bytes_in": dict(self.bytes_in),
+                "requests": dict(self.requests),
+                "dropped": self.dropped,
+            }
+
+
+def _read_body(handler):
+    if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+        parts = []
+        while True:
+            size = int(handler.rfile.readline().split(b";")[0].strip(), 16)
+            if size == 0:
+                handler.rfile.readline()
+                break
+            parts.append(handler.rfile.read(size))
+            handler.rfile.readline()
+        return b"".join(parts)
+    length = int(handler.headers.get("Content-Length") or 0)
+    return handler.rfile.read(length)
+
+
+def parse_form(content_type, body):
+    """Return (fields, files) from a urlencoded or multipart body."""
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        return dict(parse_qsl(body.decode())), {}
+    if not content_type.startswith("multipart/form-data"):
+        return {}, {}
+    msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body
+    )
+    fields, files = {}, {}
+    for part in msg.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True) or b""
+        if part.get_filename():
+            files[name] = payload
+        else:
+            fields[name] = payload.decode()
+    return fields, files
+
+
+def _problem_files(folders):
+    """
+    What /get-problem serves from each folder, in both formats.
+
+    Returns:
+        list: (project name, [(full_path, arcname), ...] sorted by arcname)
+        per folder. The ignore rules apply, as they do to uploads.
+    """
+    return [
+        (
+            os.path.basename(folder),
+            sorted(((p, a.replace(os.sep, "/")) for p, a in iter_files(folder)), key=lambda f: f[1]),
+        )
+        for folder in folders
+    ]
+
+
+def _problems_etag(problems):
+    """ETag from each file's name, size and mtime, so a 304 needs no file contents."""
+    digest = hashlib.sha256()
+    for project, files in problems:
+        for full_path, arcname in files:
+            st = os.stat(full_path)
+            digest.update(f"{project}/{arcname}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return '"%s"' % digest.hexdigest()[:32]
+
+
+def _read_problem(project, files):
+    contents = {}
+    meta = None
+    for full_path, arcname in files:
+        with open(full_path, "rb") as f:
+            data = f.read()
+        if arcname == "meta.json":
+            meta = json.loads(data)
+            continue
+        contents[arcname] = {"content_base64": base64.b64encode(data).decode()}
+    item = {"project_name": project, "files": contents}
+    if meta is not None:
+        item["meta"] = meta
+    return item
+
+
+def _problem_entries(problems):
+    for project, files in problems:
+        for full_path, arcname in files:
+            yield file_entry(full_path, f"{project}/{arcname}")
+
+
+def find_problems(problems_dir, query):
+    """Folders matching a problem id/name, or every folder in a module."""
+    if not problems_dir or not os.path.isdir(problems_dir):
+        return None, []
+    folders = sorted(
+        os.path.join(problems_dir, d) for d in os.listdir(problems_dir)
+        if os.path.isdir(os.path.join(problems_dir, d))
+    )
+    q = (query or "").lower()
+    for folder in folders:
+        name = os.path.basename(folder).lower()
+        if name == q or name.split("-")[0] == q:
+            return "problem", [folder]
+    module = []
+    for folder in folders:
+        try:
+            with open(os.path.join(folder, "meta.json")) as f:
+                if str(json.load(f).get("module", "")).lower() == q:
+                    module.append(folder)
+        except (OSError, ValueError):
+            continue
+    return ("module", module) if module else (None, [])
+
+
+def _unzip(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        return {info.filename: zipf.read(info) for info in zipf.infolist() if not info.is_dir()}
+
+
+class GraderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        self.state.record(path, 0)
+        if path == "/get-problem":
+            return self._get_problem(dict(parse_qsl(url.query)))
+        if path == "/api/healthz":
+            return self._send_json(200, {"ok": True})
+        if path == "/ping":
+            return self._send_json(200, {"ok": True, "service": "stand-in grader", "message": "pong"})
+        if path == "/stats":
+            return self._send_json(200, self.state.stats())
+        if path.startswith("/uploads/"):
+            return self._upload_status(path[len("/uploads/"):])
+        return self._send_json(404, {"error": "Not found"})
+
+    def do_PUT(self):
+        path = urlparse(self.path).path
+        if not path.startswith("/uploads/"):
+            _read_body(self)
+            return self._send_json(404, {"error": "Not found"})
+        self._put_chunk(path[len("/uploads/"):])
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = _read_body(self)
+        self.state.record(path, len(body))
+        content_type = self.headers.get("Content-Type", "")
+
+        if path == "/history":
+            return self._history(json.loads(body or b"{}"))
+        if path == "/manifest":
+            return self._manifest(json.loads(body or b"{}"))
+        if path == "/uploads":
+            return self._begin_upload(json.loads(body or b"{}"))
+        if path == "/blobs" or path in UPLOAD_ENDPOINTS:
+            fields, files = parse_form(content_type, body)
+            if "upload_id" in fields and "file" not in files:
+                data, error = self._finished_upload(fields["upload_id"])
+                if error:
+                    return self._send_json(409, error)
+                files["file"] = data
+            if path == "/blobs":
+                return self._blobs(fields, files)
+            return self._upload(path, fields, files)
+        return self._send_json(404, {"error": "Not found"})
+
+    def _begin_upload(self, request):
+        try:
+            size, sha256 = int(request["size"]), str(request["sha256"])
+        except (KeyError, TypeError, ValueError):
+            return self._send_json(400, {"error": "size and sha256 are required"})
+        upload_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.uploads[upload_id] = {"size": size, "sha256": sha256, "data": bytearray()}
+        self._send_json(201, {"upload_id": upload_id, "offset": 0, "chunk_size": UPLOAD_CHUNK_SIZE})
+
+    def _upload_status(self, upload_id):
+        with self.state.lock:
+            upload = self.state.uploads.get(upload_id)
+            if upload is None:
+                return self._send_json(404, {"error": "Unknown upload"})
+            offset = len(upload["data"])
+        self._send_json(200, {"offset": offset, "size": upload["size"]})
+
+    def _drop_connection(self):
+        # Take part of the body, then vanish without a response, the way a
+        # dropped Wi-Fi connection looks to the client.
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length // 2)
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _put_chunk(self, upload_id):
+        with self.state.lock:
+            drop = self.state.drop_rate and self.state.random.random() < self.state.drop_rate
+            if drop:
+                self.state.dropped += 1
+        if drop:
+            return self._drop_connection()
+        body = _read_body(self)
+        self.state.record("/uploads", len(body))
+        match = CONTENT_RANGE_RE.match(self.headers.get("Content-Range", ""))
+        if match is None:
+            return self._send_json(400, {"error": "Content-Range is required"})
+        start, end, size = (int(g) for g in match.groups())
+        if end - start + 1 != len(body):
+            return self._send_json(400, {"error": "Content-Range does not match the body"})
+        if hashlib.sha256(body).hexdigest() != self.headers.get("X-Chunk-SHA256", ""):
+            return self._send_json(422, {"error": "Chunk checksum mismatch"})
+        with self.state.lock:
+            upload = self.state.uploads.get(upload_id)
+            if upload is None:
+                return self._send_json(404, {"error": "Unknown upload"})
+            data = upload["data"]
+            if start != len(data) or size != upload["size"] or end >= size:
+                return self._send_json(409, {"offset": len(data)})
+            data += body
+            offset = len(data)
+        self._send_json(200, {"offset": offset})
+
+    def _finished_upload(self, upload_id):
+        with self.state.lock:
+            upload = self.state.uploads.get(upload_id)
+        if upload is None:
+            return None, {"error": "Unknown upload"}
+        data = bytes(upload["data"])
+        if len(data) != upload["size"]:
+            return None, {"error": "Upload incomplete", "offset": len(data)}
+        if hashlib.sha256(data).hexdigest() != upload["sha256"]:
+            with self.state.lock:
+                self.state.uploads.pop(upload_id, None)
+            return None, {"error": "Upload does not match its checksum"}
+        return data, None
+
+    def _get_problem(self, params):
+        kind, folders = find_problems(self.state.problems_dir, params.get("q"))
+        if kind is None:
+            return self._send_json(404, {"error": "No released problems"})
+        if kind == "module" and params.get("list"):
+            # Names only; the client then fetches each problem on its own.
+            return self._send_json(200, {"items": [{"project_name": os.path.basename(f)} for f in folders]})
+        problems = _problem_files(folders)
+        etag = _problems_etag(problems)
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if "application/zip" not in self.headers.get("Accept", ""):
+            if kind == "problem":
+                payload = _read_problem(*problems[0])
+            else:
+                payload = {"items": [_read_problem(*problem) for problem in problems]}
+            return self._send_json(200, payload, headers={"ETag": etag, "Vary": "Accept"})
+
+        # Binary transfer: one zip with a top-level folder per problem.
+        body = b"".join(stream_entries(_problem_entries(problems)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _history(self, payload):
+        student_id = payload.get("student_id")
+        if not student_id:
+            return self._send_json(400, {"error": "Missing student_id"})
+        module = (payload.get("module") or "").lower()
+        since = payload.get("since") or ""
+        with self.state.lock:
+            problems = [
+                p for p in self.state.history.get(student_id, [])
+                if (not module or p["module"].lower() == module) and p["timestamp"] >= since
+            ]
+            changed = self.state.history_changed
+        result = {"student_id": student_id, "problems": problems}
+        etag = '"%s"' % hashlib.sha256(json.dumps(result, sort_keys=True).encode()).hexdigest()[:32]
+        headers = {"ETag": etag, "Last-Modified": email.utils.formatdate(changed, usegmt=True)}
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_json(200, result, headers=headers)
+
+    def _record_submission(self, fields):
+        problem_id = fields.get("problem_id", "")
+        record = {
+            "module": fields.get("module") or f"m{str(problem_id)[:1].zfill(2)}",
+            "problem_id": problem_id,
+            "problem_name": f"Problem {problem_id}",
+            "status": "completed",
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "server_grade": int(float(fields.get("grade") or 0)),
+            "server_grade_possible": 100,
+        }
+        with self.state.lock:
+            entries = self.state.history[fields.get("student_id", "")]
+            entries[:] = [p for p in entries if p["problem_id"] != problem_id] + [record]
+            self.state.history_changed = time.time()
+
+    def _manifest(self, payload):
+        files = payload.get("files") or {}
+        canonical = json.dumps(files, sort_keys=True).encode()
+        manifest_id = hashlib.sha256(canonical).hexdigest()
+        with self.state.lock:
+            self.state.manifests[manifest_id] = files
+            missing = sorted({f["sha256"] for f in files.values()} - self.state.blobs.keys())
+        self._send_json(200, {"manifest_id": manifest_id, "missing": missing})
+
+    def _blobs(self, fields, files):
+        if "file" not in files:
+            return self._send_json(400, {"error": "Missing blobs archive"})
+        stored = 0
+        for name, data in _unzip(files["file"]).items():
+            if hashlib.sha256(data).hexdigest() != name:
+                return self._send_json(400, {"error": f"Blob {name} does not match its hash"})
+            with self.state.lock:
+                self.state.blobs[name] = data
+            stored += 1
+        self._send_json(200, {"stored": stored})
+
+    def _project_files(self, fields, files):
+        if "file" in files:
+            return _unzip(files["file"]), None
+        manifest_id = fields.get("manifest_id")
+        with self.state.lock:
+            manifest = self.state.manifests.get(manifest_id)
+            if manifest is None:
+                return None, {"error": "Unknown manifest", "missing": []}
+            missing = [f["sha256"] for f in manifest.values() if f["sha256"] not in self.state.blobs]
+            if missing:
+                return None, {"error": "Blobs missing", "missing": missing}
+            return {p: self.state.blobs[f["sha256"]] for p, f in manifest.items()}, None
+
+    def _upload(self, path, fields, files):
+        project, error = self._project_files(fields, files)
+        if error:
+            return self._send_json(409, error)
+        problem_id = fields.get("problem_id", "")
+        if self.state.work and path in ("/check", "/crit"):
+            time.sleep(self.state.work)
+
+        if path == "/check":
+            tests = [
+                {
+                    "test": f"{name} is non-empty",
+                    "type": "check",
+                    "passed": bool(data),
+                    "points": 1,
+                }
+                for name, data in sorted(project.items())
+            ]
+            return self._send_json(200, {"passed": all(t["passed"] for t in tests), "tests": tests})
+        if path == "/crit":
+            critique = f"Stand-in review of problem {problem_id}: {len(project)} file(s) received."
+            return self._send_json(200, {"grade": 100, "critique": critique})
+        if path == "/relay":
+            with self.state.lock:
+                self.state.relay_seq += 1
+                seq = self.state.relay_seq
+            return self._send_json(200, {"relay_seq": seq, "saved_to": f"relay/{problem_id}/{seq}.zip"})
+        self._record_submission(fields)
+        return self._send_json(200, {"ok": True, "problem_id": problem_id})
+
+
+def make_server(host="127.0.0.1", port=0, problems_dir=None, work=0.0, drop_rate=0.0):
+    """
+    Create a stand-in server; port 0 picks a free port. Call serve_forever() to run it.
+
+    work is how long /check and /crit pretend to compile and grade, in seconds;
+    drop_rate is the fraction of resumable upload chunks to cut off mid-transfer.
+    """
+    state = GraderState(problems_dir, work, drop_rate)
+    handler = type("BoundGraderHandler", (GraderHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = handler.state
+    server.url = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def start_in_thread(host="127.0.0.1", port=0, problems_dir=None, work=0.0, drop_rate=0.0):
+    """Start a stand-in server on a daemon thread and return it."""
+    server = make_server(host, port, problems_dir, work, drop_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in jasper grading server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--problems", default=None, help="Directory of problem folders served by /get-problem")
+    parser.add_argument("--work", type=float, default=0.0,
+                        help="Seconds /check and /crit spend pretending to grade (default 0)")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="Fraction of resumable upload chunks to cut off mid-transfer (default 0)")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.problems, args.work, args.drop_rate)
+    print(f"Stand-in grader listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Show where a test's actual output departs from the expected output.
+
+Outputs can run to megabytes (a runaway loop, a big I/O test), so they are
+never split or copied whole: the first difference is found by comparing
+blocks, lines are located with str.find/count, and only a small window of
+lines around the difference is rendered, one line at a time.
+"""
+BLOCK = 64 * 1024
+CONTEXT_BEFORE = 2
+CONTEXT_AFTER = 4
+MAX_LINE = 160
+# Outputs up to this size are shown whole, as before.
+SMALL_CHARS = 2000
+SMALL_LINES = 40
+PASSED_LINES = 20
+
+
+def first_divergence(a, b):
+    """Index of the first character where a and b differ, or None if equal."""
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i:i + BLOCK] == b[i:i + BLOCK]:
+        i += BLOCK
+    if i >= n:
+        return None if len(a) == len(b) else n
+    end = min(i + BLOCK, n)
+    step = 256
+    while i < end and a[i:i + step] == b[i:i + step]:
+        i += step
+    while i < end and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def size_of(text):
+    return len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+
+
+def is_small(text):
+    return len(text) <= SMALL_CHARS and text.count("\n", 0, SMALL_CHARS) < SMALL_LINES
+
+
+def _line_start(text, pos):
+    return text.rfind("\n", 0, pos) + 1
+
+
+def _iter_lines(text, start, count):
+    """Yield up to count (start, end, has_newline) line spans from offset start."""
+    pos = start
+    for _ in range(count):
+        if pos >= len(text):
+            return
+        end = text.find("\n", pos)
+        if end == -1:
+            yield pos, len(text), False
+            return
+        yield pos, end, True
+        pos = end + 1
+
+
+def _back_lines(text, pos, count):
+    """Offset of the line start `count` lines before the line containing pos."""
+    start = _line_start(text, pos)
+    for _ in range(count):
+        if start == 0:
+            break
+        start = _line_start(text, start - 1)
+    return start
+
+
+def _clip(text, start, end, col=0):
+    """
+    Cut a line span down to MAX_LINE characters around col, so a megabyte-long
+    line is never copied. Returns (text, col within it).
+    """
+    if end - start <= MAX_LINE:
+        return text[start:end], col
+    lo = max(0, min(col - MAX_LINE // 3, end - start - MAX_LINE))
+    hi = lo + MAX_LINE
+    head = f"…[{lo:,} chars] " if lo else ""
+    tail = f" …[{end - start - hi:,} chars]" if hi < end - start else ""
+    return head + text[start + lo:start + hi] + tail, col - lo + len(head)
+
+
+def _render(line, newline, show_bytes):
+    if show_bytes:
+        return repr(line + ("\n" if newline else ""))[1:-1]
+    return line
+
+
+def _count_lines(text, start=0):
+    if start >= len(text):
+        return 0
+    return text.count("\n", start) + (0 if text.endswith("\n") else 1)
+
+
+def _window(write, label, text, diff_at, show_bytes, indent):
+    total_lines = _count_lines(text)
+    diff_line = text.count("\n", 0, diff_at)
+    start = _back_lines(text, diff_at, CONTEXT_BEFORE)
+    number = diff_line - text.count("\n", start, diff_at)
+    write(f"{indent}{label} ({size_of(text):,} bytes, {total_lines:,} lines):")
+    for line_start, line_end, newline in _iter_lines(text, start, diff_line - number + 1 + CONTEXT_AFTER):
+        if number == diff_line:
+            line, col = _clip(text, line_start, line_end, diff_at - line_start)
+            write(f"{indent}> {number + 1:>6} | {_render(line, newline, show_bytes)}")
+            caret = len(_render(line[:col], False, show_bytes))
+            write(f"{indent}  {'':>6} | {' ' * caret}^")
+        else:
+            line, _ = _clip(text, line_start, line_end)
+            write(f"{indent}  {number + 1:>6} | {_render(line, newline, show_bytes)}")
+        number += 1
+    if diff_line >= total_lines:
+        write(f"{indent}  {'':>6} | (output ends here)")
+    elif number < total_lines:
+        write(f"{indent}  … {total_lines - number:,} more lines")
+
+
+def _newline_note(expected, actual):
+    """A trailing newline on one side only is invisible without --bytes; say so."""
+    if expected.endswith("\n") == actual.endswith("\n"):
+        return None
+    has, lacks = ("Expected", "actual") if expected.endswith("\n") else ("Actual", "expected")
+    return f"{has} output ends with a newline; {lacks} output does not."
+
+
+def write_mismatch(write, expected, actual, show_bytes=False, indent="    "):
+    """
+    Describe how actual differs from expected, calling write(line) per line.
+
+    Small outputs are written whole; large ones as a window of lines around
+    the first difference, with sizes and positions.
+    """
+    note = _newline_note(expected, actual)
+    if is_small(expected) and is_small(actual):
+        render = repr if show_bytes else str
+        write(f"{indent}Expected: {render(expected)}")
+        write(f"{indent}Actual:   {render(actual)}")
+        if note:
+            write(f"{indent}{note}")
+        return
+
+    at = first_divergence(expected, actual)
+    if at is None:
+        write(f"{indent}Expected and actual output are identical ({size_of(expected):,} bytes).")
+        return
+    line = expected.count("\n", 0, at)
+    col = at - _line_start(expected, at)
+    write(f"{indent}First difference at line {line + 1:,}, column {col + 1:,} (character {at:,}).")
+    _window(write, "Expected", expected, at, show_bytes, indent)
+    _window(write, "Actual", actual, at, show_bytes, indent)
+    if note:
+        write(f"{indent}{note}")
+
+
+def write_head(write, text, show_bytes=False, indent="    ", max_lines=PASSED_LINES):
+    """Write the first max_lines lines of text, then a count of what was left out."""
+    pos = 0
+    for line_start, line_end, newline in _iter_lines(text, 0, max_lines):
+        write(indent + _render(_clip(text, line_start, line_end)[0], newline, show_bytes))
+        pos = line_end + newline
+    if pos < len(text):
+        write(f"{indent}… {_count_lines(text, pos):,} more lines ({len(text) - pos:,} characters) not shown")
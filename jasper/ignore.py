@@ -0,0 +1,302 @@
+"""
+Which files in a problem folder get packaged, hashed and watched.
+
+Rules use .gitignore syntax: `#` comments, `!` to re-include, a trailing `/`
+for directories only, a leading or inner `/` to anchor at the problem folder,
+and `*`, `?`, `[...]` and `**` wildcards. The shipped DEFAULT_RULES come
+first, then the problem's own `.jasperignore`, and the last matching rule
+wins. Like git, a file inside an excluded directory cannot be re-included:
+excluded directories are pruned from the walk, never entered.
+
+Files over MAX_FILE_BYTES are left out as well, and a folder whose included
+files add up to more than MAX_TOTAL_BYTES is refused outright (see check()).
+"""
+import os
+import re
+
+IGNORE_FILE = ".jasperignore"
+
+MAX_FILE_BYTES = 8 * 1024 * 1024
+MAX_TOTAL_BYTES = 64 * 1024 * 1024
+
+# C build outputs, crash dumps, editor droppings and jasper's own state.
+# `core` plus `!core/` leaves out core dump files but keeps a source
+# directory that happens to be called core.
+DEFAULT_RULES = """
+.jasper/
+.git/
+SUBMISSION
+mysolution
+a.out
+*.o
+*.obj
+*.a
+*.so
+*.dylib
+*.gch
+*.dSYM/
+core
+!core/
+core.[0-9]*
+vgcore.*
+*.swp
+*.swo
+*.swx
+*~
+*.tmp
+4913
+.DS_Store
+__pycache__/
+.vscode/
+.idea/
+"""
+
+# Excluded by default but not worth mentioning when reporting what was left out.
+QUIET = {".jasper/", ".git/", "SUBMISSION"}
+
+
+def _translate(pattern):
+    """Regex source for one gitignore glob (already stripped of !, / markers)."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                before_ok = i == 0 or pattern[i - 1] == "/"
+                after = pattern[i + 2:i + 3]
+                if before_ok and after == "/":
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if before_ok and i + 2 == n:
+                    out.append(".*")
+                    i += 2
+                    continue
+                i += 1  # any other ** is an ordinary *
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = i + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            while end < n and pattern[end] != "]":
+                end += 1
+            if end >= n:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("(?!/)[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def _parse(line):
+    """Returns (negate, dir_only, regex source) or None for blank/comment lines."""
+    line = line.rstrip("\n")
+    # Trailing spaces are dropped unless escaped.
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    line = line.lstrip("/")
+    body = _translate(line)
+    return negate, dir_only, ("^" if anchored else "(?:^|/)") + body + "$"
+
+
+class Rules:
+    """
+    A compiled rule list. Consecutive rules of the same kind are merged into
+    one alternation, so matching costs a few regex searches, not one per rule.
+    """
+
+    def __init__(self, lines):
+        self.patterns = [p for p in (_parse(line) for line in lines) if p is not None]
+        groups = []
+        for negate, dir_only, source in self.patterns:
+            if not groups or groups[-1][0] != negate:
+                groups.append((negate, [], []))
+            groups[-1][2 if dir_only else 1].append(source)
+        self._groups = [
+            (negate, _compile(any_kind), _compile(dirs))
+            for negate, any_kind, dirs in reversed(groups)
+        ]
+
+    def ignored(self, relpath, is_dir=False):
+        """relpath is relative to the problem folder, with / or os.sep."""
+        path = relpath.replace(os.sep, "/")
+        for negate, any_kind, dirs in self._groups:
+            if (any_kind is not None and any_kind.search(path)) or (
+                is_dir and dirs is not None and dirs.search(path)
+            ):
+                return not negate
+        return False
+
+
+def _compile(sources):
+    return re.compile("|".join(f"(?:{s})" for s in sources)) if sources else None
+
+
+def load(folder_path="."):
+    """DEFAULT_RULES followed by the folder's .jasperignore, if any."""
+    lines = DEFAULT_RULES.splitlines()
+    try:
+        with open(os.path.join(folder_path, IGNORE_FILE), encoding="utf-8") as f:
+            lines += f.read().splitlines()
+    except OSError:
+        pass
+    return Rules(lines)
+
+
+def walk(folder_path, rules=None, max_file_bytes=MAX_FILE_BYTES):
+    """
+    Walk folder_path without entering excluded directories.
+
+    Yields:
+        (kind, full_path, arcname, size) where kind is "file", "ignored"
+        (arcname ends in / for directories) or "oversized"; size is None
+        for ignored entries.
+    """
+    if rules is None:
+        rules = load(folder_path)
+    stack = [(folder_path, "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel = prefix + entry.name
+            try:
+                is_dir = entry.is_dir()
+                if is_dir and entry.is_symlink():
+                    continue  # like os.walk: linked directories are not followed
+            except OSError:
+                continue
+            if rules.ignored(rel, is_dir):
+                yield "ignored", entry.path, rel + "/" if is_dir else rel, None
+            elif is_dir:
+                subdirs.append((entry.path, rel + "/"))
+            else:
+                try:
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                kind = "oversized" if max_file_bytes is not None and size > max_file_bytes else "file"
+                yield kind, entry.path, rel.replace("/", os.sep), size
+        stack.extend(reversed(subdirs))
+
+
+def iter_included(folder_path, rules=None):
+    """Yield (full_path, arcname) for every file that would be packaged."""
+    for kind, full_path, arcname, _ in walk(folder_path, rules):
+        if kind == "file":
+            yield full_path, arcname
+
+
+class PackageTooLarge(ValueError):
+    pass
+
+
+class Selection:
+    """
+    What check() found: included files and everything left out. Packaging
+    can reuse `included` instead of walking the folder again.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.total = 0
+        self.included = []   # (full_path, arcname), in walk order
+        self.ignored = []    # arcnames; directories end in /
+        self.oversized = []  # (arcname, size)
+        self.largest = []    # (size, arcname) of included files, biggest first
+
+    def notable_ignored(self):
+        return [name for name in self.ignored if name not in QUIET]
+
+
+def check(folder_path=".", rules=None, max_total_bytes=MAX_TOTAL_BYTES):
+    """
+    Walk the folder the way packaging will and summarize it.
+
+    Raises:
+        PackageTooLarge: The included files add up to more than max_total_bytes.
+    """
+    selection = Selection()
+    sizes = []
+    for kind, full_path, arcname, size in walk(folder_path, rules):
+        if kind == "ignored":
+            selection.ignored.append(arcname)
+        elif kind == "oversized":
+            selection.oversized.append((arcname, size))
+        else:
+            selection.included.append((full_path, arcname))
+            selection.files += 1
+            selection.total += size
+            sizes.append((size, arcname))
+    selection.largest = sorted(sizes, reverse=True)[:5]
+    if max_total_bytes is not None and selection.total > max_total_bytes:
+        biggest = ", ".join(f"{name} ({_mib(size)})" for size, name in selection.largest)
+        raise PackageTooLarge(
+            f"❌ This folder is {_mib(selection.total)}, over the {_mib(max_total_bytes)} upload limit. "
+            f"Largest files: {biggest}. List what the grader does not need in {IGNORE_FILE}."
+        )
+    return selection
+
+
+def preflight(folder_path=".", say=print):
+    """
+    check() the folder and tell the user what will be left out. Pass the
+    returned Selection on to packaging so the folder is walked only once.
+
+    Raises:
+        PackageTooLarge: See check().
+    """
+    selection = check(folder_path)
+    for line in describe(selection):
+        say(line)
+    return selection
+
+
+def _mib(size):
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+def describe(selection, limit=8):
+    """
+    Human-readable lines about what packaging leaves out, or [] when only
+    jasper's own state was skipped.
+    """
+    lines = []
+    ignored = selection.notable_ignored()
+    if ignored:
+        shown = ", ".join(ignored[:limit])
+        more = f" and {len(ignored) - limit} more" if len(ignored) > limit else ""
+        lines.append(f"📦 Not uploading {shown}{more} (ignore rules; edit {IGNORE_FILE} to change).")
+    for name, size in selection.oversized:
+        lines.append(f"⚠️ Not uploading {name} ({_mib(size)}): files over {_mib(MAX_FILE_BYTES)} are left out.")
+    return lines
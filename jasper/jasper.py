@@ -1,41 +1,74 @@
 import argparse
+import importlib
 import os
 import sys
 
+from jasper import timings
+
 # Extend sys.path to include commands and utils
 sys.path.append(os.path.join(os.path.dirname(__file__), "commands"))
 sys.path.append(os.path.dirname(__file__))
 
-from jasper.commands import init as init_cmd
-from jasper.commands import get as get_cmd
-from jasper.commands import explain as explain_cmd
-from jasper.commands import crit as crit_cmd
-from jasper.commands import check as check_cmd
-from jasper.commands import submit as submit_cmd
-from jasper.commands import version as version_cmd
-from jasper.commands import relay as relay_cmd
-from jasper.commands import history as history_cmd
-from jasper.commands import ping as ping_cmd
-from jasper.commands import update as update_cmd
-
-def main():
+# Subcommands in `--help` order: (name, module, help).
+# Only the module for the dispatched command is imported, so `jasper version`
+# and `jasper --help` never load requests/rich or walk the tree for config.
+COMMANDS = [
+    ("version", "jasper.commands.version", "Show jasper CLI version"),
+    ("init", "jasper.commands.init", "Initialize jasper CLI with your info"),
+    ("get", "jasper.commands.get", "Download starter code for a problem or module"),
+    ("explain", "jasper.commands.explain", "Show problem description"),
+    ("check", "jasper.commands.check", "Run only test cases"),
+    ("crit", "jasper.commands.crit", "Generate a code review"),
+    ("relay", "jasper.commands.relay", "Send your files to the instructor/TA for review (no grading)"),
+    ("submit", "jasper.commands.submit", "Submit solution for grading"),
+    ("history", "jasper.commands.history", "Show your problem history from the grading server"),
+    ("stats", "jasper.commands.stats", "Summarize your local check/crit/submit results"),
+    ("loadtest", "jasper.commands.loadtest", "Simulate many students using check/crit/submit against a grading server"),
+    ("ping", "jasper.commands.ping", "Check whether the grading server is reachable (Mongo-backed liveness when available)"),
+    ("update", "jasper.commands.update", "Upgrade jasper-cli with pipx (override SPEC or REPO env like the Makefile)"),
+]
+
+def _requested_command(argv):
+    # The top-level parser only takes flags, so the first positional is the command.
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+def _global_flags(argv):
+    # Flags before the command, known before the command module is imported.
+    wanted = _requested_command(argv)
+    return argv[:argv.index(wanted)] if wanted else argv
+
+def build_parser(argv):
     parser = argparse.ArgumentParser(description="Jasper CLI Tool")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print how long each phase took (or set JASPER_TRACE=1)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Also write a Chrome trace to .jasper/traces/ (or set JASPER_TRACE=trace)")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    version_cmd.register(subparsers)
-    init_cmd.register(subparsers)
-    get_cmd.register(subparsers)
-    explain_cmd.register(subparsers)
-    check_cmd.register(subparsers)
-    crit_cmd.register(subparsers)
-    relay_cmd.register(subparsers)
-    submit_cmd.register(subparsers)
-    history_cmd.register(subparsers)
-    ping_cmd.register(subparsers)
-    update_cmd.register(subparsers)
-
-    args = parser.parse_args()
-    args.func(args)
+    wanted = _requested_command(argv)
+    for name, module, help_text in COMMANDS:
+        if name == wanted:
+            importlib.import_module(module).register(subparsers)
+        else:
+            subparsers.add_parser(name, help=help_text)
+    return parser
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    flags = _global_flags(argv)
+    timings.configure("--timings" in flags, "--trace" in flags)
+    command = _requested_command(argv)
+    try:
+        with timings.span(f"jasper {command}"):
+            with timings.span("load command"):
+                args = build_parser(argv).parse_args(argv)
+            args.func(args)
+    finally:
+        timings.report(command)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
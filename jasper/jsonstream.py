@@ -0,0 +1,183 @@
+"""
+Incremental JSON parsing for large responses.
+
+`parse` reads a document from an iterable of byte chunks (e.g.
+`resp.iter_content()`) and builds it as usual, except that chosen string
+values are handed to a sink piece by piece instead of being held in memory.
+Peak memory is one chunk plus the non-streamed parts of the document.
+"""
+import codecs
+import json
+
+_WHITESPACE = " \t\r\n"
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_NUMBER_CHARS = set("+-0123456789.eE")
+
+
+class _Reader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+
+    def fill(self):
+        """Append the next chunk to the buffer; False at end of input."""
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        """Next non-whitespace character, without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def take(self):
+        ch = self.peek()
+        if not ch:
+            raise ValueError("Unexpected end of JSON input")
+        self.pos += 1
+        return ch
+
+    def expect(self, ch):
+        got = self.take()
+        if got != ch:
+            raise ValueError(f"Expected {ch!r} but found {got!r}")
+
+    def _ensure(self, n):
+        while len(self.buf) - self.pos < n:
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def read_string(self, write):
+        """Consume a string body (opening quote already taken), passing decoded pieces to write."""
+        while True:
+            if self.pos >= len(self.buf) and not self.fill():
+                raise ValueError("Unterminated string")
+            buf = self.buf
+            quote = buf.find('"', self.pos)
+            slash = buf.find("\\", self.pos)
+            if quote == -1 and slash == -1:
+                write(buf[self.pos:])
+                self.pos = len(buf)
+                continue
+            if slash == -1 or (quote != -1 and quote < slash):
+                if quote > self.pos:
+                    write(buf[self.pos:quote])
+                self.pos = quote + 1
+                return
+            if slash > self.pos:
+                write(buf[self.pos:slash])
+            self.pos = slash
+            self._ensure(2)
+            code = self.buf[self.pos + 1]
+            if code == "u":
+                self._ensure(6)
+                width = 6
+                if 0xD800 <= int(self.buf[self.pos + 2:self.pos + 6], 16) < 0xDC00:
+                    # High surrogate: decode together with the low half that follows.
+                    self._ensure(12)
+                    if self.buf[self.pos + 6:self.pos + 8] == "\\u":
+                        width = 12
+                write(json.loads(f'"{self.buf[self.pos:self.pos + width]}"'))
+                self.pos += width
+            elif code in _ESCAPES:
+                write(_ESCAPES[code])
+                self.pos += 2
+            else:
+                raise ValueError(f"Invalid escape \\{code}")
+
+    def read_scalar(self):
+        parts = []
+        while True:
+            start = self.pos
+            while self.pos < len(self.buf) and (self.buf[self.pos] in _NUMBER_CHARS or self.buf[self.pos].isalpha()):
+                self.pos += 1
+            parts.append(self.buf[start:self.pos])
+            if self.pos < len(self.buf) or not self.fill():
+                break
+        token = "".join(parts)
+        if token == "true":
+            return True
+        if token == "false":
+            return False
+        if token == "null":
+            return None
+        return json.loads(token)
+
+
+def _parse_value(reader, path, stream_at):
+    ch = reader.peek()
+    if ch == "{":
+        reader.take()
+        obj = {}
+        if reader.peek() == "}":
+            reader.take()
+            return obj
+        while True:
+            reader.expect('"')
+            parts = []
+            reader.read_string(parts.append)
+            key = "".join(parts)
+            reader.expect(":")
+            obj[key] = _parse_value(reader, path + (key,), stream_at)
+            sep = reader.take()
+            if sep == "}":
+                return obj
+            if sep != ",":
+                raise ValueError(f"Expected ',' or '}}' but found {sep!r}")
+    if ch == "[":
+        reader.take()
+        arr = []
+        if reader.peek() == "]":
+            reader.take()
+            return arr
+        while True:
+            arr.append(_parse_value(reader, path + (len(arr),), stream_at))
+            sep = reader.take()
+            if sep == "]":
+                return arr
+            if sep != ",":
+                raise ValueError(f"Expected ',' or ']' but found {sep!r}")
+    if ch == '"':
+        reader.take()
+        sink = stream_at(path) if stream_at else None
+        if sink is None:
+            parts = []
+            reader.read_string(parts.append)
+            return "".join(parts)
+        reader.read_string(sink.write)
+        return sink.finish()
+    if not ch:
+        raise ValueError("Unexpected end of JSON input")
+    return reader.read_scalar()
+
+
+def parse(chunks, stream_at=None):
+    """
+    Parse one JSON document from byte chunks.
+
+    Args:
+        chunks: Iterable of bytes.
+        stream_at: Optional callable taking the path of a string value (a
+            tuple of keys and list indexes) and returning a sink with
+            `write(text)` and `finish()`, or None to keep the string. The
+            value stored in the result is whatever `finish()` returns.
+
+    Raises:
+        ValueError: The input is not valid JSON.
+    """
+    reader = _Reader(chunks)
+    value = _parse_value(reader, (), stream_at)
+    if reader.peek():
+        raise ValueError("Extra data after JSON document")
+    return value
@@ -0,0 +1,262 @@
+"""
+Run a problem's test cases on this machine (`jasper check --local`).
+
+Builds with `make`, then runs every input/output test listed in the
+problem's meta.json, several at a time, each with its own timeout:
+
+    {
+      "binary": "mysolution",          optional, the default
+      "timeout": 10,                   optional default per test, seconds
+      "tests": [
+        {"test": "adds two numbers", "args": ["3", "4"], "expected": "7\\n", "points": 1},
+        {"test": "big input", "input_file": "tests/big.in", "expected_file": "tests/big.out",
+         "points": 2, "timeout": 5, "exit_code": 0}
+      ]
+    }
+
+input_file is fed to stdin. exit_code, when given, must match too; a
+program killed by a signal always fails.
+
+Results come back in the shape the server's /check returns, so
+check.pretty_print shows them unchanged. Outputs are compared exactly. Tests
+of other types (memory, style checks) only run on the server, which stays
+the final word.
+"""
+import json
+import os
+import selectors
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BINARY = "mysolution"
+DEFAULT_TEST_TIMEOUT = 10.0
+MAKE_TIMEOUT = 300
+MAX_OUTPUT_BYTES = 16 * 1024 * 1024  # a runaway loop is stopped, not buffered forever
+MAX_STDERR_BYTES = 64 * 1024
+READ_CHUNK = 64 * 1024
+
+INPUT_KEYS = ("input_file", "in_file", "stdin_file", "inpath")
+EXPECTED_KEYS = ("expected_file", "output_file", "out_file", "outpath")
+
+
+# make relinks the binary the tests execute, so two runs in one folder must
+# never overlap (watch mode, say, re-running after an edit).
+_run_lock = threading.Lock()
+
+
+class LocalRunError(Exception):
+    """The tests could not be run at all (no meta.json, make failed, ...)."""
+
+
+def load_tests(folder):
+    """
+    Returns:
+        tuple: (meta dict, all tests, runnable io tests as (number, test)
+        pairs numbered by position in meta.json as the server does, number of
+        server-only tests)
+    """
+    try:
+        with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        raise LocalRunError("❌ meta.json not found in this folder.")
+    except ValueError as e:
+        raise LocalRunError(f"❌ meta.json is not valid JSON: {e}")
+    tests = meta.get("tests") or []
+    runnable = [(i, t) for i, t in enumerate(tests, start=1) if t.get("type", "io") == "io"]
+    if not runnable:
+        raise LocalRunError("❌ meta.json lists no input/output tests to run locally. Use `jasper check` instead.")
+    return meta, tests, runnable, len(tests) - len(runnable)
+
+
+def build(folder, timeout=MAKE_TIMEOUT):
+    """Run make; raises LocalRunError with its output if the build fails."""
+    try:
+        proc = subprocess.run(["make"], cwd=folder, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              timeout=timeout)
+    except FileNotFoundError:
+        raise LocalRunError("❌ `make` is not installed.")
+    except subprocess.TimeoutExpired:
+        raise LocalRunError(f"❌ `make` did not finish within {timeout}s.")
+    if proc.returncode != 0:
+        log = proc.stdout.decode("utf-8", errors="replace")
+        raise LocalRunError(f"❌ `make` failed (exit {proc.returncode}):\n{log}")
+
+
+def _first(test, keys):
+    for key in keys:
+        if test.get(key):
+            return key, str(test[key])
+    return None, None
+
+
+def _args(test):
+    args = test.get("args") or []
+    return shlex.split(args) if isinstance(args, str) else [str(a) for a in args]
+
+
+def _kill(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_capped(cmd, cwd, stdin_path, timeout):
+    """
+    Run cmd with a deadline and an output cap, killing its whole process
+    group if either is hit.
+
+    Returns:
+        tuple: (stdout bytes, stderr bytes, return code, timed_out, truncated)
+    """
+    stdin = open(stdin_path, "rb") if stdin_path else subprocess.DEVNULL
+    stderr = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(cmd, cwd=cwd, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr,
+                                start_new_session=True)
+        deadline = time.monotonic() + timeout
+        out = bytearray()
+        timed_out = truncated = False
+        with selectors.DefaultSelector() as sel:
+            sel.register(proc.stdout, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                if not sel.select(remaining):
+                    continue
+                block = os.read(proc.stdout.fileno(), READ_CHUNK)
+                if not block:
+                    break
+                out += block
+                if len(out) > MAX_OUTPUT_BYTES:
+                    del out[MAX_OUTPUT_BYTES:]
+                    truncated = True
+                    break
+        if timed_out or truncated:
+            _kill(proc)
+        try:
+            returncode = proc.wait(timeout=max(0.0, deadline - time.monotonic()) or 0.1)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            _kill(proc)
+            returncode = proc.wait()
+        proc.stdout.close()
+        stderr.seek(0)
+        return bytes(out), stderr.read(MAX_STDERR_BYTES), returncode, timed_out, truncated
+    finally:
+        stderr.close()
+        if stdin is not subprocess.DEVNULL:
+            stdin.close()
+
+
+def _signal_name(signum):
+    try:
+        return signal.Signals(signum).name
+    except ValueError:  # real-time and platform-specific signals have no name
+        return f"signal {signum}"
+
+
+def _read_text(folder, path):
+    with open(os.path.join(folder, path), "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def run_test(folder, binary, test, index, default_timeout):
+    """Run one test and return it in the server's result shape."""
+    name = test.get("test") or test.get("name") or f"test {index}"
+    args = _args(test)
+    input_key, input_file = _first(test, INPUT_KEYS)
+    result = {
+        "test": name,
+        "type": "io",
+        "points": int(test.get("points", 1)),
+        "args": args,
+    }
+    if input_file:
+        result[input_key] = input_file
+        result["stdin"] = True
+
+    expected_key, expected_file = _first(test, EXPECTED_KEYS)
+    try:
+        expected = _read_text(folder, expected_file) if expected_file else str(test.get("expected", ""))
+    except OSError as e:
+        return dict(result, passed=False, expected="", actual=f"(could not read {expected_file}: {e.strerror})")
+    result["expected"] = expected
+    if input_file and not os.path.isfile(os.path.join(folder, input_file)):
+        return dict(result, passed=False, actual=f"(input file {input_file} not found)")
+
+    timeout = float(test.get("timeout") or default_timeout)
+    start = time.perf_counter()
+    try:
+        out, err, returncode, timed_out, truncated = run_capped(
+            [os.path.join(".", binary), *args],
+            folder,
+            os.path.join(folder, input_file) if input_file else None,
+            timeout,
+        )
+    except OSError as e:
+        return dict(result, passed=False, actual=f"(could not run ./{binary}: {e.strerror})")
+    actual = out.decode("utf-8", errors="replace")
+    passed = not timed_out and not truncated and returncode >= 0 and actual == expected
+    if "exit_code" in test and returncode != int(test["exit_code"]):
+        passed = False
+        actual += f"\n↩️ Exited with {returncode}, expected {test['exit_code']}"
+    if timed_out:
+        actual += f"\n⏱️ Timed out after {timeout:g}s"
+    elif truncated:
+        actual += f"\n✂️ Stopped after {MAX_OUTPUT_BYTES // (1024 * 1024)} MiB of output"
+    elif returncode < 0:
+        actual += f"\n💥 Killed by {_signal_name(-returncode)}"
+    return dict(
+        result,
+        passed=passed,
+        actual=actual,
+        exit_code=returncode,
+        stderr=err.decode("utf-8", errors="replace"),
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+
+
+def run_local(folder=".", test_index=None, jobs=None):
+    """
+    Build and run the folder's tests locally.
+
+    Returns:
+        dict: {"passed", "tests", "local": True, "server_only": N}.
+    Raises:
+        LocalRunError: meta.json is missing or has no tests, the test number
+            is out of range or names a test only the server can run, or make
+            failed.
+    """
+    meta, tests, numbered, server_only = load_tests(folder)
+    if test_index is not None:
+        if not 1 <= test_index <= len(tests):
+            raise LocalRunError(f"❌ There is no test {test_index}; meta.json has {len(tests)}.")
+        numbered = [(i, t) for i, t in numbered if i == test_index]
+        if not numbered:
+            kind = tests[test_index - 1].get("type")
+            raise LocalRunError(f"❌ Test {test_index} is a {kind} test, which only runs on the server. "
+                                f"Use `jasper check -t {test_index}` instead.")
+
+    binary = str(meta.get("binary") or DEFAULT_BINARY)
+    default_timeout = float(meta.get("timeout") or DEFAULT_TEST_TIMEOUT)
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(numbered)))
+    with _run_lock:
+        build(folder)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="local-test") as pool:
+            results = list(pool.map(lambda item: run_test(folder, binary, item[1], item[0], default_timeout),
+                                    numbered))
+    return {
+        "passed": all(t["passed"] for t in results),
+        "tests": results,
+        "local": True,
+        "server_only": server_only,
+    }
@@ -1,8 +1,13 @@
+import contextlib
+import sys
+import threading
+
 from rich.console import Console
 from rich.table import Table
 from rich import box
 
 console = Console()
+_progress_lock = threading.Lock()
 
 def print_status(message, success=True):
     prefix = "[green]✓[/green]" if success else "[red]✗[/red]"
@@ -20,3 +25,36 @@ def show_table(data, title="Badge Progress"):
     for row in data:
         table.add_row(*[str(row[k]) for k in row])
     console.print(table)
+
+
+class _Progress:
+    def __init__(self, progress=None, task=None):
+        self._progress = progress
+        self._task = task
+
+    def update(self, completed):
+        if self._progress is not None:
+            self._progress.update(self._task, completed=completed)
+
+
+@contextlib.contextmanager
+def transfer_progress(total, description):
+    """
+    Byte progress bar on stderr; yields an object with update(completed).
+
+    Does nothing when stderr is not a terminal or another bar is already
+    showing (e.g. uploads running on worker threads).
+    """
+    if not sys.stderr.isatty() or not _progress_lock.acquire(blocking=False):
+        yield _Progress()
+        return
+    try:
+        from rich.progress import (
+            BarColumn, DownloadColumn, Progress, TextColumn, TimeRemainingColumn, TransferSpeedColumn,
+        )
+        columns = (TextColumn("{task.description}"), BarColumn(), DownloadColumn(), TransferSpeedColumn(),
+                   TimeRemainingColumn())
+        with Progress(*columns, console=Console(stderr=True), transient=True) as progress:
+            yield _Progress(progress, progress.add_task(description, total=total))
+    finally:
+        _progress_lock.release()
@@ -0,0 +1,187 @@
+"""
+Append-only history of check, crit and submit results for a whole project.
+
+Every result the grader returns is recorded in `.jasper/results.sqlite3`
+under the project root, with when it happened and the hash of the source
+tree it was for, so `jasper stats` can answer questions across runs and
+problems without asking the server. Full results are kept as compressed
+compact JSON; per-test outcomes get their own table for querying.
+"""
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from jasper import workspace
+from jasper.utils import debug_print
+
+DB_NAME = "results.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    problem_id TEXT,
+    tree TEXT,
+    created REAL NOT NULL,
+    test_index INTEGER,
+    passed INTEGER,
+    tests_passed INTEGER,
+    tests_total INTEGER,
+    points INTEGER,
+    points_total INTEGER,
+    grade REAL,
+    result BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_problem ON runs (problem, created);
+CREATE TABLE IF NOT EXISTS test_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    type TEXT,
+    passed INTEGER NOT NULL,
+    points INTEGER
+);
+CREATE INDEX IF NOT EXISTS test_results_run ON test_results (run_id);
+"""
+
+
+def db_path(root=None):
+    return os.path.join(root or workspace.resolve().project_root, ".jasper", DB_NAME)
+
+
+def connect(path=None):
+    path = path or db_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")  # parallel `check --all` writers
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _tests(result):
+    return result.get("tests") or result.get("test_results") or []
+
+
+def _flag(value):
+    return None if value is None else int(bool(value))
+
+
+def record(kind, result, tree, folder_path=".", test_index=None, path=None):
+    """
+    Append one result. Never raises: a result that cannot be recorded must
+    not fail the command that produced it.
+
+    Args:
+        kind (str): "check", "crit" or "submit".
+        result (dict): The decoded server response.
+        tree (str): cache.tree_hash() of exactly what was uploaded or run.
+    """
+    try:
+        folder = os.path.basename(os.path.abspath(folder_path))
+        problem_id = folder.split("-")[0] if "-" in folder else None
+        tests = _tests(result)
+        passed_tests = [t for t in tests if t.get("passed")]
+        blob = zlib.compress(json.dumps(result, separators=(",", ":")).encode())
+        grade = result.get("grade")
+        try:
+            grade = None if grade is None else float(grade)
+        except (TypeError, ValueError):
+            grade = None
+
+        conn = connect(path)
+        try:
+            with conn:
+                cur = conn.execute(
+                    "INSERT INTO runs (kind, problem, problem_id, tree, created, test_index, passed,"
+                    " tests_passed, tests_total, points, points_total, grade, result)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        kind, folder, problem_id, tree, time.time(), test_index,
+                        _flag(result.get("passed")) if "error" not in result else 0,
+                        len(passed_tests) if tests else None,
+                        len(tests) if tests else None,
+                        sum(int(t.get("points", 0)) for t in passed_tests) if tests else None,
+                        sum(int(t.get("points", 0)) for t in tests) if tests else None,
+                        grade,
+                        blob,
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO test_results (run_id, name, type, passed, points) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (cur.lastrowid, str(t.get("test", f"test {i + 1}")), t.get("type"),
+                         int(bool(t.get("passed"))), int(t.get("points", 0)))
+                        for i, t in enumerate(tests)
+                    ],
+                )
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError, ValueError, TypeError) as e:
+        debug_print(f"Could not record {kind} result: {e}")
+
+
+def load_result(row):
+    """The full result dict stored with a runs row."""
+    return json.loads(zlib.decompress(row["result"]))
+
+
+def problem_history(conn, problem, limit=20):
+    """Most recent runs for problems whose folder name or id matches problem."""
+    return conn.execute(
+        "SELECT * FROM runs WHERE problem = ? OR problem_id = ? ORDER BY created DESC, id DESC LIMIT ?",
+        (problem, problem, limit),
+    ).fetchall()
+
+
+def overview(conn):
+    """One row per problem: run counts, latest outcome and best score."""
+    return conn.execute(
+        """
+        SELECT problem,
+               COUNT(*) AS runs,
+               SUM(kind = 'submit') AS submits,
+               MAX(created) AS last_run,
+               MAX(CASE WHEN points_total > 0 THEN points END) AS best_points,
+               MAX(points_total) AS points_total,
+               (SELECT passed FROM runs r2 WHERE r2.problem = runs.problem AND r2.kind = 'check'
+                ORDER BY created DESC, id DESC LIMIT 1) AS last_passed,
+               MIN(CASE WHEN passed = 1 THEN created END) AS first_pass
+        FROM runs
+        GROUP BY problem
+        ORDER BY problem
+        """
+    ).fetchall()
+
+
+def regressions(conn, limit=10):
+    """
+    Tests that went from passing to failing between consecutive full checks
+    of the same problem, most frequent (then most recent) first.
+
+    Returns:
+        list: (problem, test, times regressed, last regression time, currently passing)
+    """
+    rows = conn.execute(
+        """
+        SELECT r.problem, r.created, t.name, t.passed
+        FROM test_results t JOIN runs r ON r.id = t.run_id
+        WHERE r.kind = 'check' AND r.test_index IS NULL
+        ORDER BY r.problem, t.name, r.created, r.id
+        """
+    )
+    found = {}
+    prev_key, prev_passed = None, None
+    for problem, created, name, passed in rows:
+        key = (problem, name)
+        if key == prev_key and prev_passed and not passed:
+            count, _, _ = found.get(key, (0, 0, 0))
+            found[key] = (count + 1, created, passed)
+        elif key in found:
+            count, last, _ = found[key]
+            found[key] = (count, last, passed)
+        prev_key, prev_passed = key, passed
+    ranked = sorted(found.items(), key=lambda kv: (-kv[1][0], -kv[1][1]))
+    return [(p, n, count, last, bool(now)) for (p, n), (count, last, now) in ranked[:limit]]
@@ -0,0 +1,260 @@
+"""
+Resumable chunked uploads for large archives.
+
+An archive of RESUMABLE_MIN bytes or more is sent in chunks that the server
+acknowledges one at a time, so a dropped connection costs at most one chunk.
+Streamed archives are only spooled for this when their size is expected to
+be that large (see client.upload's size_hint); anything smaller keeps
+streaming while it is compressed.
+
+    POST /uploads       {"size", "sha256", "filename"}
+        -> 201 {"upload_id": ..., "offset": 0, "chunk_size": N}
+    GET  /uploads/<id>  -> 200 {"offset": N, "size": ...}
+    PUT  /uploads/<id>  one chunk, with Content-Range: bytes START-END/SIZE
+                        and X-Chunk-SHA256 (hex digest of the chunk)
+        -> 200 {"offset": N}  bytes the server now holds
+        -> 409 {"offset": N}  START is not where the server is; go on from N
+        -> 422                the chunk arrived damaged; it is sent again
+    POST /check, /crit, /submit, /relay, /blobs
+                        the usual form fields plus upload_id, no file part
+        -> the usual response, or 409 if the upload is unknown or incomplete
+
+The server checks the whole archive against its sha256 before using it.
+After a network error the client asks the server how far it got and carries
+on from there. Upload ids are remembered under the user cache dir by archive
+hash, so rerunning a command that died part-way resumes as well.
+
+Servers without /uploads answer 404/405/501 and the archive goes out in one
+request as before; the result is remembered for the rest of the process.
+"""
+import hashlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+import requests
+
+from jasper import client
+from jasper.pretty import transfer_progress
+from jasper.utils import debug_print, user_cache_dir
+
+RESUMABLE_MIN = 4 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+CHUNK_TIMEOUT = (5, 60)
+MAX_STALLS = 8  # chunk attempts in a row that made no progress before giving up
+STALL_BACKOFF_CAP = 10.0
+UNSUPPORTED_STATUSES = {404, 405, 501}
+
+# Server URLs that answered POST /uploads with "not implemented".
+_unsupported = set()
+
+
+class _UploadLost(Exception):
+    """The server no longer knows the upload id."""
+
+
+def supported(base_url):
+    return base_url not in _unsupported
+
+
+def spool(archive):
+    """
+    Materialize an archive so it can be re-read from any offset, hashing it
+    on the way.
+
+    Args:
+        archive: Bytes, or a zero-arg callable returning an iterator of chunks.
+
+    Returns:
+        tuple: (file, sha256 hex digest, size). file is readable and seekable;
+        streamed archives go to a temporary file so memory stays bounded.
+        The caller closes it.
+    """
+    if isinstance(archive, (bytes, bytearray)):
+        return io.BytesIO(archive), hashlib.sha256(archive).hexdigest(), len(archive)
+    digest = hashlib.sha256()
+    size = 0
+    f = tempfile.TemporaryFile()
+    try:
+        for chunk in archive():
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    except BaseException:
+        f.close()
+        raise
+    return f, digest.hexdigest(), size
+
+
+def read_chunks(f, chunk_size=CHUNK_SIZE):
+    """Iterate over a spooled archive from the start."""
+    f.seek(0)
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            return
+        yield block
+
+
+# --- remembered upload ids ---
+
+def _state_path(sha256):
+    return os.path.join(user_cache_dir(), "uploads", f"{sha256}.json")
+
+
+def _saved_id(base_url, sha256):
+    try:
+        with open(_state_path(sha256)) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return saved.get("upload_id") if saved.get("server_url") == base_url else None
+
+
+def _save_id(base_url, sha256, upload_id):
+    path = _state_path(sha256)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"server_url": base_url, "upload_id": upload_id, "created": time.time()}, f)
+    except OSError as e:
+        debug_print(f"Could not remember upload id: {e}")
+
+
+def _forget_id(sha256):
+    try:
+        os.remove(_state_path(sha256))
+    except OSError:
+        pass
+
+
+# --- protocol ---
+
+def _server_offset(base_url, upload_id):
+    resp = client.get(base_url, f"/uploads/{upload_id}")
+    if resp.status_code == 404:
+        raise _UploadLost(upload_id)
+    resp.raise_for_status()
+    return int(resp.json()["offset"])
+
+
+def _begin(base_url, size, sha256, filename):
+    """
+    Returns:
+        tuple: (upload_id, offset, chunk_size), or None if the server does
+        not take resumable uploads.
+    """
+    upload_id = _saved_id(base_url, sha256)
+    if upload_id is not None:
+        try:
+            offset = _server_offset(base_url, upload_id)
+            debug_print(f"Resuming upload {upload_id} at byte {offset}")
+            return upload_id, offset, CHUNK_SIZE
+        except (_UploadLost, requests.RequestException, ValueError, KeyError):
+            _forget_id(sha256)
+
+    # Not idempotent: a retried POST could leave a second, orphaned upload.
+    resp = client.post(base_url, "/uploads", json={"size": size, "sha256": sha256, "filename": filename})
+    if resp.status_code in UNSUPPORTED_STATUSES:
+        _unsupported.add(base_url)
+        return None
+    if resp.status_code not in (200, 201):
+        return None
+    try:
+        offer = resp.json()
+        upload_id = str(offer["upload_id"])
+    except (ValueError, KeyError):
+        _unsupported.add(base_url)
+        return None
+    _save_id(base_url, sha256, upload_id)
+    return upload_id, int(offer.get("offset") or 0), int(offer.get("chunk_size") or CHUNK_SIZE)
+
+
+def _put_chunk(base_url, upload_id, chunk, offset, size):
+    """Send one chunk and return the server's offset afterwards."""
+    headers = {
+        "Content-Type": "application/octet-stream",
+        "Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{size}",
+        "X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest(),
+    }
+    resp = client.request("PUT", base_url, f"/uploads/{upload_id}", data=chunk, headers=headers,
+                          timeout=CHUNK_TIMEOUT)
+    if resp.status_code in (200, 409):
+        return int(resp.json()["offset"])
+    if resp.status_code == 422:
+        return offset
+    if resp.status_code == 404:
+        raise _UploadLost(upload_id)
+    resp.raise_for_status()
+    return offset
+
+
+def send_chunks(base_url, upload_id, f, size, offset=0, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Send f from offset to the end, resuming after network errors.
+
+    Raises:
+        requests.RequestException: After MAX_STALLS attempts in a row made
+            no progress.
+    """
+    stalls = 0
+    error = None
+    while offset < size:
+        f.seek(offset)
+        chunk = f.read(chunk_size)
+        try:
+            new_offset = _put_chunk(base_url, upload_id, chunk, offset, size)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+            debug_print(f"Chunk at byte {offset} failed ({e}); asking the server where it got to")
+            time.sleep(random.uniform(0, min(STALL_BACKOFF_CAP, 0.25 * (2 ** stalls))))
+            try:
+                new_offset = _server_offset(base_url, upload_id)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                new_offset = offset
+        if new_offset > offset:
+            stalls = 0
+        else:
+            stalls += 1
+            if stalls > MAX_STALLS:
+                reason = f": {error}" if error else ""
+                raise requests.exceptions.ConnectionError(f"Upload stalled at byte {offset} of {size}{reason}")
+        offset = min(new_offset, size)
+        if progress is not None:
+            progress.update(offset)
+
+
+def upload(base_url, path, fields, f, sha256, size, filename="submission.zip", **kwargs):
+    """
+    Upload a spooled archive in chunks, then POST the form fields to `path`.
+
+    Args:
+        f, sha256, size: As returned by spool().
+
+    Returns:
+        requests.Response, or None if the server does not support resumable
+        uploads (or lost this one) and the caller should send it whole.
+    """
+    if not supported(base_url):
+        return None
+    started = _begin(base_url, size, sha256, filename)
+    if started is None:
+        return None
+    upload_id, offset, chunk_size = started
+
+    try:
+        with transfer_progress(size, f"Uploading {filename}") as progress:
+            progress.update(offset)
+            send_chunks(base_url, upload_id, f, size, offset, chunk_size, progress)
+    except _UploadLost:
+        _forget_id(sha256)
+        return None
+
+    resp = client.post(base_url, path, data={**fields, "upload_id": upload_id}, **kwargs)
+    _forget_id(sha256)
+    if resp.status_code == 409:
+        return None
+    return resp
@@ -0,0 +1,198 @@
+"""
+Local cache of downloaded starter code, shared by every workspace of a user.
+
+Each `jasper get <query>` response is remembered under the server's ETag:
+an index entry records the problems it contained and the sha256 of every
+file, and file contents live once in a content-addressed blob store. The next
+`get` of the same query sends `If-None-Match`, and a 304 is answered from the
+cache without transferring anything.
+
+    <user cache dir>/starter/index/<key>.json
+    <user cache dir>/starter/blobs/<sha256>
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from jasper.utils import user_cache_dir
+
+MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+# Blobs younger than this are never evicted: a concurrent store() may have
+# written them without having written the index entry that refers to them yet.
+EVICT_GRACE = 10 * 60
+
+
+def cache_root():
+    return os.path.join(user_cache_dir(), "starter")
+
+
+def _index_path(key, root):
+    return os.path.join(root, "index", f"{key}.json")
+
+
+def blob_path(sha256, root=None):
+    return os.path.join(root or cache_root(), "blobs", sha256)
+
+
+def entry_key(server_url, query):
+    parts = [(server_url or "").rstrip("/"), query.strip().lower()]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def _touch(path):
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        pass
+
+
+def lookup(key, root=None):
+    """
+    Return the cached entry for key, or None if it is missing or any of its
+    blobs have been evicted.
+
+    Returns:
+        dict: {"etag": str, "items": [{"project_name", "meta"?, "files": {rel: sha256}}]}
+    """
+    root = root or cache_root()
+    path = _index_path(key, root)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    blobs = [blob_path(sha, root) for item in entry.get("items", []) for sha in item["files"].values()]
+    if not entry.get("etag") or not all(os.path.isfile(p) for p in blobs):
+        return None
+    _touch(path)
+    for p in blobs:
+        _touch(p)
+    return entry
+
+
+def _store_blob(opener, root):
+    tmp_dir = os.path.join(root, "blobs")
+    os.makedirs(tmp_dir, exist_ok=True)
+    # A unique temp file per write: get fetches problems on several threads.
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir, prefix=".", suffix=".tmp")
+    digest = hashlib.sha256()
+    try:
+        with opener() as src, os.fdopen(fd, "wb") as dst:
+            for block in iter(lambda: src.read(HASH_CHUNK), b""):
+                digest.update(block)
+                dst.write(block)
+        sha = digest.hexdigest()
+        os.replace(tmp, blob_path(sha, root))
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return sha
+
+
+def store(key, etag, items, root=None):
+    """
+    Remember a download.
+
+    Args:
+        key: From entry_key().
+        etag: The response's ETag header.
+        items: [{"project_name", "meta"?, "files": {rel: opener}}], where each
+            opener is a zero-argument callable returning a binary file object.
+    """
+    root = root or cache_root()
+    index_items = []
+    for item in items:
+        files = {rel: _store_blob(opener, root) for rel, opener in item["files"].items()}
+        cached = {"project_name": item["project_name"], "files": files}
+        if "meta" in item:
+            cached["meta"] = item["meta"]
+        index_items.append(cached)
+
+    path = _index_path(key, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "items": index_items}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    evict(root)
+
+
+def evict(root=None, max_bytes=MAX_BYTES, grace=EVICT_GRACE):
+    """
+    Drop least recently used entries until the blobs they need fit in
+    max_bytes. Blobs and leftover temp files younger than grace seconds are
+    kept, since another writer may still be about to index them.
+    """
+    root = root or cache_root()
+    index_dir = os.path.join(root, "index")
+    blob_dir = os.path.join(root, "blobs")
+    try:
+        names = os.listdir(index_dir)
+    except OSError:
+        return
+
+    entries = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(index_dir, name)
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            shas = {sha for item in entry.get("items", []) for sha in item["files"].values()}
+        except (OSError, ValueError, KeyError, AttributeError):
+            shas = set()
+            mtime = 0
+        entries.append((mtime, path, shas))
+    entries.sort(key=lambda e: e[0])
+
+    sizes = {}
+    temps = set()
+    recent = set()
+    cutoff = time.time() - grace
+    for name in os.listdir(blob_dir) if os.path.isdir(blob_dir) else ():
+        try:
+            st = os.stat(os.path.join(blob_dir, name))
+        except OSError:
+            continue
+        if st.st_mtime > cutoff:
+            recent.add(name)
+        if name.startswith("."):
+            temps.add(name)
+        else:
+            sizes[name] = st.st_size
+
+    def needed():
+        live = set().union(*(shas for _, _, shas in entries))
+        return live, sum(sizes.get(sha, 0) for sha in live)
+
+    live, total = needed()
+    while entries and total > max_bytes:
+        _, path, _ = entries.pop(0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        live, total = needed()
+
+    # Blobs no remaining entry refers to are garbage, as are temp files left
+    # behind by writers that died.
+    for name in ((sizes.keys() - live) | temps) - recent:
+        try:
+            os.remove(os.path.join(blob_dir, name))
+        except OSError:
+            pass
@@ -0,0 +1,213 @@
+"""
+Opt-in timing of the phases a command goes through.
+
+    jasper --timings check      # summary table after the command
+    jasper --trace check        # ...and a Chrome trace in .jasper/
+    JASPER_TRACE=1 jasper check         same as --timings
+    JASPER_TRACE=trace jasper check     same as --trace
+
+Open the trace in chrome://tracing or https://ui.perfetto.dev.
+
+Code marks phases with `with timings.span("upload"):` or `@timings.timed(...)`.
+While timing is off, span() hands back one shared no-op object, so the cost
+is a global lookup and a function call per phase.
+"""
+import functools
+import os
+import threading
+import time
+
+TRACE_ENV = "JASPER_TRACE"
+
+_enabled = False
+_trace = False
+# (name, start_ns, end_ns, thread id, thread name, args). list.append is
+# atomic, so spans from worker threads need no lock.
+_spans = []
+_origin = time.perf_counter_ns()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        thread = threading.current_thread()
+        _spans.append((self.name, self.start, end, thread.ident, thread.name, self.args))
+        return False
+
+    def set(self, **args):
+        """Attach details (sizes, status codes) shown in the trace viewer."""
+        self.args.update(args)
+
+
+def span(name, **args):
+    """Context manager timing one phase. Nested spans show up nested."""
+    if not _enabled:
+        return _NULL
+    return _Span(name, args)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return fn(*a, **kw)
+            with _Span(name, {}):
+                return fn(*a, **kw)
+        return wrapper
+    return decorate
+
+
+def enabled():
+    return _enabled
+
+
+def configure(timings=False, trace=False):
+    """Turn timing on from the command line flags or JASPER_TRACE."""
+    global _enabled, _trace
+    env = os.environ.get(TRACE_ENV, "").strip().lower()
+    _trace = trace or env == "trace"
+    _enabled = timings or _trace or env not in ("", "0", "false", "no")
+
+
+def _depths():
+    """
+    Nesting depth of each span. Work on a background thread is nested under
+    whatever the main thread had open when that work started.
+    """
+    main = threading.main_thread().ident
+    open_by_thread = {}
+    base_by_thread = {}
+    order = sorted(range(len(_spans)), key=lambda i: (_spans[i][1], -_spans[i][2]))
+    result = [0] * len(_spans)
+    for i in order:
+        _, start, end, tid, _, _ = _spans[i]
+        stack = open_by_thread.setdefault(tid, [])
+        while stack and stack[-1] <= start:
+            stack.pop()
+        if not stack:
+            outer = open_by_thread.get(main, []) if tid != main else []
+            while outer and outer[-1] <= start:
+                outer.pop()
+            base_by_thread[tid] = len(outer)
+        result[i] = base_by_thread[tid] + len(stack)
+        stack.append(end)
+    return result
+
+
+def summary():
+    """
+    Returns:
+        list: One dict per span name in order of first appearance, with
+        call count, total/mean/max milliseconds and nesting depth.
+    """
+    rows = {}
+    for (name, start, end, _, _, _), depth in zip(_spans, _depths()):
+        ms = (end - start) / 1e6
+        row = rows.get(name)
+        if row is None:
+            rows[name] = row = {"name": name, "first": start, "calls": 0, "total": 0.0, "max": 0.0, "depth": depth}
+        row["first"] = min(row["first"], start)
+        row["calls"] += 1
+        row["total"] += ms
+        row["max"] = max(row["max"], ms)
+        row["depth"] = min(row["depth"], depth)
+    return sorted(rows.values(), key=lambda r: r["first"])
+
+
+def write_trace(path, command=None):
+    """Write every span as Chrome trace-event JSON ("X" complete events)."""
+    import json
+
+    pid = os.getpid()
+    events = []
+    threads = {}
+    for name, start, end, tid, thread_name, args in _spans:
+        threads[tid] = thread_name
+        events.append({
+            "name": name,
+            "cat": "jasper",
+            "ph": "X",
+            "ts": (start - _origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": pid,
+            "tid": tid,
+            "args": {k: v if isinstance(v, (int, float, bool, str)) or v is None else str(v)
+                     for k, v in args.items()},
+        })
+    for tid, thread_name in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"command": command}}, f)
+
+
+def _trace_path(command):
+    try:
+        from jasper import workspace
+        root = workspace.resolve().project_root or os.getcwd()
+    except (OSError, ValueError):
+        root = os.getcwd()
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(root, ".jasper", "traces", f"{command or 'jasper'}-{stamp}.json")
+
+
+def report(command=None):
+    """Print the summary table and, with --trace, write the trace file."""
+    if not _enabled or not _spans:
+        return
+    from jasper.pretty import print_status, show_table
+
+    rows = summary()
+    wall = max(r["total"] for r in rows if r["depth"] == 0)
+    show_table(
+        [
+            {
+                "phase": "  " * r["depth"] + r["name"],
+                "calls": r["calls"],
+                "total ms": f"{r['total']:.1f}",
+                "mean ms": f"{r['total'] / r['calls']:.1f}",
+                "max ms": f"{r['max']:.1f}",
+                "% of run": f"{r['total'] / wall * 100:.0f}" if wall else "—",
+            }
+            for r in rows
+        ],
+        title="Timings",
+    )
+    if _trace:
+        path = _trace_path(command)
+        try:
+            write_trace(path, command)
+        except OSError as e:
+            print_status(f"Could not write trace: {e}", success=False)
+        else:
+            print_status(f"Trace written to {path} (open in chrome://tracing or ui.perfetto.dev)", success=True)
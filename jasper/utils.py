@@ -1,6 +1,10 @@
 import os
 import json
-import zipfile
+import threading
+from concurrent.futures import Future
+
+from jasper import timings
+from jasper.archive import stream_archive
 
 DEBUG = False  # Set to True to enable debug output
 
@@ -8,76 +12,62 @@ def debug_print(msg):
     if DEBUG:
         print(msg)
 
+def run_in_background(fn, **kwargs):
+    """Call fn(**kwargs) on a daemon thread and return a Future for its result."""
+    # Daemon thread rather than an executor so an abandoned call never blocks exit.
+    future = Future()
+
+    def _target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(**kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_target, daemon=True).start()
+    return future
+
+def user_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "jasper")
+
 def find_config_path():
-    dir_path = os.getcwd()
-    debug_print(f"🔍 Starting config search from: {dir_path}")
-
-    while True:
-        candidate = os.path.join(dir_path, "jasper", "config.json")
-        debug_print(f"🔎 Checking: {candidate}")
-        if os.path.exists(candidate):
-            debug_print(f"✅ Found config at: {candidate}")
-            return candidate
-
-        parent = os.path.dirname(dir_path)
-        if parent == dir_path:
-            debug_print("❌ Reached root. config.json not found.")
-            break
-        dir_path = parent
-
-    raise FileNotFoundError("❌ Missing config.json. Use `jasper init` first.")
-
-try:
-    CONFIG_PATH = find_config_path()
-except FileNotFoundError as e:
-    CONFIG_PATH = None
-    debug_print(str(e))
+    from jasper import workspace
+    path = workspace.resolve().config_path
+    if path is None:
+        raise FileNotFoundError("❌ Missing config.json. Use `jasper init` first.")
+    return path
 
 def load_config():
-    try:
-        start_path = os.getcwd()
-    except FileNotFoundError:
-        raise FileNotFoundError("❌ Current working directory is invalid. Move to an existing folder and try again.")
-
-    debug_print(f"🔍 Starting config search from: {start_path}")
-    dir_path = start_path
-    while True:
-        config_path = os.path.join(dir_path, "jasper", "config.json")
-        debug_print(f"🔎 Checking: {config_path}")
-        if os.path.exists(config_path):
-            debug_print(f"✅ Found config at: {config_path}")
-            with open(config_path) as f:
-                return json.load(f)
-
-        parent = os.path.dirname(dir_path)
-        if parent == dir_path:
-            break
-        dir_path = parent
-
-    raise FileNotFoundError("❌ Missing config.json. Use `jasper init` first.")
+    from jasper import workspace
+    ws = workspace.resolve()
+    if ws.config is None:
+        raise FileNotFoundError("❌ Missing config.json. Use `jasper init` first.")
+    return dict(ws.config)
 
 def _default_config_path():
     # New default when none exists yet (fixes circular save)
     return os.path.join(os.getcwd(), "jasper", "config.json")
 
 def save_config(data):
+    from jasper import workspace
     # If we already located a config, overwrite it; else write to repo-local default.
-    path = CONFIG_PATH if CONFIG_PATH else _default_config_path()
+    path = workspace.resolve().config_path or _default_config_path()
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w") as f:
         json.dump(data, f, indent=2)
     debug_print(f"✅ Saved config to {path}")
+    workspace.reset()
     return path
 
+@timings.timed("zip_folder")
 def zip_folder(folder_path):
     zip_path = f"/tmp/{os.path.basename(folder_path)}.zip"
     debug_print(f"📦 Zipping folder {folder_path} -> {zip_path}")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                full_path = os.path.join(root, file)
-                arcname = os.path.relpath(full_path, folder_path)
-                zipf.write(full_path, arcname)
+    with open(zip_path, "wb") as f:
+        for chunk in stream_archive(folder_path):
+            f.write(chunk)
     return zip_path
 
 def format_text(text, bold=False, underline=False, color=None):
@@ -0,0 +1,171 @@
+"""
+Wait for meaningful edits in a problem folder.
+
+Uses inotify on Linux (through ctypes, no extra dependency) and falls back to
+polling file mtimes elsewhere. Bursts of events, e.g. an editor's
+write-rename-chmod save dance, are debounced into one change. Paths the
+packaging ignore rules leave out (jasper's own state, build outputs, editor
+swap files; see jasper.ignore) are not watched, and editing .jasperignore
+reloads them.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import time
+
+from jasper import ignore
+
+DEBOUNCE = 0.3
+MAX_SETTLE = 2.0
+POLL_INTERVAL = 0.5
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_ISDIR = 0x40000000
+_IN_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _watched_dirs(folder, rules, start=None):
+    start = start or folder
+    for root, dirs, _ in os.walk(start):
+        rel = os.path.relpath(root, folder)
+        prefix = "" if rel == "." else rel + os.sep
+        dirs[:] = [d for d in dirs if not rules.ignored(prefix + d, is_dir=True)]
+        yield root
+
+
+class _Inotify:
+    def __init__(self, folder):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folder = folder
+        self.rules = ignore.load(folder)
+        self.paths = {}
+        for path in _watched_dirs(folder, self.rules):
+            self._add(path)
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _IN_MASK)
+        if wd >= 0:
+            self.paths[wd] = path
+
+    def read(self, timeout):
+        """Return True if a relevant event arrived within timeout seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        relevant = False
+        offset = 0
+        while offset + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            path = os.path.join(self.paths.get(wd, self.folder), name)
+            rel = os.path.relpath(path, self.folder)
+            if rel == ignore.IGNORE_FILE:
+                self.rules = ignore.load(self.folder)
+            elif self.rules.ignored(rel, is_dir=bool(mask & _IN_ISDIR)):
+                continue
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                for sub in _watched_dirs(self.folder, self.rules, start=path):
+                    self._add(sub)
+            relevant = True
+        return relevant
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Poller:
+    def __init__(self, folder, interval=POLL_INTERVAL):
+        self.folder = folder
+        self.interval = interval
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        rules = ignore.load(self.folder)  # cheap, and picks up .jasperignore edits
+        for root in _watched_dirs(self.folder, rules):
+            # Anything can vanish mid-scan (editors save by rename); skip it
+            # and let the next scan see the folder as it settled.
+            try:
+                names = os.listdir(root)
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if rules.ignored(os.path.relpath(path, self.folder), is_dir=stat.S_ISDIR(st.st_mode)):
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def read(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+            state = self._scan()
+            if state != self.state:
+                self.state = state
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """Block until the folder changes; see wait_for_change()."""
+
+    def __init__(self, folder=".", debounce=DEBOUNCE, force_polling=False, poll_interval=POLL_INTERVAL):
+        self.debounce = debounce
+        self.backend = None
+        if not force_polling and hasattr(os, "O_CLOEXEC"):
+            try:
+                self.backend = _Inotify(folder)
+            except (OSError, AttributeError):
+                self.backend = None
+        if self.backend is None:
+            self.backend = _Poller(folder, poll_interval)
+
+    @property
+    def uses_inotify(self):
+        return isinstance(self.backend, _Inotify)
+
+    def wait_for_change(self, timeout=None):
+        """
+        Return True once a relevant change has happened and the folder has
+        been quiet for `debounce` seconds, or False if `timeout` expires first.
+        """
+        if not self.backend.read(timeout):
+            return False
+        settle_until = time.monotonic() + MAX_SETTLE
+        while time.monotonic() < settle_until and self.backend.read(self.debounce):
+            pass
+        return True
+
+    def close(self):
+        self.backend.close()
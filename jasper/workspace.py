@@ -0,0 +1,183 @@
+"""
+Where am I? One answer per process.
+
+A single walk up from the working directory finds the nearest
+`jasper/config.json`, noting the nearest `.devcontainer` (the project root) on
+the way; the problem folder/id come from the working directory's name. The
+walk stops at the config, and only a command that asks for the project root
+looks further up. The config is parsed on first use. The result is memoised,
+so commands can ask as often as they like.
+
+Set JASPER_WORKSPACE_CACHE=1 to also persist the walk's result under the user
+cache dir. A cached entry is reused only while every directory the walk
+examined (and any `jasper/` directory in them) and the config file keep the
+same inode and mtime. Creating a config or `.devcontainer` in any of them
+changes its mtime, so a later `jasper init` is noticed; the walk's two
+lookups per level become one `stat` on slow network-mounted homes.
+"""
+import json
+import os
+import threading
+
+from jasper import timings
+from jasper.utils import debug_print, user_cache_dir
+
+CACHE_ENV = "JASPER_WORKSPACE_CACHE"
+CACHE_MAX_ENTRIES = 64
+
+_lock = threading.Lock()
+_current = None
+
+
+class Workspace:
+    """Resolved locations for the current working directory."""
+
+    def __init__(self, cwd, config_path, project_root):
+        self.cwd = cwd
+        self.config_path = config_path
+        self._project_root = project_root
+        self._config = None
+        self.problem_folder = os.path.basename(cwd)
+        if "-" in self.problem_folder:
+            self.problem_id = self.problem_folder.split("-")[0]
+        else:
+            self.problem_id = None
+
+    @property
+    def project_root(self):
+        """Nearest directory with a `.devcontainer`, else the working directory."""
+        if self._project_root is None:
+            # The walk stopped at the config; carry on above it.
+            above = os.path.dirname(os.path.dirname(os.path.dirname(self.config_path)))
+            self._project_root = _find_root(above) or self.cwd
+        return self._project_root
+
+    @property
+    def config(self):
+        """
+        The parsed config, or None if there is none.
+
+        Raises:
+            ValueError: config.json is not valid JSON.
+        """
+        if self._config is None and self.config_path:
+            with open(self.config_path) as f:
+                self._config = json.load(f)
+        return self._config
+
+
+def _find_root(dir_path):
+    while True:
+        if os.path.isdir(os.path.join(dir_path, ".devcontainer")):
+            return dir_path
+        parent = os.path.dirname(dir_path)
+        if parent == dir_path:
+            return None
+        dir_path = parent
+
+
+def _walk(start, examined=None):
+    """
+    Returns:
+        tuple: (config path or None, project root or None). The walk stops at
+        the config, so the root is None if it is further up. Every directory
+        looked in is appended to examined, if given.
+    """
+    debug_print(f"🔍 Starting workspace search from: {start}")
+    config_path, project_root = None, None
+    dir_path = start
+    while config_path is None:
+        if examined is not None:
+            examined.append(dir_path)
+            if os.path.isdir(os.path.join(dir_path, "jasper")):
+                examined.append(os.path.join(dir_path, "jasper"))
+        candidate = os.path.join(dir_path, "jasper", "config.json")
+        debug_print(f"🔎 Checking: {candidate}")
+        if os.path.exists(candidate):
+            debug_print(f"✅ Found config at: {candidate}")
+            config_path = candidate
+        if project_root is None and os.path.isdir(os.path.join(dir_path, ".devcontainer")):
+            project_root = dir_path
+
+        parent = os.path.dirname(dir_path)
+        if parent == dir_path:
+            return None, project_root or start
+        dir_path = parent
+    return config_path, project_root
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_dev, st.st_ino, st.st_mtime_ns]
+
+
+def _cache_path():
+    return os.path.join(user_cache_dir(), "workspace.json")
+
+
+def _read_cache():
+    try:
+        with open(_cache_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _cached_walk(cwd):
+    entries = _read_cache()
+    entry = entries.get(cwd)
+    if entry and entry.get("dirs") and all(_stat_key(path) == key for path, key in entry["dirs"].items()):
+        config_path = entry.get("config_path")
+        if config_path is None or entry.get("config") == _stat_key(config_path):
+            debug_print(f"⚡ Workspace cache hit for {cwd}")
+            return config_path, entry["project_root"]
+
+    examined = []
+    config_path, project_root = _walk(cwd, examined)
+    entries.pop(cwd, None)
+    entries[cwd] = {
+        "dirs": {path: _stat_key(path) for path in examined},
+        "config_path": config_path,
+        "config": _stat_key(config_path) if config_path else None,
+        "project_root": project_root,
+    }
+    while len(entries) > CACHE_MAX_ENTRIES:
+        entries.pop(next(iter(entries)))
+    try:
+        os.makedirs(os.path.dirname(_cache_path()), exist_ok=True)
+        tmp = f"{_cache_path()}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, _cache_path())
+    except OSError as e:
+        debug_print(f"⚠️ Could not write workspace cache: {e}")
+    return config_path, project_root
+
+
+def resolve(refresh=False):
+    """Return the Workspace for the current directory, computing it at most once."""
+    global _current
+    try:
+        cwd = os.getcwd()
+    except FileNotFoundError:
+        raise FileNotFoundError("❌ Current working directory is invalid. Move to an existing folder and try again.")
+
+    with _lock:
+        if _current is None or refresh or _current.cwd != cwd:
+            with timings.span("find workspace"):
+                if os.environ.get(CACHE_ENV) == "1":
+                    config_path, project_root = _cached_walk(cwd)
+                else:
+                    config_path, project_root = _walk(cwd)
+                _current = Workspace(cwd, config_path, project_root)
+        return _current
+
+
+def reset():
+    """Forget the resolved workspace, e.g. after writing a new config."""
+    global _current
+    with _lock:
+        _current = None
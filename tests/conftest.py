@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from jasper import delta, devserver, resumable
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep remembered upload ids and other cached state out of ~/.cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(delta, "_unsupported", set())
+    monkeypatch.setattr(resumable, "_unsupported", set())
+
+
+def start_grader(**options):
+    """devserver.start_in_thread with a short poll interval, so shutdown is quick."""
+    server = devserver.make_server(**options)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.02}, daemon=True).start()
+    return server
+
+
+def stop_grader(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def grader():
+    server = start_grader()
+    yield server
+    stop_grader(server)
+
+
+def serve_with(server, **overrides):
+    """Swap in a handler subclass with some methods replaced, e.g. _manifest."""
+    server.RequestHandlerClass = type("PatchedHandler", (server.RequestHandlerClass,), overrides)
@@ -0,0 +1,85 @@
+import io
+import os
+import shutil
+import struct
+import subprocess
+import zipfile
+
+import pytest
+
+from jasper import archive
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    # Small limits so the streamed (large member) path runs on small files.
+    monkeypatch.setattr(archive, "PARALLEL_LIMIT", 4096)
+    (tmp_path / "main.c").write_text("int main() { return 0; }\n" * 10)
+    (tmp_path / "big.txt").write_text("line of test data\n" * 2000)       # large, deflated
+    (tmp_path / "big.bin").write_bytes(os.urandom(50_000))                 # large, stored
+    (tmp_path / "photo.png").write_bytes(os.urandom(100))                  # small, stored
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "1.out").write_text("ok\n")
+    return tmp_path
+
+
+def _contents(folder):
+    return {
+        os.path.relpath(os.path.join(root, name), folder).replace(os.sep, "/"):
+            open(os.path.join(root, name), "rb").read()
+        for root, _, names in os.walk(folder) for name in names
+    }
+
+
+def _unzipped(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        assert zipf.testzip() is None
+        return {info.filename: zipf.read(info) for info in zipf.infolist()}
+
+
+def test_round_trip(folder):
+    data = archive.build_archive(str(folder))
+    assert _unzipped(data) == _contents(folder)
+
+
+def test_stored_members_carry_real_sizes_in_the_local_header(folder):
+    data = archive.build_archive(str(folder))
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        infos = zipf.infolist()
+    stored = [info for info in infos if info.compress_type == zipfile.ZIP_STORED]
+    assert {"big.bin", "photo.png"} <= {info.filename for info in stored}
+    assert any(info.flag_bits & 0x08 for info in infos)  # big.txt still streams with a descriptor
+
+    for info in stored:
+        _, _, flags, method, _, _, crc, csize, usize, _, _ = struct.unpack_from(
+            "<IHHHHHIIIHH", data, info.header_offset
+        )
+        assert not flags & 0x08
+        assert (crc, csize, usize) == (info.CRC, info.file_size, info.file_size)
+
+
+def test_zip64_records_when_limits_are_exceeded(folder, monkeypatch):
+    monkeypatch.setattr(archive, "ZIP64_LIMIT", 1000)
+    monkeypatch.setattr(archive, "ZIP64_COUNT_LIMIT", 2)
+
+    data = archive.build_archive(str(folder))
+
+    assert b"PK\x06\x06" in data and b"PK\x06\x07" in data  # Zip64 end record and locator
+    assert _unzipped(data) == _contents(folder)
+    if shutil.which("unzip"):
+        path = folder.parent / "out.zip"
+        path.write_bytes(data)
+        subprocess.run(["unzip", "-tq", str(path)], check=True, stdout=subprocess.DEVNULL)
+
+
+def test_stored_member_changing_mid_read_is_an_error(folder):
+    path = folder / "big.bin"
+    entries = [("big.bin", lambda: open(path, "rb"), (2024, 1, 1, 0, 0, 0), 0o100644)]
+    stream = archive.stream_entries(entries, workers=1)
+
+    assert next(stream).startswith(b"PK\x03\x04")  # header goes out after the CRC pass
+    with open(path, "ab") as f:
+        f.write(b"appended")
+    with pytest.raises(OSError, match="changed while it was being packaged"):
+        for _ in stream:
+            pass
@@ -0,0 +1,48 @@
+import json
+import os
+import time
+
+from jasper import cache
+from jasper.archive import build_archive
+
+
+def test_results_expire(tmp_path, monkeypatch):
+    key = cache.result_key("tree", None, "http://grader", "101")
+    cache.store(key, {"passed": True}, str(tmp_path))
+
+    result, stored_at = cache.lookup(key, str(tmp_path))
+    assert result == {"passed": True}
+    assert abs(stored_at - time.time()) < 5
+
+    later = time.time() + cache.MAX_AGE + 1
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+    assert cache.lookup(key, str(tmp_path)) is None
+
+
+def test_entries_without_a_timestamp_are_ignored(tmp_path):
+    key = cache.result_key("tree", 2, "http://grader", "101")
+    with open(os.path.join(str(tmp_path), f"{key}.json"), "w") as f:
+        json.dump({"passed": True}, f)  # written before results expired
+
+    assert cache.lookup(key, str(tmp_path)) is None
+
+
+def test_tree_hash_follows_content(tmp_path):
+    (tmp_path / "main.c").write_text("int main() {}\n")
+    before = cache.tree_hash(str(tmp_path))
+    (tmp_path / "main.o").write_bytes(b"\0")  # ignored build output
+    assert cache.tree_hash(str(tmp_path)) == before
+    (tmp_path / "main.c").write_text("int main() { return 1; }\n")
+    assert cache.tree_hash(str(tmp_path)) != before
+
+
+def test_tree_hash_of_a_snapshot_matches_the_folder_it_was_taken_from(tmp_path):
+    (tmp_path / "main.c").write_text("int main() {}\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "1.in").write_bytes(b"1 2\n")
+    archive = build_archive(str(tmp_path))
+    folder = cache.tree_hash(str(tmp_path))
+    assert cache.tree_hash(archive=archive) == folder
+
+    (tmp_path / "main.c").write_text("int main() { return 1; }\n")
+    assert cache.tree_hash(archive=archive) == folder  # the snapshot, not the live folder
@@ -0,0 +1,72 @@
+import time
+
+from conftest import serve_with
+from jasper import client
+
+
+def _busy_then_ok(status, retry_after, busy_times=1):
+    """A do_POST/do_GET that answers `status` busy_times times, then 200."""
+    calls = []
+
+    def handler(self):
+        calls.append(self.path)
+        if self.command == "POST":
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if len(calls) <= busy_times:
+            return self._send_json(status, {"error": "busy"}, {"Retry-After": str(retry_after)})
+        return self._send_json(200, {"ok": True})
+
+    return handler, calls
+
+
+def test_503_is_not_retried_for_a_submit(grader):
+    handler, calls = _busy_then_ok(503, 0)
+    serve_with(grader, do_POST=handler)
+
+    resp = client.post(grader.url, "/submit", data={"problem_id": "101"})
+
+    assert resp.status_code == 503
+    assert len(calls) == 1
+
+
+def test_503_is_retried_for_idempotent_requests(grader):
+    handler, calls = _busy_then_ok(503, 0)
+    serve_with(grader, do_GET=handler)
+
+    resp = client.get(grader.url, "/ping")
+
+    assert resp.status_code == 200
+    assert len(calls) == 2
+
+
+def test_429_is_retried_for_any_method(grader):
+    handler, calls = _busy_then_ok(429, 0, busy_times=2)
+    serve_with(grader, do_POST=handler)
+
+    resp = client.post(grader.url, "/submit", data={"problem_id": "101"})
+
+    assert resp.status_code == 200
+    assert len(calls) == 3
+
+
+def test_long_retry_after_is_reported_not_cut_short(grader, capsys):
+    handler, calls = _busy_then_ok(429, 600)
+    serve_with(grader, do_POST=handler)
+
+    start = time.monotonic()
+    resp = client.post(grader.url, "/check", data={"problem_id": "101"})
+
+    assert resp.status_code == 429
+    assert len(calls) == 1
+    assert time.monotonic() - start < 5
+    assert "wait 600s" in capsys.readouterr().out
+
+
+def test_probes_with_no_retries_send_one_request(grader):
+    handler, calls = _busy_then_ok(503, 0)
+    serve_with(grader, do_GET=handler)
+
+    resp = client.get(grader.url, "/ping", retries=0)
+
+    assert resp.status_code == 503
+    assert len(calls) == 1
@@ -0,0 +1,108 @@
+import hashlib
+
+from conftest import serve_with
+from jasper import delta
+
+FIELDS = {"student_id": "s1", "problem_id": "101"}
+
+
+def _folder(tmp_path, files):
+    folder = tmp_path / "101-hello"
+    folder.mkdir(exist_ok=True)
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+    return str(folder)
+
+
+def _spy_blobs(monkeypatch):
+    """Record the sha256s each /blobs upload actually carries."""
+    sent = []
+    real = delta._stream_blobs
+
+    def spy(blobs, missing):
+        sent.append(sorted(sha for sha in missing if sha in blobs))
+        return real(blobs, missing)
+
+    monkeypatch.setattr(delta, "_stream_blobs", spy)
+    return sent
+
+
+def test_first_upload_sends_every_blob(grader, tmp_path, monkeypatch):
+    sent = _spy_blobs(monkeypatch)
+    folder = _folder(tmp_path, {"main.c": b"int main() {}\n", "notes.txt": b"hi\n"})
+
+    resp = delta.upload(grader.url, "/check", FIELDS, folder)
+
+    assert resp.status_code == 200 and resp.json()["passed"]
+    assert sent == [sorted(hashlib.sha256(d).hexdigest() for d in (b"int main() {}\n", b"hi\n"))]
+    assert grader.state.requests["/manifest"] == 1
+
+
+def test_nothing_missing_skips_blobs(grader, tmp_path, monkeypatch):
+    folder = _folder(tmp_path, {"main.c": b"int main() {}\n"})
+    delta.upload(grader.url, "/check", FIELDS, folder)
+    sent = _spy_blobs(monkeypatch)
+
+    resp = delta.upload(grader.url, "/check", FIELDS, folder)
+
+    assert resp.status_code == 200
+    assert sent == []
+    assert grader.state.requests["/blobs"] == 1  # only the first upload's
+    assert grader.state.requests["/manifest"] == 2
+
+
+def test_only_missing_blobs_are_sent(grader, tmp_path, monkeypatch):
+    folder = _folder(tmp_path, {"main.c": b"v1\n", "util.c": b"shared\n", "util.h": b"header\n"})
+    delta.upload(grader.url, "/check", FIELDS, folder)
+    sent = _spy_blobs(monkeypatch)
+
+    _folder(tmp_path, {"main.c": b"v2\n"})
+    resp = delta.upload(grader.url, "/check", FIELDS, folder)
+
+    assert resp.status_code == 200
+    assert sent == [[hashlib.sha256(b"v2\n").hexdigest()]]
+
+
+def test_archive_snapshot_is_described_instead_of_folder(grader, tmp_path):
+    from jasper.archive import build_archive
+
+    folder = _folder(tmp_path, {"main.c": b"snapshot\n"})
+    archive = build_archive(folder)
+    _folder(tmp_path, {"main.c": b""})  # edited after the snapshot
+
+    resp = delta.upload(grader.url, "/check", FIELDS, folder, archive=archive)
+
+    assert resp.json()["passed"]  # the grader saw the snapshot, not the empty file
+
+
+def test_server_without_manifest_gets_full_upload(grader, tmp_path):
+    serve_with(grader, _manifest=lambda self, payload: self._send_json(404, {"error": "Not found"}))
+    folder = _folder(tmp_path, {"main.c": b"int main() {}\n"})
+
+    resp = delta.upload(grader.url, "/check", FIELDS, folder)
+    assert resp.status_code == 200 and resp.json()["passed"]
+    assert grader.url in delta._unsupported
+    assert grader.state.requests.get("/blobs", 0) == 0
+
+    delta.upload(grader.url, "/check", FIELDS, folder)
+    assert grader.state.requests["/manifest"] == 1  # the probe is paid once
+
+
+def test_file_changed_after_hashing_falls_back(grader, tmp_path, monkeypatch):
+    folder = _folder(tmp_path, {"main.c": b"before\n"})
+    real = delta.build_manifest
+
+    def hash_then_edit(entries):
+        result = real(entries)
+        _folder(tmp_path, {"main.c": b""})  # saved between hashing and sending
+        return result
+
+    monkeypatch.setattr(delta, "build_manifest", hash_then_edit)
+    resp = delta.upload(grader.url, "/check", FIELDS, folder)
+
+    # /blobs refused the blob that no longer matches its hash; the full
+    # upload that followed carries what is on disk now.
+    assert grader.state.requests["/blobs"] == 1
+    assert resp.status_code == 200
+    assert resp.json()["passed"] is False
+    assert grader.url not in delta._unsupported
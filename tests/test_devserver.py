@@ -0,0 +1,64 @@
+import base64
+import io
+import json
+import os
+import zipfile
+
+import pytest
+import requests
+
+from conftest import start_grader, stop_grader
+
+
+@pytest.fixture
+def problems(tmp_path):
+    folder = tmp_path / "problems" / "101-hello"
+    folder.mkdir(parents=True)
+    (folder / "main.c").write_text("int main() {}\n")
+    (folder / "meta.json").write_text(json.dumps({"module": "m01"}))
+    (folder / "a.out").write_bytes(b"\x7fELF")  # build output: never served
+    (folder / ".jasper").mkdir()
+    (folder / ".jasper" / "check.json").write_text("{}")
+    server = start_grader(problems_dir=str(tmp_path / "problems"))
+    yield server, folder
+    stop_grader(server)
+
+
+def _get(server, accept=None, etag=None):
+    headers = {}
+    if accept:
+        headers["Accept"] = accept
+    if etag:
+        headers["If-None-Match"] = etag
+    return requests.get(f"{server.url}/get-problem", params={"q": "101"}, headers=headers, timeout=5)
+
+
+def test_json_and_zip_serve_the_same_files(problems):
+    server, _ = problems
+    as_json = _get(server)
+    as_zip = _get(server, accept="application/zip")
+    assert as_json.status_code == as_zip.status_code == 200
+    assert as_json.headers["ETag"] == as_zip.headers["ETag"]
+
+    item = as_json.json()
+    json_files = {name: base64.b64decode(f["content_base64"]) for name, f in item["files"].items()}
+    assert item["meta"] == {"module": "m01"}
+    with zipfile.ZipFile(io.BytesIO(as_zip.content)) as zipf:
+        zip_files = {info.filename: zipf.read(info) for info in zipf.infolist()}
+    assert zip_files.pop("101-hello/meta.json")
+    assert {f"101-hello/{name}": data for name, data in json_files.items()} == zip_files
+    assert set(json_files) == {"main.c"}
+
+
+def test_etag_follows_the_served_files_only(problems):
+    server, folder = problems
+    etag = _get(server).headers["ETag"]
+    assert _get(server, etag=etag).status_code == 304
+
+    (folder / "a.out").write_bytes(b"rebuilt")  # ignored, so nothing the client sees changed
+    assert _get(server, etag=etag).status_code == 304
+
+    (folder / "main.c").write_text("int main() { return 0; }\n")
+    os.utime(folder / "main.c", ns=(0, 1))
+    resp = _get(server, etag=etag)
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
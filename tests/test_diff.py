@@ -0,0 +1,75 @@
+from jasper import diff
+
+BODY = "".join(f"line {i}\n" for i in range(1, 1001))
+
+
+def _mismatch(expected, actual, show_bytes=False):
+    lines = []
+    diff.write_mismatch(lines.append, expected, actual, show_bytes)
+    return lines
+
+
+def test_first_divergence():
+    assert diff.first_divergence("abc", "abc") is None
+    assert diff.first_divergence("abc", "abd") == 2
+    assert diff.first_divergence("ab", "abc") == 2
+    big = "x" * (3 * diff.BLOCK)
+    assert diff.first_divergence(big + "a", big + "b") == len(big)
+
+
+def test_large_mismatch_shows_a_window_around_the_first_difference():
+    lines = _mismatch(BODY, BODY.replace("line 500\n", "line 5O0\n"))
+    assert lines[0].strip() == f"First difference at line 500, column 7 (character {BODY.index('line 500') + 6:,})."
+    for label, shown in (("Expected", "line 500"), ("Actual", "line 5O0")):
+        start = lines.index(next(l for l in lines if l.strip().startswith(label)))
+        window = lines[start + 1:start + 10]
+        assert [l.split("|")[0].strip().lstrip("> ") for l in window[:3]] == ["498", "499", "500"]
+        assert window[2].startswith("    >") and window[2].endswith(shown)
+        assert window[3].rstrip().endswith("^") and window[3].index("^") == window[2].index(shown) + 6
+        assert window[7].split("|")[1].strip() == "line 504"
+        assert window[8].strip() == "… 496 more lines"
+    assert not any("line 497" in l or "line 505" in l for l in lines)
+
+
+def test_long_lines_are_clipped_around_the_difference():
+    expected = "a" * 5000 + "b" + "a" * 5000
+    lines = _mismatch(expected, expected.replace("b", "c"))
+    marked = [l for l in lines if l.lstrip().startswith(">")]
+    assert len(marked) == 2
+    for line in marked:
+        assert "…[4,947 chars]" in line and line.endswith("…[4,894 chars]")
+        assert len(line) < diff.MAX_LINE + 60
+    assert "b" in marked[0] and "c" in marked[1]
+
+
+def test_shorter_output_ends_inside_the_window():
+    lines = _mismatch(BODY, BODY + "extra\n")
+    assert any("(output ends here)" in l for l in lines)
+
+
+def test_trailing_newline_on_one_side_only_is_pointed_out():
+    lines = _mismatch(BODY, BODY[:-1])
+    assert lines[0].strip().startswith("First difference at line 1,000")
+    assert lines[-1].strip() == "Expected output ends with a newline; actual output does not."
+
+    lines = _mismatch("42", "42\n")
+    assert lines[-1].strip() == "Actual output ends with a newline; expected output does not."
+
+    shown = _mismatch(BODY, BODY[:-1], show_bytes=True)
+    assert [l for l in shown if l.lstrip().startswith(">")][0].endswith("line 1000\\n")
+    assert [l for l in shown if l.lstrip().startswith(">")][1].endswith("line 1000")
+
+    assert _mismatch("a\n", "b\n")[-1].strip() == "Actual:   b"
+
+
+def test_write_head_caps_lines_and_reports_the_rest():
+    lines = []
+    diff.write_head(lines.append, "x" * 1000 + "\n" + BODY)
+    assert len(lines) == diff.PASSED_LINES + 1
+    assert lines[0].endswith("…[840 chars]")
+    assert lines[1].strip() == "line 1"
+    assert lines[-1].strip() == f"… 981 more lines ({len(BODY) - BODY.index('line 20'):,} characters) not shown"
+
+    lines = []
+    diff.write_head(lines.append, "one\ntwo\n")
+    assert [l.strip() for l in lines] == ["one", "two"]
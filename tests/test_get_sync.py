@@ -0,0 +1,47 @@
+import base64
+
+from jasper.commands import get
+
+
+def _item(files):
+    return {
+        "project_name": "101-hello",
+        "files": {rel: {"content_base64": base64.b64encode(data).decode()} for rel, data in files.items()},
+    }
+
+
+def test_sync_updates_untouched_files_and_keeps_edits(tmp_path, capsys):
+    get.install_item(str(tmp_path), _item({"main.c": b"v1 main\n", "util.c": b"v1 util\n", "old.c": b"old\n"}))
+    folder = tmp_path / "101-hello"
+    (folder / "util.c").write_bytes(b"my util\n")  # the student's work
+
+    get.sync_item(str(tmp_path), _item({"main.c": b"v2 main\n", "util.c": b"v2 util\n"}))
+
+    assert (folder / "main.c").read_bytes() == b"v2 main\n"
+    assert (folder / "util.c").read_bytes() == b"my util\n"
+    assert not (folder / "old.c").exists()
+    out = capsys.readouterr().out
+    assert "1 changed, 1 removed, 1 kept" in out and "util.c" in out
+
+
+def test_reverted_edit_is_updated_by_a_later_sync(tmp_path):
+    get.install_item(str(tmp_path), _item({"util.c": b"v1\n"}))
+    folder = tmp_path / "101-hello"
+    (folder / "util.c").write_bytes(b"edited\n")
+    get.sync_item(str(tmp_path), _item({"util.c": b"v2\n"}))
+    assert (folder / "util.c").read_bytes() == b"edited\n"
+
+    (folder / "util.c").write_bytes(b"v1\n")  # back to the starter it came from
+    get.sync_item(str(tmp_path), _item({"util.c": b"v2\n"}))
+    assert (folder / "util.c").read_bytes() == b"v2\n"
+
+
+def test_files_without_a_starter_record_are_kept(tmp_path):
+    folder = tmp_path / "101-hello"
+    folder.mkdir()
+    (folder / "main.c").write_bytes(b"written before starter.json existed\n")
+
+    get.sync_item(str(tmp_path), _item({"main.c": b"server\n", "new.c": b"new\n"}))
+
+    assert (folder / "main.c").read_bytes() == b"written before starter.json existed\n"
+    assert (folder / "new.c").read_bytes() == b"new\n"
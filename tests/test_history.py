@@ -0,0 +1,86 @@
+import argparse
+
+import pytest
+
+from conftest import serve_with
+from jasper import devserver
+from jasper.commands import history
+
+PROBLEM = {
+    "module": "m01", "problem_id": "101", "problem_name": "Problem 101", "status": "completed",
+    "timestamp": "2026-01-05T10:00:00+00:00", "server_grade": 90, "server_grade_possible": 100,
+}
+
+
+@pytest.fixture
+def server(grader, monkeypatch):
+    """The stand-in grader with one graded problem, logging each /history request's validators."""
+    grader.RequestHandlerClass.state.history["s1"].append(dict(PROBLEM))
+    seen = []
+
+    def _history(self, payload):
+        seen.append(self.headers.get("If-None-Match"))
+        return devserver.GraderHandler._history(self, payload)
+
+    serve_with(grader, _history=_history)
+    monkeypatch.setattr(history, "load_config", lambda: {"student_id": "s1", "server_url": grader.url})
+    grader.seen = seen
+    return grader
+
+
+def _run(offline=False):
+    history.run(argparse.Namespace(offline=offline, since=None, module=None))
+
+
+def _expire(monkeypatch):
+    later = history.time.time() + history.HISTORY_TTL + 1
+    monkeypatch.setattr(history.time, "time", lambda: later)
+
+
+def test_fresh_snapshot_is_shown_without_asking(server, capsys):
+    _run()
+    _run()
+    assert server.seen == [None]
+    assert capsys.readouterr().out.count("Problem 101") == 2
+
+
+def test_expired_snapshot_is_revalidated_with_its_etag(server, monkeypatch, capsys):
+    _run()
+    etag = history._load_snapshot(history._snapshot_path(server.url, "s1", None, None))["etag"]
+    assert etag
+
+    _expire(monkeypatch)
+    _run()
+    assert server.seen == [None, etag]  # answered 304: same data, snapshot kept
+    assert capsys.readouterr().out.count("Problem 101") == 2
+    snapshot = history._load_snapshot(history._snapshot_path(server.url, "s1", None, None))
+    assert snapshot["fetched_at"] == history.time.time()  # TTL restarted
+
+    _run()
+    assert len(server.seen) == 2
+
+
+def test_changed_history_replaces_the_snapshot(server, monkeypatch, capsys):
+    _run()
+    server.RequestHandlerClass.state.history["s1"].append(dict(PROBLEM, problem_id="102", problem_name="Problem 102"))
+    _run()
+    assert "Problem 102" not in capsys.readouterr().out  # still within the TTL
+
+    _expire(monkeypatch)
+    _run()
+    assert "Problem 102" in capsys.readouterr().out
+    assert len(server.seen) == 2
+
+
+def test_offline_without_a_snapshot_says_so(server, capsys):
+    _run(offline=True)
+    assert "No saved history yet" in capsys.readouterr().out
+    assert server.seen == []
+
+
+def test_offline_shows_the_saved_snapshot(server, capsys):
+    _run()
+    _run(offline=True)
+    out = capsys.readouterr().out
+    assert "Offline: showing history saved" in out and out.count("Problem 101") == 2
+    assert len(server.seen) == 1
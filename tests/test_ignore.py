@@ -0,0 +1,35 @@
+from jasper import ignore
+from jasper.archive import build_archive
+
+
+def test_core_dumps_are_left_out_but_core_directories_are_kept(tmp_path):
+    (tmp_path / "core").write_bytes(b"\0" * 16)
+    (tmp_path / "core.1234").write_bytes(b"\0" * 16)
+    (tmp_path / "src" / "core").mkdir(parents=True)
+    (tmp_path / "src" / "core" / "engine.c").write_text("int x;\n")
+    (tmp_path / "src" / "main.c").write_text("int main() {}\n")
+
+    arcnames = sorted(name.replace("\\", "/") for _, name in ignore.iter_included(str(tmp_path)))
+
+    assert arcnames == ["src/core/engine.c", "src/main.c"]
+
+
+def test_jasperignore_can_still_exclude_a_core_directory(tmp_path):
+    (tmp_path / "core").mkdir()
+    (tmp_path / "core" / "big.dat").write_text("x")
+    (tmp_path / ".jasperignore").write_text("core/\n")
+
+    assert [name for _, name in ignore.iter_included(str(tmp_path))] == [".jasperignore"]
+
+
+def test_selection_lists_what_packaging_includes(tmp_path):
+    (tmp_path / "main.c").write_text("int main() {}\n")
+    (tmp_path / "main.o").write_bytes(b"\0")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "1.in").write_text("1\n")
+
+    selection = ignore.check(str(tmp_path))
+
+    assert [name for _, name in selection.included] == [name for _, name in ignore.iter_included(str(tmp_path))]
+    assert selection.notable_ignored() == ["main.o"]
+    assert build_archive(str(tmp_path), selection.included) == build_archive(str(tmp_path))
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from jasper import jsonstream
+
+DOCUMENTS = [
+    {"a": 1, "b": [True, False, None], "c": {"d": [1.5, -2e3, {"e": []}], "f": {}}},
+    {"escapes": "quote \" backslash \\ slash / tab \t newline \n é \u0000 \b \f \r"},
+    {"surrogates": "\U0001F600 and \U00010348", "raw": "héllo ☃ 😀"},
+    [[[], [[1, 2], {"x": [3, {"y": "z"}]}]], "tail", 0, -0.25],
+    "just a string",
+    12345,
+]
+
+
+def _chunks(payload, size):
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+
+def _payloads():
+    for doc in DOCUMENTS:
+        # ensure_ascii turns é and 😀 into \u escapes (surrogate pairs for the latter);
+        # without it the UTF-8 bytes themselves get split across chunks.
+        for ensure_ascii in (True, False):
+            yield json.dumps(doc, ensure_ascii=ensure_ascii).encode()
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, None])
+def test_parse_matches_json_loads_at_any_chunk_size(size):
+    for payload in _payloads():
+        chunks = [payload] if size is None else _chunks(payload, size)
+        assert jsonstream.parse(chunks) == json.loads(payload)
+
+
+def test_escapes_split_mid_sequence():
+    payload = rb'{"s": "a\nb\u00e9c\ud83d\ude00d\\ \/"}'
+    for cut in range(1, len(payload)):
+        assert jsonstream.parse([payload[:cut], payload[cut:]]) == json.loads(payload)
+
+
+def test_surrogate_pair_split_between_halves():
+    payload = rb'["\ud83d\ude00"]'
+    middle = payload.index(rb"\ude00")
+    for cut in (middle - 1, middle, middle + 1, middle + 3):
+        assert jsonstream.parse([payload[:cut], payload[cut:]]) == ["\U0001F600"]
+
+
+def test_streamed_strings_go_to_the_sink():
+    class Sink:
+        def __init__(self):
+            self.parts = []
+
+        def write(self, text):
+            self.parts.append(text)
+
+        def finish(self):
+            return len("".join(self.parts))
+
+    payload = json.dumps({"files": [{"name": "a", "data": "x" * 50}], "other": "kept"}).encode()
+    paths = []
+
+    def stream_at(path):
+        paths.append(path)
+        return Sink() if path[-1] == "data" else None
+
+    result = jsonstream.parse(_chunks(payload, 3), stream_at)
+    assert result == {"files": [{"name": "a", "data": 50}], "other": "kept"}
+    assert ("files", 0, "data") in paths
+
+
+@pytest.mark.parametrize("payload", [
+    b"",
+    b"{",
+    b'{"a": 1',
+    b'{"a": "unterminated',
+    b'{"a": "\\u12',
+    b'{"a" 1}',
+    b'{"a": 1,}',
+    b"[1 2]",
+    b'{"a": "\\x"}',
+    b"[1] 2",
+    b"nul",
+])
+@pytest.mark.parametrize("size", [1, 7, None])
+def test_malformed_or_truncated_input_raises(payload, size):
+    chunks = [payload] if size is None else _chunks(payload, size)
+    with pytest.raises(ValueError):
+        jsonstream.parse(chunks)
@@ -0,0 +1,16 @@
+import random
+
+from jasper import ignore
+from jasper.commands import loadtest
+
+
+def test_large_problems_really_package_large(tmp_path):
+    folder = loadtest.make_problem(str(tmp_path), "101", random.Random(1), large=True)
+
+    assert ignore.check(folder).total > 200 * 1024
+
+
+def test_percentiles_use_nearest_rank():
+    ordered = list(range(1, 101))
+    assert [loadtest.percentile(ordered, q) for q in (50, 95, 99)] == [50, 95, 99]
+    assert loadtest.percentile([], 50) is None
@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import signal
+import time
+
+import pytest
+
+from jasper import localrun
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="uses sh and process groups")
+
+
+def _gone(pid):
+    """True once pid has exited (a zombie waiting for init counts)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(") ", 1)[1].startswith("Z")
+    except FileNotFoundError:
+        return True
+    except OSError:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        return False
+
+
+def test_run_capped_returns_output_and_exit_code(tmp_path):
+    out, err, code, timed_out, truncated = localrun.run_capped(
+        ["sh", "-c", "echo hi; echo oops >&2; exit 3"], str(tmp_path), None, 5
+    )
+    assert (out, err, code, timed_out, truncated) == (b"hi\n", b"oops\n", 3, False, False)
+
+
+def test_run_capped_feeds_stdin(tmp_path):
+    (tmp_path / "in.txt").write_bytes(b"1 2 3\n")
+    out, _, code, _, _ = localrun.run_capped(["cat"], str(tmp_path), str(tmp_path / "in.txt"), 5)
+    assert (out, code) == (b"1 2 3\n", 0)
+
+
+def test_run_capped_times_out(tmp_path):
+    start = time.monotonic()
+    out, _, code, timed_out, truncated = localrun.run_capped(
+        ["sh", "-c", "echo started; sleep 30"], str(tmp_path), None, 0.5
+    )
+    assert timed_out and not truncated
+    assert out == b"started\n"
+    assert code == -signal.SIGKILL
+    assert time.monotonic() - start < 5
+
+
+def test_run_capped_kills_the_whole_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    _, _, _, timed_out, _ = localrun.run_capped(
+        ["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], str(tmp_path), None, 0.5
+    )
+    assert timed_out
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while not _gone(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _gone(child)
+
+
+def test_run_capped_stops_runaway_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(localrun, "MAX_OUTPUT_BYTES", 100_000)
+    out, _, _, timed_out, truncated = localrun.run_capped(["yes"], str(tmp_path), None, 10)
+    assert truncated and not timed_out
+    assert len(out) == 100_000
+
+
+def test_run_test_reports_signals(tmp_path):
+    result = localrun.run_test(str(tmp_path), "crash", {"test": "crash"}, 1, 5)
+    assert not result["passed"]  # could not run: no binary
+
+    script = tmp_path / "crash"
+    script.write_text("#!/bin/sh\nkill -SEGV $$\n")
+    script.chmod(0o755)
+    result = localrun.run_test(str(tmp_path), "crash", {"test": "crash", "expected": ""}, 1, 5)
+    assert not result["passed"]
+    assert "SIGSEGV" in result["actual"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGRTMIN"), reason="no real-time signals")
+def test_signal_name_falls_back_for_unnamed_signals():
+    assert localrun._signal_name(signal.SIGSEGV) == "SIGSEGV"
+    assert localrun._signal_name(signal.SIGRTMIN + 3) == f"signal {signal.SIGRTMIN + 3}"
+    assert localrun._signal_name(250) == "signal 250"
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is not installed")
+def test_run_local_builds_and_runs_tests(tmp_path):
+    (tmp_path / "Makefile").write_text(
+        "mysolution: echo.sh\n\tcp echo.sh mysolution && chmod +x mysolution\n"
+    )
+    (tmp_path / "echo.sh").write_text('#!/bin/sh\necho "$@"\n')
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "in.txt").write_text("ignored\n")
+    meta = {
+        "tests": [
+            {"test": "echoes", "args": ["a", "b"], "expected": "a b\n", "points": 2},
+            {"test": "wrong", "args": "x", "expected": "y\n"},
+            {"test": "stdin", "input_file": "tests/in.txt", "expected": "\n", "exit_code": 0},
+            {"test": "memory", "type": "memory"},
+        ]
+    }
+    (tmp_path / "meta.json").write_text(json.dumps(meta))
+
+    result = localrun.run_local(str(tmp_path), jobs=2)
+    assert result["local"] and result["server_only"] == 1
+    assert [t["passed"] for t in result["tests"]] == [True, False, True]
+    assert not result["passed"]
+    assert result["tests"][2]["stdin"] is True
+
+    only = localrun.run_local(str(tmp_path), test_index=1)
+    assert only["passed"] and len(only["tests"]) == 1
+    with pytest.raises(localrun.LocalRunError):
+        localrun.run_local(str(tmp_path), test_index=9)
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is not installed")
+def test_run_local_numbers_tests_like_meta_json(tmp_path):
+    (tmp_path / "Makefile").write_text(
+        "mysolution: echo.sh\n\tcp echo.sh mysolution && chmod +x mysolution\n"
+    )
+    (tmp_path / "echo.sh").write_text('#!/bin/sh\necho "$@"\n')
+    meta = {
+        "tests": [
+            {"test": "leaks", "type": "memory"},
+            {"args": ["one"], "expected": "one\n"},
+            {"test": "style", "type": "check"},
+            {"args": ["three"], "expected": "three\n"},
+        ]
+    }
+    (tmp_path / "meta.json").write_text(json.dumps(meta))
+
+    result = localrun.run_local(str(tmp_path))
+    assert [t["test"] for t in result["tests"]] == ["test 2", "test 4"]
+
+    only = localrun.run_local(str(tmp_path), test_index=4)
+    assert [t["test"] for t in only["tests"]] == ["test 4"] and only["passed"]
+    with pytest.raises(localrun.LocalRunError, match="only runs on the server"):
+        localrun.run_local(str(tmp_path), test_index=1)
+    with pytest.raises(localrun.LocalRunError, match="no test 5"):
+        localrun.run_local(str(tmp_path), test_index=5)
@@ -0,0 +1,139 @@
+import hashlib
+import os
+
+import pytest
+import requests
+
+from conftest import serve_with, start_grader, stop_grader
+from jasper import client, devserver, resumable
+from jasper.archive import build_archive
+
+FIELDS = {"student_id": "s1", "problem_id": "101"}
+CHUNK = 64 * 1024
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Exercise many chunks without moving megabytes around."""
+    monkeypatch.setattr(resumable, "RESUMABLE_MIN", 4 * CHUNK)
+    monkeypatch.setattr(resumable, "CHUNK_SIZE", CHUNK)
+    monkeypatch.setattr(devserver, "UPLOAD_CHUNK_SIZE", CHUNK)
+    monkeypatch.setattr(resumable, "STALL_BACKOFF_CAP", 0.01)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    folder = tmp_path / "101-big"
+    folder.mkdir()
+    (folder / "main.c").write_text("int main() { return 0; }\n")
+    (folder / "data.bin").write_bytes(os.urandom(10 * CHUNK))  # random: does not compress
+    return build_archive(str(folder))
+
+
+def _accepted(resp):
+    assert resp.status_code == 200
+    assert resp.json()["passed"]
+    assert len(resp.json()["tests"]) == 2
+
+
+def test_large_archive_goes_out_in_chunks(grader, archive):
+    resp = client.upload(grader.url, "/check", FIELDS, archive)
+
+    _accepted(resp)
+    stats = grader.state.stats()
+    assert stats["requests"]["/uploads"] == 1 + -(-len(archive) // CHUNK)  # begin + one PUT per chunk
+
+
+def test_small_archive_is_sent_whole(grader, tmp_path):
+    (tmp_path / "main.c").write_text("int main() {}\n")
+    resp = client.upload(grader.url, "/check", FIELDS, build_archive(str(tmp_path)))
+
+    assert resp.status_code == 200
+    assert "/uploads" not in grader.state.stats()["requests"]
+
+
+def test_streamed_archive_without_size_hint_is_not_spooled(grader, archive, monkeypatch):
+    monkeypatch.setattr(resumable, "spool", lambda archive: pytest.fail("spooled a streamed archive"))
+    resp = client.upload(grader.url, "/check", FIELDS, lambda: iter([archive]))
+    _accepted(resp)
+
+
+def test_streamed_archive_with_large_size_hint_resumes(grader, archive):
+    resp = client.upload(grader.url, "/check", FIELDS, lambda: iter([archive]), size_hint=len(archive))
+    _accepted(resp)
+    assert grader.state.stats()["requests"]["/uploads"] > 1
+
+
+def test_resumes_after_dropped_chunks(archive):
+    server = start_grader(drop_rate=0.3)
+    try:
+        resp = client.upload(server.url, "/check", FIELDS, archive)
+        _accepted(resp)
+        assert server.state.stats()["dropped"] > 0
+    finally:
+        stop_grader(server)
+
+
+def _begin(grader, archive):
+    f, sha256, size = resumable.spool(archive)
+    upload_id, offset, chunk_size = resumable._begin(grader.url, size, sha256, "submission.zip")
+    return f, upload_id, size
+
+
+def test_409_moves_to_the_servers_offset(grader, archive):
+    f, upload_id, size = _begin(grader, archive)
+    with f:
+        # Claim to be two chunks in; the server answers 409 with offset 0.
+        resumable.send_chunks(grader.url, upload_id, f, size, offset=2 * CHUNK, chunk_size=CHUNK)
+    assert bytes(grader.state.uploads[upload_id]["data"]) == archive
+
+
+def test_422_resends_the_damaged_chunk(grader, archive):
+    damaged = []
+    real_put = devserver.GraderHandler._put_chunk
+
+    def damage_first(self, upload_id):
+        if not damaged:
+            damaged.append(devserver._read_body(self))
+            return self._send_json(422, {"error": "Chunk checksum mismatch"})
+        return real_put(self, upload_id)
+
+    serve_with(grader, _put_chunk=damage_first)
+    resp = client.upload(grader.url, "/check", FIELDS, archive)
+
+    _accepted(resp)
+    assert len(damaged) == 1
+
+
+def test_server_without_uploads_gets_a_single_request(grader, archive):
+    serve_with(grader, _begin_upload=lambda self, request: self._send_json(404, {"error": "Not found"}))
+
+    resp = client.upload(grader.url, "/check", FIELDS, archive)
+    _accepted(resp)
+    assert not resumable.supported(grader.url)
+
+    client.upload(grader.url, "/check", FIELDS, archive)
+    assert grader.state.stats()["requests"]["/uploads"] == 1  # probed once
+
+
+def test_gives_up_after_max_stalls(archive, monkeypatch):
+    monkeypatch.setattr(resumable, "MAX_STALLS", 3)
+    server = start_grader(drop_rate=1.0)
+    try:
+        f, upload_id, size = _begin(server, archive)
+        with f, pytest.raises(requests.exceptions.ConnectionError, match="stalled at byte 0"):
+            resumable.send_chunks(server.url, upload_id, f, size, chunk_size=CHUNK)
+        assert server.state.stats()["dropped"] == 4
+    finally:
+        stop_grader(server)
+
+
+def test_rerun_resumes_a_remembered_upload(grader, archive):
+    f, upload_id, size = _begin(grader, archive)
+    with f:
+        f.seek(0)
+        first = f.read(CHUNK)
+    grader.state.uploads[upload_id]["data"] += first  # the previous run got one chunk through
+
+    sha256 = hashlib.sha256(archive).hexdigest()
+    assert resumable._begin(grader.url, size, sha256, "submission.zip")[:2] == (upload_id, CHUNK)
@@ -0,0 +1,56 @@
+import os
+
+from jasper import watch
+
+
+def _poller(folder):
+    return watch.Watcher(str(folder), debounce=0.05, force_polling=True, poll_interval=0.01)
+
+
+def test_polling_sees_edits_but_not_ignored_files(tmp_path):
+    (tmp_path / "main.c").write_text("int main() {}\n")
+    watcher = _poller(tmp_path)
+    assert not watcher.uses_inotify
+    assert not watcher.wait_for_change(timeout=0.1)
+
+    (tmp_path / "main.o").write_bytes(b"\0")  # build output
+    (tmp_path / ".jasper").mkdir()
+    (tmp_path / ".jasper" / "check.json").write_text("{}")
+    assert not watcher.wait_for_change(timeout=0.1)
+
+    (tmp_path / "main.c").write_text("int main() { return 1; }\n")
+    os.utime(tmp_path / "main.c", ns=(0, 1))
+    assert watcher.wait_for_change(timeout=2)
+
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "util.c").write_text("")
+    assert watcher.wait_for_change(timeout=2)
+
+
+def test_polling_survives_files_and_dirs_vanishing_mid_scan(tmp_path, monkeypatch):
+    (tmp_path / "main.c").write_text("")
+    (tmp_path / "src").mkdir()
+    watcher = _poller(tmp_path)
+    gone = str(tmp_path / "src")
+
+    listdir = os.listdir
+    stat = os.stat
+
+    def vanishing_listdir(path):
+        if path == gone:
+            raise FileNotFoundError(path)
+        return listdir(path) + ["deleted.c"]
+
+    def vanishing_stat(path, *args, **kwargs):
+        if os.path.basename(path) == "deleted.c":
+            raise FileNotFoundError(path)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(watch.os, "listdir", vanishing_listdir)
+    monkeypatch.setattr(watch.os, "stat", vanishing_stat)
+    assert not watcher.wait_for_change(timeout=0.1)  # skipped, not raised or counted
+
+    monkeypatch.undo()
+    (tmp_path / "main.c").write_text("changed")
+    os.utime(tmp_path / "main.c", ns=(0, 1))
+    assert watcher.wait_for_change(timeout=2)
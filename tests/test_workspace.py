@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from jasper import workspace
+from jasper.utils import load_config, save_config
+
+
+@pytest.fixture
+def problem(tmp_path, monkeypatch):
+    folder = tmp_path / "course" / "module1" / "101-hello"
+    folder.mkdir(parents=True)
+    monkeypatch.chdir(folder)
+    monkeypatch.setenv(workspace.CACHE_ENV, "1")
+    # Creating the cache dir would touch tmp_path, one of the walked directories.
+    os.makedirs(os.path.dirname(workspace._cache_path()))
+    workspace.reset()
+    yield tmp_path / "course"
+    workspace.reset()
+
+
+def _resolve():
+    return workspace.resolve(refresh=True)
+
+
+def test_cached_miss_notices_a_new_config(problem):
+    assert _resolve().config_path is None
+    assert _resolve().config_path is None  # served from the cache
+
+    (problem / "jasper").mkdir()
+    (problem / "jasper" / "config.json").write_text(json.dumps({"student_id": "s1"}))
+
+    ws = _resolve()
+    assert ws.config_path == os.path.join(str(problem), "jasper", "config.json")
+    assert ws.config == {"student_id": "s1"}
+
+
+def test_cached_entry_notices_config_added_to_existing_jasper_dir(problem):
+    (problem / "module1" / "jasper").mkdir()
+    assert _resolve().config_path is None
+
+    (problem / "module1" / "jasper" / "config.json").write_text("{}")
+    assert _resolve().config_path == os.path.join(str(problem), "module1", "jasper", "config.json")
+
+
+def test_cached_root_notices_a_new_devcontainer(problem):
+    (problem / "jasper").mkdir()
+    (problem / "jasper" / "config.json").write_text("{}")
+    first = _resolve()
+    assert first.problem_id == "101"
+
+    (problem / ".devcontainer").mkdir()
+    assert _resolve().project_root == str(problem)
+
+
+def test_cache_hit_skips_the_walk(problem, monkeypatch):
+    (problem / "jasper").mkdir()
+    (problem / "jasper" / "config.json").write_text("{}")
+    expected = _resolve().config_path
+
+    monkeypatch.setattr(workspace, "_walk", lambda *a: pytest.fail("walked despite a valid cache entry"))
+    assert _resolve().config_path == expected
+
+
+def test_corrupt_config_does_not_stop_it_being_replaced(problem):
+    (problem / "jasper").mkdir()
+    config = problem / "jasper" / "config.json"
+    config.write_text("{not json")
+
+    ws = _resolve()
+    assert ws.config_path == str(config)
+    with pytest.raises(ValueError):
+        load_config()
+
+    assert save_config({"student_id": "s1"}) == str(config)
+    assert load_config() == {"student_id": "s1"}
+
+
+def test_walk_stops_at_the_config_until_the_root_is_needed(problem):
+    (problem / "jasper").mkdir()
+    (problem / "jasper" / "config.json").write_text("{}")
+    examined = []
+    config_path, root = workspace._walk(os.getcwd(), examined)
+    assert config_path == os.path.join(str(problem), "jasper", "config.json")
+    assert root is None
+    assert os.path.dirname(str(problem)) not in examined
+
+    (problem.parent / ".devcontainer").mkdir()
+    assert _resolve().project_root == str(problem.parent)